@@ -1,3 +1,6 @@
 from .circuit_components import retrieve_circuit_components
 from .circuit_schema import retrieve_circuit_schema
-from .health import test_connection
\ No newline at end of file
+from .circuit_batch import retrieve_circuit_schema_batch
+from .health import test_connection
+from .metrics import get_metrics
+from .jobs import get_job, submit_job
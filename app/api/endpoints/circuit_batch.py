@@ -0,0 +1,221 @@
+import json
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from pydantic import ValidationError
+from starlette.datastructures import FormData, UploadFile
+
+from app.api.event_stream import NDJSON_MEDIA_TYPE
+from app.api_schemas import (
+    BatchImageRequest,
+    BatchItemError,
+    BatchItemResult,
+    BatchSchemaResponse,
+    CircuitImageRequest,
+    SchemaImageResponse,
+)
+from app.api_schemas.batch import (
+    BATCH_IMAGE_REQUEST_BODY,
+    BATCH_UPLOAD_REQUEST_BODY,
+)
+from app.core.config import get_settings
+from app.core.exceptions import BatchTooLargeError
+from app.services.batch_runner import BatchItemOutcome, BatchRunner
+from app.services.circuit_service import extract_schema
+from app.services.image_decoder import ImageDecoder
+from app.services.image_upload import ImageUploadReader
+from app.services.image_validation import ImageValidator
+
+router = APIRouter()
+settings = get_settings()
+
+BatchItem = Callable[[], Awaitable[SchemaImageResponse]]
+
+
+def _check_batch_size(size: int) -> None:
+    """Reject empty batches and batches over BATCH_MAX_ITEMS."""
+    if not 0 < size <= settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"A batch must contain 1 to {settings.BATCH_MAX_ITEMS} images"
+            )
+        )
+
+
+def _check_batch_bytes(size: int) -> None:
+    """Reject batches whose images add up to over BATCH_MAX_TOTAL_BYTES."""
+    if size > settings.BATCH_MAX_TOTAL_BYTES:
+        logger.warning(
+            f"Batch size {size} exceeds limit {settings.BATCH_MAX_TOTAL_BYTES}"
+        )
+        raise BatchTooLargeError()
+
+
+def _encoded_item(image: CircuitImageRequest) -> BatchItem:
+    """Decode, validate and analyze one base64 encoded image of a batch."""
+    async def analyze() -> SchemaImageResponse:
+        image_bytes = await ImageDecoder().decode_async(image.image_data)
+        ImageValidator(settings).validate(image.content_type, image_bytes)
+        return SchemaImageResponse(**await extract_schema(image_bytes))
+
+    return analyze
+
+
+def _upload_item(file: UploadFile) -> BatchItem:
+    """Read, validate and analyze one uploaded file of a batch.
+
+    The file is only read once the item runs, so at most
+    BATCH_MAX_CONCURRENCY images of the batch are held in memory.
+    """
+    async def analyze() -> SchemaImageResponse:
+        upload_reader = ImageUploadReader(settings)
+        try:
+            image_bytes = await upload_reader.read_upload(file)
+        finally:
+            await file.close()
+        content_type = upload_reader.resolve_content_type(
+            file.content_type, image_bytes
+        )
+        ImageValidator(settings).validate(content_type, image_bytes)
+        return SchemaImageResponse(**await extract_schema(image_bytes))
+
+    return analyze
+
+
+def _item_result(outcome: BatchItemOutcome) -> BatchItemResult:
+    """Format an outcome, mapping errors to the single endpoint's status."""
+    if outcome.error is None:
+        return BatchItemResult(index=outcome.index, result=outcome.result)
+
+    if isinstance(outcome.error, HTTPException):
+        error = BatchItemError(
+            status_code=outcome.error.status_code,
+            detail=str(outcome.error.detail)
+        )
+    else:
+        logger.error(f"Batch item {outcome.index} failed: {outcome.error}")
+        error = BatchItemError(status_code=500, detail=str(outcome.error))
+    return BatchItemResult(index=outcome.index, error=error)
+
+
+async def _run_batch(
+    items: List[BatchItem],
+    stream: bool,
+    form: Optional[FormData] = None
+) -> Union[BatchSchemaResponse, StreamingResponse]:
+    """Analyze a batch, in order or streamed as NDJSON in completion order.
+
+    The form holding the uploads read by the items is closed once the
+    batch is over.
+    """
+    runner = BatchRunner(settings.BATCH_MAX_CONCURRENCY)
+    logger.info(f"Analyzing a batch of {len(items)} images")
+
+    async def close_form() -> None:
+        if form is not None:
+            await form.close()
+
+    if not stream:
+        try:
+            outcomes = await runner.run_ordered(items)
+        finally:
+            await close_form()
+        return BatchSchemaResponse(
+            results=[_item_result(outcome) for outcome in outcomes]
+        )
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for outcome in runner.run(items):
+                yield json.dumps(_item_result(outcome).model_dump()) + "\n"
+        finally:
+            await close_form()
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post(
+    "/retrieve-circuit-schema/batch",
+    response_model=BatchSchemaResponse,
+    openapi_extra=BATCH_IMAGE_REQUEST_BODY
+)
+async def retrieve_circuit_schema_batch(
+    request: Request,
+    stream: bool = False
+) -> Union[BatchSchemaResponse, StreamingResponse]:
+    """Process a batch of base64 encoded circuit images.
+
+    Every image gets its own result or error. With ``stream=true`` the
+    outcomes are streamed as NDJSON lines as soon as each image is done.
+    The body is read under the base64 size of BATCH_MAX_TOTAL_BYTES before
+    it is parsed.
+    """
+    upload_reader = ImageUploadReader(settings)
+    body = await upload_reader.read_stream(
+        request.stream(),
+        content_length=upload_reader.parse_content_length(
+            request.headers.get("content-length")
+        ),
+        max_size=(
+            settings.BATCH_MAX_TOTAL_BYTES * 4 // 3
+            + upload_reader.MULTIPART_OVERHEAD
+        ),
+        too_large=BatchTooLargeError
+    )
+    try:
+        batch = BatchImageRequest.model_validate_json(body)
+    except ValidationError as e:
+        # Located in the body, as FastAPI reports its own body errors
+        errors = [
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors()
+        ]
+        raise RequestValidationError(errors, body=body)
+
+    _check_batch_size(len(batch.images))
+    # Decoded size of the base64 payloads
+    _check_batch_bytes(
+        sum(len(image.image_data) for image in batch.images) * 3 // 4
+    )
+    return await _run_batch(
+        [_encoded_item(image) for image in batch.images], stream
+    )
+
+
+@router.post(
+    "/retrieve-circuit-schema/batch/upload",
+    response_model=BatchSchemaResponse,
+    openapi_extra=BATCH_UPLOAD_REQUEST_BODY
+)
+async def retrieve_circuit_schema_batch_upload(
+    request: Request,
+    stream: bool = False
+) -> Union[BatchSchemaResponse, StreamingResponse]:
+    """Process a batch of circuit images sent as multipart/form-data.
+
+    The body is received under BATCH_MAX_TOTAL_BYTES and spooled by the
+    request's own form, whose files are read one item at a time as the
+    batch runs.
+    """
+    upload_reader = ImageUploadReader(settings)
+    form = await upload_reader.read_form(
+        request,
+        max_size=(
+            settings.BATCH_MAX_TOTAL_BYTES + upload_reader.MULTIPART_OVERHEAD
+        ),
+        max_files=settings.BATCH_MAX_ITEMS,
+        too_large=BatchTooLargeError
+    )
+    try:
+        files = upload_reader.form_files(form, "files")
+        _check_batch_size(len(files))
+        _check_batch_bytes(sum(file.size or 0 for file in files))
+    except HTTPException:
+        await form.close()
+        raise
+    return await _run_batch(
+        [_upload_item(file) for file in files], stream, form
+    )
@@ -1,17 +1,39 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
+from app.api.event_stream import stream_analysis
+
 from app.core.exceptions import ImageTooLargeError, InvalidImageTypeError
 from app.services.circuit_service import extract_components
 from app.core.config import get_settings
 from app.api_schemas import CircuitImageRequest,  ComponentsImageResponse, Component
+from app.api_schemas.image_requests import (
+    RAW_IMAGE_REQUEST_BODY,
+    UPLOAD_IMAGE_REQUEST_BODY,
+)
 from app.services.image_validation import ImageValidator
 from app.services.image_decoder import ImageDecoder
+from app.services.image_upload import ImageUploadReader
 
 
 router = APIRouter()
 settings = get_settings()
 
+async def _analyze_components(image_bytes: bytes) -> ComponentsImageResponse:
+    """Identify the components of validated, decoded image bytes."""
+    components = await extract_components(image_bytes)
+    logger.debug(f"Extracted components: {components}")
+
+    formatted_components = []
+    for component in components:
+        component = Component(**component)
+        formatted_components.append(component)
+
+    return ComponentsImageResponse(components=formatted_components)
+
 
 @router.post("/retrieve-circuit-components")
 async def retrieve_circuit_components(request: CircuitImageRequest) -> ComponentsImageResponse:
@@ -19,7 +41,7 @@ async def retrieve_circuit_components(request: CircuitImageRequest) -> Component
 
         # First decode the base64 image
         image_decoder = ImageDecoder()
-        image_bytes = image_decoder.decode(request.image_data)
+        image_bytes = await image_decoder.decode_async(request.image_data)
         
         # Then validate the decoded image
         image_validator = ImageValidator(settings)
@@ -31,12 +53,65 @@ async def retrieve_circuit_components(request: CircuitImageRequest) -> Component
         # This catches base64 decoding errors from ImageDecoder
         raise e
 
-    components = await extract_components(image_bytes)  # Pass decoded bytes instead of raw base64
-    logger.debug(f"Extracted components: {components}")
+    return await _analyze_components(image_bytes)  # Pass decoded bytes instead of raw base64
 
-    formatted_components = []
-    for component in components:
-        component = Component(**component)
-        formatted_components.append(component)
 
-    return ComponentsImageResponse(components=formatted_components)
\ No newline at end of file
+@router.post(
+    "/retrieve-circuit-components/upload",
+    openapi_extra=UPLOAD_IMAGE_REQUEST_BODY
+)
+async def retrieve_circuit_components_upload(
+    request: Request
+) -> ComponentsImageResponse:
+    """Process a circuit image sent as multipart/form-data."""
+    upload_reader = ImageUploadReader(settings)
+    form = await upload_reader.read_form(request)
+    try:
+        file = upload_reader.form_files(form, "file")[0]
+        image_bytes = await upload_reader.read_upload(file)
+        content_type = upload_reader.resolve_content_type(
+            file.content_type, image_bytes
+        )
+    finally:
+        await form.close()
+    ImageValidator(settings).validate(content_type, image_bytes)
+    return await _analyze_components(image_bytes)
+
+
+@router.post(
+    "/retrieve-circuit-components/raw",
+    openapi_extra=RAW_IMAGE_REQUEST_BODY
+)
+async def retrieve_circuit_components_raw(
+    request: Request
+) -> ComponentsImageResponse:
+    """Process a circuit image sent as the raw request body."""
+    upload_reader = ImageUploadReader(settings)
+    image_bytes = await upload_reader.read_stream(
+        request.stream(),
+        content_length=upload_reader.parse_content_length(
+            request.headers.get("content-length")
+        )
+    )
+    content_type = upload_reader.resolve_content_type(
+        request.headers.get("content-type"), image_bytes
+    )
+    ImageValidator(settings).validate(content_type, image_bytes)
+    return await _analyze_components(image_bytes)
+
+
+@router.post("/retrieve-circuit-components/stream")
+async def retrieve_circuit_components_stream(
+    request: CircuitImageRequest,
+    accept: Optional[str] = Header(default=None)
+) -> StreamingResponse:
+    """Process base64 encoded circuit image, streaming progress events.
+
+    Emits "circuit_description" and one "component" event per decision,
+    then a final "result" event with the ComponentsImageResponse (or an
+    "error" event), as Server-Sent Events or NDJSON.
+    """
+    image_bytes = await ImageDecoder().decode_async(request.image_data)
+    ImageValidator(settings).validate(request.content_type, image_bytes)
+
+    return stream_analysis(lambda: _analyze_components(image_bytes), accept)
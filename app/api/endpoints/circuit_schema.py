@@ -1,17 +1,74 @@
-from fastapi import APIRouter, HTTPException
+from typing import Awaitable, Callable, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
+from app.api.event_stream import stream_analysis
+
 from app.core.exceptions import ImageTooLargeError, InvalidImageTypeError
 from app.services.circuit_service import extract_schema
 from app.core.config import get_settings
 from app.api_schemas import CircuitImageRequest, SchemaImageResponse, Component, Connection
 from app.services.image_validation import ImageValidator
 from app.services.image_decoder import ImageDecoder
+from app.services.image_upload import ImageUploadReader
+from app.api_schemas.image_requests import (
+    RAW_IMAGE_REQUEST_BODY,
+    UPLOAD_IMAGE_REQUEST_BODY,
+)
 
 router = APIRouter()
 settings = get_settings()
 
 
+async def _analyze_schema(image_bytes: bytes) -> SchemaImageResponse:
+    """Extract and format the schema of validated, decoded image bytes."""
+    schema = await extract_schema(image_bytes)
+
+    # Format the schema
+    formatted_components = []
+    formatted_connections = []
+    for component in schema['components']:
+        formatted_components.append(Component(**component))
+
+    for connection in schema['connections']:
+        formatted_connections.append(Connection(**connection))
+
+    return SchemaImageResponse(components=formatted_components, connections=formatted_connections)
+
+
+async def _analyze_upload(
+    read_image: Callable[[ImageUploadReader], Awaitable[bytes]],
+    declared_content_type: Optional[str]
+) -> SchemaImageResponse:
+    """Read, validate and analyze a binary upload.
+
+    Args:
+        read_image: Coroutine function reading the upload with a reader
+        declared_content_type: Content type declared by the client
+
+    Raises:
+        HTTPException: 400 for invalid uploads, 500 if the analysis fails
+    """
+    try:
+        upload_reader = ImageUploadReader(settings)
+        image_bytes = await read_image(upload_reader)
+        content_type = upload_reader.resolve_content_type(
+            declared_content_type, image_bytes
+        )
+        ImageValidator(settings).validate(content_type, image_bytes)
+
+        return await _analyze_schema(image_bytes)
+
+    except (ImageTooLargeError, InvalidImageTypeError) as e:
+        raise e
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/retrieve-circuit-schema")
 async def retrieve_circuit_schema(
     request: CircuitImageRequest
@@ -20,25 +77,14 @@ async def retrieve_circuit_schema(
     try:
         # First decode the base64 image
         image_decoder = ImageDecoder()
-        image_bytes = image_decoder.decode(request.image_data)
+        image_bytes = await image_decoder.decode_async(request.image_data)
         
         # Then validate the decoded image
         image_validator = ImageValidator(settings)
         image_validator.validate(request.content_type, image_bytes)
         
         # Pass validated data to service
-        schema = await extract_schema(image_bytes)
-
-        # Format the schema
-        formatted_components = []
-        formatted_connections = []
-        for component in schema['components']:
-            formatted_components.append(Component(**component))
-        
-        for connection in schema['connections']:
-            formatted_connections.append(Connection(**connection))
-        
-        return SchemaImageResponse(components=formatted_components, connections=formatted_connections)
+        return await _analyze_schema(image_bytes)
         
     except (ImageTooLargeError, InvalidImageTypeError) as e:
         raise e
@@ -46,4 +92,58 @@ async def retrieve_circuit_schema(
         # This catches base64 decoding errors from ImageDecoder
         raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/retrieve-circuit-schema/upload",
+    openapi_extra=UPLOAD_IMAGE_REQUEST_BODY
+)
+async def retrieve_circuit_schema_upload(
+    request: Request
+) -> SchemaImageResponse:
+    """Process a circuit image sent as multipart/form-data."""
+    form = await ImageUploadReader(settings).read_form(request)
+    try:
+        file = ImageUploadReader.form_files(form, "file")[0]
+        return await _analyze_upload(
+            lambda upload_reader: upload_reader.read_upload(file),
+            file.content_type
+        )
+    finally:
+        await form.close()
+
+
+@router.post(
+    "/retrieve-circuit-schema/raw",
+    openapi_extra=RAW_IMAGE_REQUEST_BODY
+)
+async def retrieve_circuit_schema_raw(request: Request) -> SchemaImageResponse:
+    """Process a circuit image sent as the raw request body."""
+    return await _analyze_upload(
+        lambda upload_reader: upload_reader.read_stream(
+            request.stream(),
+            content_length=upload_reader.parse_content_length(
+                request.headers.get("content-length")
+            )
+        ),
+        request.headers.get("content-type")
+    )
+
+
+@router.post("/retrieve-circuit-schema/stream")
+async def retrieve_circuit_schema_stream(
+    request: CircuitImageRequest,
+    accept: Optional[str] = Header(default=None)
+) -> StreamingResponse:
+    """Process base64 encoded circuit image, streaming progress events.
+
+    Emits "sheet_cropped", "circuit_description", one "component" and one
+    "connection" event per decision, then a final "result" event with the
+    SchemaImageResponse (or an "error" event). Sent as Server-Sent Events
+    when the client accepts text/event-stream, as NDJSON otherwise.
+    """
+    image_bytes = await ImageDecoder().decode_async(request.image_data)
+    ImageValidator(settings).validate(request.content_type, image_bytes)
+
+    return stream_analysis(lambda: _analyze_schema(image_bytes), accept)
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException
+from loguru import logger
+
+from app.api_schemas import (
+    ComponentsImageResponse,
+    JobRequest,
+    JobResponse,
+    SchemaImageResponse,
+)
+from app.core.config import get_settings
+from app.services.image_decoder import ImageDecoder
+from app.services.image_validation import ImageValidator
+from app.services.job_manager import Job, JobStatus, get_job_manager
+
+router = APIRouter()
+settings = get_settings()
+
+
+def _job_response(job: Job) -> JobResponse:
+    """Format a job, including its result once it succeeded."""
+    result = None
+    if job.status == JobStatus.SUCCEEDED:
+        if job.kind == "schema":
+            result = SchemaImageResponse(**job.result)
+        else:
+            result = ComponentsImageResponse(components=job.result)
+
+    return JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status.value,
+        result=result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest) -> JobResponse:
+    """Queue the analysis of a base64 encoded circuit image.
+
+    Returns immediately with the job id to poll; responds 429 when too
+    many jobs are already pending.
+    """
+    job_manager = get_job_manager()
+    if request.kind not in job_manager.kinds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"kind must be one of {', '.join(job_manager.kinds)}"
+        )
+
+    image_bytes = await ImageDecoder().decode_async(request.image_data)
+    ImageValidator(settings).validate(request.content_type, image_bytes)
+
+    job = job_manager.submit(request.kind, image_bytes)
+    logger.info(f"Queued {job.kind} job {job.id}")
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> JobResponse:
+    """Return the status of a job, with its result once finished."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
@@ -0,0 +1,13 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.core.metrics import get_metrics_registry
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Dict[str, Any]]:
+    """Return operational counters of the services (caches, queues, ...)."""
+    return get_metrics_registry().snapshot()
@@ -0,0 +1,96 @@
+"""
+Streaming of analysis progress as NDJSON or Server-Sent Events.
+
+The streaming endpoints run an analysis while listening to its progress
+events (see ``app.services.progress``) and forward each event to the
+client as soon as it is emitted, followed by a final "result" (or
+"error") event carrying the same body as the non-streaming endpoint.
+"""
+import asyncio
+import json
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+)
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.services.progress import listen_progress
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+def encode_ndjson(event: str, data: Dict[str, Any]) -> str:
+    """Encode an event as one line of newline-delimited JSON."""
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+def encode_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode an event as a Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_events(
+    analyze: Callable[[], Awaitable[BaseModel]],
+    encode: Callable[[str, Dict[str, Any]], str]
+) -> AsyncIterator[str]:
+    queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+
+    async def run() -> None:
+        def forward(event: str, data: Dict[str, Any]) -> None:
+            queue.put_nowait((event, data))
+
+        with listen_progress(forward):
+            try:
+                result = await analyze()
+                queue.put_nowait(("result", result.model_dump()))
+            except HTTPException as e:
+                queue.put_nowait((
+                    "error",
+                    {"status_code": e.status_code, "detail": e.detail}
+                ))
+            except Exception as e:
+                queue.put_nowait(
+                    ("error", {"status_code": 500, "detail": str(e)})
+                )
+            finally:
+                queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while (item := await queue.get()) is not None:
+            yield encode(*item)
+    finally:
+        # Stops the analysis if the client disconnects before the end
+        task.cancel()
+
+
+def stream_analysis(
+    analyze: Callable[[], Awaitable[BaseModel]],
+    accept: Optional[str]
+) -> StreamingResponse:
+    """Stream the progress and result of an analysis.
+
+    Args:
+        analyze: Coroutine function running the analysis and returning the
+            response model of the non-streaming endpoint.
+        accept: Accept header of the request; Server-Sent Events are sent
+            if it asks for text/event-stream, NDJSON otherwise.
+
+    Returns:
+        StreamingResponse: Response emitting one event per progress step.
+    """
+    if accept and SSE_MEDIA_TYPE in accept:
+        media_type, encode = SSE_MEDIA_TYPE, encode_sse
+    else:
+        media_type, encode = NDJSON_MEDIA_TYPE, encode_ndjson
+    return StreamingResponse(
+        _stream_events(analyze, encode),
+        media_type=media_type,
+        # Keep reverse proxies from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
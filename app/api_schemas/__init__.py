@@ -1,3 +1,10 @@
 from .components import Component, Connection
 from .image_requests import CircuitImageRequest
 from .image_responses import SchemaImageResponse, ComponentsImageResponse
+from .jobs import JobRequest, JobResponse
+from .batch import (
+    BatchImageRequest,
+    BatchItemError,
+    BatchItemResult,
+    BatchSchemaResponse,
+)
@@ -0,0 +1,87 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from .image_requests import CircuitImageRequest
+from .image_responses import SchemaImageResponse
+
+
+class BatchImageRequest(BaseModel):
+    """Schema for a batch of circuit images.
+
+    Attributes:
+        images: Base64 encoded images with their MIME types
+    """
+    images: List[CircuitImageRequest]
+
+
+class BatchItemError(BaseModel):
+    """Schema for the failure of one image of a batch.
+
+    Attributes:
+        status_code: HTTP status the single-image endpoint would return
+        detail: Error message
+    """
+    status_code: int
+    detail: str
+
+
+class BatchItemResult(BaseModel):
+    """Schema for the outcome of one image of a batch.
+
+    Attributes:
+        index: Position of the image in the batch
+        result: Circuit schema if the analysis succeeded
+        error: Failure details if it did not
+    """
+    index: int
+    result: Optional[SchemaImageResponse] = None
+    error: Optional[BatchItemError] = None
+
+
+class BatchSchemaResponse(BaseModel):
+    """Schema for the outcomes of a batch, in submission order.
+
+    Attributes:
+        results: One outcome per image
+    """
+    results: List[BatchItemResult]
+
+
+
+# OpenAPI descriptions of the batch endpoints, which read their bodies
+# themselves so that oversized batches are rejected while received. The
+# image schema refers to the component of the single-image endpoints.
+_BATCH_IMAGE_SCHEMA = BatchImageRequest.model_json_schema(
+    ref_template="#/components/schemas/{model}"
+)
+_BATCH_IMAGE_SCHEMA.pop("$defs", None)
+
+BATCH_IMAGE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": _BATCH_IMAGE_SCHEMA},
+        },
+    }
+}
+
+BATCH_UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "files": {
+                            "type": "array",
+                            "items": {"type": "string", "format": "binary"},
+                        },
+                    },
+                    "required": ["files"],
+                }
+            },
+        },
+    }
+}
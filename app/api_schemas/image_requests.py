@@ -9,4 +9,38 @@ class CircuitImageRequest(BaseModel):
         content_type: MIME type of the image
     """
     image_data: str
-    content_type: str = "image/png" 
\ No newline at end of file
+    content_type: str = "image/png"
+
+
+# OpenAPI description of endpoints that take the image as the raw body
+RAW_IMAGE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/octet-stream": {
+                "schema": {"type": "string", "format": "binary"}
+            },
+            "image/*": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+# OpenAPI description of endpoints that parse a multipart image upload
+# themselves, so that the body size is capped while it is received
+UPLOAD_IMAGE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                    },
+                    "required": ["file"],
+                }
+            },
+        },
+    }
+}
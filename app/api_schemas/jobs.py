@@ -0,0 +1,40 @@
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+from .image_requests import CircuitImageRequest
+from .image_responses import ComponentsImageResponse, SchemaImageResponse
+
+
+class JobRequest(CircuitImageRequest):
+    """Schema for submitting a circuit analysis job.
+
+    Attributes:
+        image_data: Base64 encoded image data
+        content_type: MIME type of the image
+        kind: Analysis to run, "schema" or "components"
+    """
+    kind: str = "schema"
+
+
+class JobResponse(BaseModel):
+    """Schema for the state of a job.
+
+    Attributes:
+        job_id: Identifier to poll the job with
+        kind: Analysis run by the job
+        status: One of queued, running, succeeded or failed
+        result: Analysis result once the job succeeded
+        error: Error message once the job failed
+        created_at: Submission time (epoch seconds)
+        started_at: Start time (epoch seconds)
+        finished_at: Completion time (epoch seconds)
+    """
+    job_id: str
+    kind: str
+    status: str
+    result: Optional[Union[SchemaImageResponse, ComponentsImageResponse]] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
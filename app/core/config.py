@@ -8,7 +8,7 @@ these settings.
 """
 
 from functools import lru_cache
-from typing import Dict
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -39,8 +39,142 @@ class Settings(BaseSettings):
     PHOENIX_ENDPOINT: str = "http://localhost:4317"
     PHOENIX_PROJECT_NAME: str = "llm-service"
 
+    # Base URL of an OpenAI-compatible server answering every LLM call
+    # instead of the providers, e.g. tests/benchmarks/fake_llm_server.py
+    LLM_API_BASE: Optional[str] = None
+
     # Concurrency settings
-    MAX_PARALLEL_REQUESTS: int = 1
+    # Limits shared by every request of the process (see LLMScheduler).
+    # MAX_PARALLEL_REQUESTS used to apply per service and per request, so
+    # concurrent requests each had their own calls in flight; it now caps
+    # the whole process and is sized for several requests at once.
+    MAX_PARALLEL_REQUESTS: int = 8  # LLM calls in flight
+    LLM_REQUESTS_PER_MINUTE: Optional[int] = None
+    LLM_TOKENS_PER_MINUTE: Optional[int] = None  # estimated tokens
+
+    # HTTP connection pool shared by the Groq and LiteLLM clients
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP2_ENABLED: bool = False  # requires the h2 package
+
+    # Retries of failed LLM calls; only the failed call is retried, with
+    # exponential backoff and full jitter (or the provider's Retry-After)
+    LLM_RETRY_MAX_ATTEMPTS: int = 3  # attempts per call, 1 disables retries
+    LLM_RETRY_BASE_DELAY: float = 0.5  # seconds, doubled for each retry
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_RETRY_BUDGET: float = 30.0  # seconds of retrying per analysis
+    # Also retry malformed JSON and responses failing schema validation
+    LLM_RETRY_INVALID_RESPONSES: bool = True
+
+    # Routing of MODEL_NAME calls over equivalent models ("groq/..." or any
+    # LiteLLM model) by EWMA latency and error rate; a backend failing
+    # LLM_BREAKER_FAILURE_THRESHOLD times in a row gets no traffic for
+    # LLM_BREAKER_COOLDOWN seconds. Empty disables routing.
+    LLM_BACKENDS: List[str] = []  # alternates to MODEL_NAME, JSON list
+    LLM_ROUTER_EWMA_ALPHA: float = 0.2
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_COOLDOWN: float = 30.0
+
+    # Hedged LLM calls: a call slower than LLM_HEDGE_PERCENTILE of the
+    # model's recent latency is duplicated (to LLM_HEDGE_MODEL if set, else
+    # to another of the LLM_BACKENDS) and the first valid response wins; at
+    # most LLM_HEDGE_MAX_FRACTION of the calls are hedged
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MAX_FRACTION: float = 0.1
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # latencies needed before hedging
+    LLM_HEDGE_MODEL: Optional[str] = None
+
+    # CPU-bound OpenCV work (sheet detection, LLM image preprocessing) runs
+    # on a thread pool so it does not stall the event loop; OpenCV releases
+    # the GIL. 0 runs it inline on the event loop.
+    CV_THREAD_POOL_SIZE: int = 4
+    # "process" runs the sheet-detection pipeline on CV_PROCESS_POOL_SIZE
+    # worker processes instead (default: one per CPU), which scales with
+    # cores where the thread pool contends on the GIL; decoded frames reach
+    # the workers through shared memory
+    CV_EXECUTOR: str = "thread"  # thread or process
+    CV_PROCESS_POOL_SIZE: Optional[int] = None
+    # Sheet detection searches the circuit on a copy of the photo decoded
+    # at 1/SHEET_DETECTION_SCALE resolution (2 or 4) and crops the
+    # full-resolution photo; 1 searches the full-resolution photo
+    SHEET_DETECTION_SCALE: int = 1
+    # Seconds between two probes of the event-loop lag reported in the
+    # "event_loop" metrics, 0 disables the probe
+    EVENT_LOOP_MONITOR_INTERVAL: float = 0.1
+
+    # Pipeline strategy settings
+    # "per_component" asks one presence question per component, "batched"
+    # answers all of them in one call (falling back to per_component)
+    COMPONENT_DETECTION_MODE: str = "per_component"
+    # "pairwise" asks one question per component pair, "batched" asks for
+    # the whole netlist in one call and re-checks pairwise only the pairs
+    # answered with a confidence below CONNECTION_VERIFY_THRESHOLD
+    CONNECTION_DETECTION_MODE: str = "pairwise"
+    CONNECTION_VERIFY_THRESHOLD: float = 0.7
+    # Start the connection checks of all candidate pairs together with the
+    # presence checks, cancelling those of absent components. At most
+    # SPECULATION_MAX_CALLS speculative LLM calls (verifications and retries
+    # included) are made per request, each only on a slot no other call
+    # is waiting for
+    SPECULATIVE_CONNECTIONS: bool = False
+    SPECULATION_MAX_CALLS: int = 6
+
+    # Identical analyses and deterministic LLM calls running concurrently
+    # share a single execution
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Batch endpoint settings
+    BATCH_MAX_ITEMS: int = 300
+    BATCH_MAX_CONCURRENCY: int = 8  # images analyzed at once per batch
+    BATCH_MAX_TOTAL_BYTES: int = 100 * 1024 * 1024  # all images of a batch
+
+    # Background job API settings
+    JOB_WORKERS: int = 4
+    JOB_MAX_PENDING: int = 100  # queued jobs before rejecting with 429
+    JOB_RESULT_TTL: float = 60 * 60  # seconds, 0 disables expiry
+
+    # Record/replay of LLM responses: "record" stores every provider
+    # response in LLM_CASSETTE_PATH, "replay" serves them without network
+    # access (sleeping the recorded latency if LLM_CASSETTE_EMULATE_LATENCY)
+    LLM_CASSETTE_MODE: str = "off"  # off, record or replay
+    LLM_CASSETTE_PATH: str = "tests/benchmarks/cassettes/llm.jsonl"
+    LLM_CASSETTE_EMULATE_LATENCY: bool = False
+
+    # Result cache settings
+    # Bump PROMPT_VERSION whenever a prompt defined in code changes so that
+    # cached results produced by the old prompt are no longer served.
+    PROMPT_VERSION: str = "1"
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 256
+    RESULT_CACHE_TTL: float = 24 * 60 * 60  # seconds, 0 disables expiry
+    RESULT_CACHE_SQLITE_PATH: Optional[str] = None
+    RESULT_CACHE_DISK_MAX_ENTRIES: int = 10_000
+
+    # LLM call memoization settings (only deterministic calls are cached)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 2048
+    LLM_CACHE_TTL: float = 7 * 24 * 60 * 60  # seconds, 0 disables expiry
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None
+    LLM_CACHE_DISK_MAX_ENTRIES: int = 100_000
+
+    # Preprocessing of images sent to the LLM, applied once per image
+    LLM_IMAGE_MAX_EDGE: Optional[int] = None  # longest side in pixels
+    LLM_IMAGE_GRAYSCALE: bool = False
+    LLM_IMAGE_BINARIZE: bool = False
+    LLM_IMAGE_FORMAT: str = "original"  # original, jpeg, webp or png
+    LLM_IMAGE_QUALITY: int = 90  # jpeg/webp quality
+
+    # Near-duplicate (perceptual hash) lookup settings
+    # Off by default: a hit serves the analysis of another photo
+    NEAR_DUPLICATE_ENABLED: bool = False
+    NEAR_DUPLICATE_THRESHOLD: int = 24  # max differing bits out of 256
+    NEAR_DUPLICATE_MAX_ENTRIES: int = 512
+    NEAR_DUPLICATE_TTL: float = 60 * 60  # seconds, 0 disables expiry
+    # Fraction of near-duplicate hits re-analyzed to measure false matches
+    NEAR_DUPLICATE_VERIFY_RATE: float = 0.1
 
     @property
     def COMPONENT_DESCRIPTIONS(self) -> Dict[str, Dict[str, str]]:
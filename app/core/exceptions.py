@@ -4,6 +4,18 @@ class ImageTooLargeError(HTTPException):
     def __init__(self):
         super().__init__(status_code=400, detail="File too large")
 
+class BatchTooLargeError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=413, detail="Batch too large")
+
+class InvalidContentLengthError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=400, detail="Invalid Content-Length header")
+
+class InvalidMultipartError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=400, detail="Invalid multipart/form-data body")
+
 class InvalidImageTypeError(HTTPException):
     def __init__(self):
         super().__init__(status_code=400, detail="File must be an image")
@@ -14,4 +26,8 @@ class AnalysisTimeoutError(HTTPException):
 
 class ConfigurationError(HTTPException):
     def __init__(self):
-        super().__init__(status_code=500, detail="Configuration error")
\ No newline at end of file
+        super().__init__(status_code=500, detail="Configuration error")
+
+class JobQueueFullError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=429, detail="Too many pending jobs")
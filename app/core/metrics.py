@@ -0,0 +1,112 @@
+"""
+In-process metrics registry.
+
+Services register named snapshot providers here so their operational
+counters (cache hits, queue depth, ...) can be exposed through a single
+endpoint without the API layer having to know about every service.
+"""
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable, Dict, Sequence
+
+MetricsProvider = Callable[[], Dict[str, Any]]
+
+# Upper bounds in seconds of the default latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+
+class LatencyHistogram:
+    """Cumulative histogram of durations with fixed bucket bounds."""
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            buckets: Increasing upper bounds of the buckets in seconds; an
+                unbounded bucket is always added.
+        """
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration.
+
+        Args:
+            seconds: The duration to record.
+        """
+        index = len(self._bounds)
+        for position, bound in enumerate(self._bounds):
+            if seconds <= bound:
+                index = position
+                break
+        self._counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the cumulative bucket counts, count and sum.
+
+        Returns:
+            Dict[str, Any]: Counts of durations at or below each bound
+            ("le" mapping, with "+Inf"), plus "count" and "sum".
+        """
+        cumulative: Dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self._bounds, self._counts):
+            running += count
+            cumulative[f"{bound:g}"] = running
+        cumulative["+Inf"] = running + self._counts[-1]
+        return {"le": cumulative, "count": self.count, "sum": self.total}
+
+
+class MetricsRegistry:
+    """Registry of named callables that return metric snapshots."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._providers: Dict[str, MetricsProvider] = {}
+        self._lock = Lock()
+
+    def register(self, name: str, provider: MetricsProvider) -> None:
+        """Register (or replace) a metrics provider.
+
+        Args:
+            name: Name under which the snapshot is reported.
+            provider: Callable returning a JSON-serializable dictionary.
+        """
+        with self._lock:
+            self._providers[name] = provider
+
+    def unregister(self, name: str) -> None:
+        """Remove a metrics provider if it is registered.
+
+        Args:
+            name: Name of the provider to remove.
+        """
+        with self._lock:
+            self._providers.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Collect the current snapshot of every registered provider.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Metrics keyed by provider name.
+        """
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: provider() for name, provider in providers.items()}
+
+
+@lru_cache()
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry singleton.
+
+    Returns:
+        MetricsRegistry: The shared registry instance.
+    """
+    return MetricsRegistry()
@@ -6,7 +6,8 @@ logging, and telemetry configuration.
 """
 import os
 import sys
-from typing import List
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -17,8 +18,16 @@ from openinference.instrumentation.litellm import LiteLLMInstrumentor
 from openinference.instrumentation.openai import OpenAIInstrumentor
 from phoenix.otel import register
 
-from app.api.endpoints import circuit_components, circuit_schema, health
+from app.api.endpoints import (
+    circuit_batch, circuit_components, circuit_schema, health, jobs, metrics
+)
+from app.core.config import get_settings
 from app.core.exceptions import ConfigurationError
+from app.services.cv_executor import get_cv_executor
+from app.services.cv_process_pool import get_cv_pipeline_executor
+from app.services.event_loop_monitor import get_event_loop_monitor
+from app.services.http_pool import get_http_pool
+from app.services.job_manager import get_job_manager
 
 # Constants
 PHOENIX_ENDPOINT: str = "http://localhost:4317"
@@ -55,6 +64,28 @@ def configure_logging() -> None:
         ]
     )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run the background job workers for the lifetime of the app.
+
+    The event-loop lag probe runs alongside them. The shared LLM connection
+    pool is opened on the serving loop, and released with the CV threads
+    (or processes) once the workers are stopped.
+    """
+    http_pool = get_http_pool()
+    http_pool.ensure_open()
+    job_manager = get_job_manager()
+    job_manager.start()
+    loop_monitor = get_event_loop_monitor()
+    if loop_monitor.interval > 0:
+        loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    await job_manager.stop()
+    await http_pool.aclose()
+    get_cv_pipeline_executor().shutdown()
+    get_cv_executor().shutdown()
+
 def create_application() -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -66,7 +97,8 @@ def create_application() -> FastAPI:
         title="Circuit Analysis API",
         description="API for analyzing electronic circuit components "
                    "using computer vision",
-        version="0.1.0"
+        version="0.1.0",
+        lifespan=lifespan
     )
 
     app.add_middleware(
@@ -88,11 +120,26 @@ def create_application() -> FastAPI:
         prefix=API_PREFIX, 
         tags=["circuit"]
     )
+    app.include_router(
+        circuit_batch.router,
+        prefix=API_PREFIX,
+        tags=["circuit"]
+    )
     app.include_router(
         health.router, 
         prefix=API_PREFIX, 
         tags=["health"]
     )
+    app.include_router(
+        jobs.router,
+        prefix=API_PREFIX,
+        tags=["jobs"]
+    )
+    app.include_router(
+        metrics.router,
+        prefix=API_PREFIX,
+        tags=["metrics"]
+    )
 
     return app
 
@@ -104,6 +151,9 @@ def verify_environment() -> None:
         ConfigurationError: If required environment variables are missing.
     """
     required_vars = ["GROQ_API_KEY"]
+    if get_settings().LLM_CASSETTE_MODE == "replay":
+        # Replayed responses need no provider credentials
+        required_vars = []
     missing_vars = [var for var in required_vars if not os.getenv(var)]
     
     if missing_vars:
@@ -1,5 +1,30 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
 class ComponentConnection(BaseModel):
-    is_connected: bool = Field(description="Whether the two components are connected or not")
\ No newline at end of file
+    is_connected: bool = Field(description="Whether the two components are connected or not")
+
+
+class ConnectionAssessment(BaseModel):
+    component_1: str = Field(
+        description="ID of the first component of the pair, exactly as listed in the question",
+    )
+    component_2: str = Field(
+        description="ID of the second component of the pair, exactly as listed in the question",
+    )
+    is_connected: bool = Field(
+        description="Whether the two components are directly connected by a wire with no other component in between",
+    )
+    confidence: float = Field(
+        ge=0.0,
+        le=1.0,
+        description="Confidence in the is_connected answer, from 0.0 (guess) to 1.0 (certain)",
+    )
+
+
+class CircuitNetlist(BaseModel):
+    connections: List[ConnectionAssessment] = Field(
+        description="One assessment for every component pair listed in the question",
+    )
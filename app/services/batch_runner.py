@@ -0,0 +1,98 @@
+"""
+Concurrent execution of a batch of analyses with per-item outcomes.
+
+A batch of circuit photos is analyzed with a bounded number of images in
+progress at once; the LLM calls of all of them still go through the
+process-wide scheduler of ``LLMService``. The failure of one item is
+recorded as its outcome instead of failing the whole batch.
+"""
+import asyncio
+from typing import (
+    AsyncIterator, Awaitable, Callable, Generic, List, Optional, Sequence,
+    TypeVar
+)
+
+T = TypeVar("T")
+
+
+class BatchItemOutcome(Generic[T]):
+    """Result or error of one item of a batch.
+
+    Attributes:
+        index (int): Position of the item in the batch
+        result (Optional[T]): Result of the item if it succeeded
+        error (Optional[Exception]): Exception raised by the item if it failed
+    """
+
+    def __init__(
+        self,
+        index: int,
+        result: Optional[T] = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        self.index = index
+        self.result = result
+        self.error = error
+
+
+class BatchRunner:
+    """Service running the items of a batch with bounded concurrency."""
+
+    def __init__(self, max_concurrency: int):
+        """Initialize the runner.
+
+        Args:
+            max_concurrency: Maximum number of items processed at once.
+        """
+        self._max_concurrency = max(1, max_concurrency)
+
+    async def run(
+        self,
+        items: Sequence[Callable[[], Awaitable[T]]]
+    ) -> AsyncIterator[BatchItemOutcome[T]]:
+        """Run every item and yield the outcomes as they complete.
+
+        Args:
+            items: Coroutine functions processing one item each.
+
+        Yields:
+            BatchItemOutcome[T]: Outcome of each item, in completion order.
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def run_item(
+            index: int,
+            item: Callable[[], Awaitable[T]]
+        ) -> BatchItemOutcome[T]:
+            async with semaphore:
+                try:
+                    return BatchItemOutcome(index, result=await item())
+                except Exception as e:
+                    return BatchItemOutcome(index, error=e)
+
+        tasks = [
+            asyncio.create_task(run_item(index, item))
+            for index, item in enumerate(items)
+        ]
+        try:
+            for next_outcome in asyncio.as_completed(tasks):
+                yield await next_outcome
+        finally:
+            # Stops the remaining items if the consumer goes away
+            for task in tasks:
+                task.cancel()
+
+    async def run_ordered(
+        self,
+        items: Sequence[Callable[[], Awaitable[T]]]
+    ) -> List[BatchItemOutcome[T]]:
+        """Run every item and return the outcomes in input order.
+
+        Args:
+            items: Coroutine functions processing one item each.
+
+        Returns:
+            List[BatchItemOutcome[T]]: One outcome per item.
+        """
+        outcomes = [outcome async for outcome in self.run(items)]
+        return sorted(outcomes, key=lambda outcome: outcome.index)
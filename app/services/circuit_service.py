@@ -1,36 +1,220 @@
 import base64
-from typing import Dict, Any, List
+import copy
+import hashlib
+import json
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import (
+    Awaitable, Callable, Dict, Any, Iterator, List, Optional, Tuple, Union
+)
 from app.services.component_identifier_service import ComponentIdentifierService
 from app.services.connection_identifier_service import ConnectionIdentifierService
 from app.services.sheet_detector_service import SheetDetectorService
+from app.services.image_context import ImageContext
+from app.services.image_preprocessor import ImageProfile
 from app.services.llm_client import LLMService
-from app.core.config import get_settings
+from app.services.result_cache import build_result_cache, make_cache_key
+from app.services.retry_policy import RetryBudget, retry_budget
+from app.services.perceptual_hash import PerceptualHashIndex
+from app.services.progress import emit_progress
+from app.services.single_flight import SingleFlight
+from app.services.speculative_analysis import SpeculativeSchemaAnalyzer
+from app.core.config import Settings, get_settings
+from app.core.metrics import LatencyHistogram, get_metrics_registry
 from loguru import logger
 settings = get_settings()
 llm_service = LLMService(settings)
+# Stateless services shared by all requests; LLM concurrency and rate limits
+# are enforced process-wide by the scheduler of llm_service
+component_identifier = ComponentIdentifierService(settings, llm_service)
+connection_identifier = ConnectionIdentifierService(settings, llm_service)
+sheet_detector = SheetDetectorService(
+    llm_service, detection_scale=settings.SHEET_DETECTION_SCALE
+)
+analysis_flights = None
+if settings.SINGLE_FLIGHT_ENABLED:
+    analysis_flights = SingleFlight()
+    get_metrics_registry().register(
+        "analysis_single_flight", analysis_flights.metrics
+    )
+speculative_analyzer = SpeculativeSchemaAnalyzer(
+    settings, component_identifier, connection_identifier
+)
+if settings.SPECULATIVE_CONNECTIONS:
+    get_metrics_registry().register(
+        "speculation", speculative_analyzer.stats.as_dict
+    )
+# Duration of each pipeline stage of the analyses actually run (cache hits
+# and coalesced requests are not timed)
+STAGE_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+stage_latency: Dict[str, LatencyHistogram] = defaultdict(
+    lambda: LatencyHistogram(STAGE_LATENCY_BUCKETS)
+)
+get_metrics_registry().register(
+    "analysis_stages",
+    lambda: {
+        stage: histogram.as_dict()
+        for stage, histogram in list(stage_latency.items())
+    }
+)
+result_cache = build_result_cache(settings)
+if result_cache is not None:
+    get_metrics_registry().register("result_cache", result_cache.metrics)
+near_duplicate_index = None
+if settings.NEAR_DUPLICATE_ENABLED:
+    near_duplicate_index = PerceptualHashIndex(
+        threshold=settings.NEAR_DUPLICATE_THRESHOLD,
+        max_entries=settings.NEAR_DUPLICATE_MAX_ENTRIES,
+        ttl_seconds=settings.NEAR_DUPLICATE_TTL
+    )
+    get_metrics_registry().register(
+        "near_duplicates", near_duplicate_index.metrics
+    )
 
-async def identify_components(image_bytes: bytes) -> set[str]:
-    identifier = ComponentIdentifierService(settings, llm_service)
-    return await identifier.identify_components(image_bytes)
+def _fingerprint_config(settings: Settings) -> str:
+    """Fingerprint the configuration that shapes the analysis results.
 
-async def identify_connections(components: set[str], image_bytes: bytes) -> List[Dict[str, Any]]:
-    identifier = ConnectionIdentifierService(settings, llm_service)
-    return await identifier.identify_connections(components, image_bytes)
+    Covers the TOML prompt configuration, the pipeline strategy, the models
+    answering the calls and the image profile sent to them, so that editing
+    a component description, switching detection mode, routing to another
+    backend or changing the image preprocessing invalidates results cached
+    with the previous setup.
 
-async def extract_sheet_image(image_bytes: bytes) -> bytes:
-    """Extract and process the circuit diagram from the uploaded image.
-    
     Args:
-        image_bytes: Raw image bytes containing the circuit diagram
-        
+        settings: Application settings
+
     Returns:
-        bytes: Processed image bytes of the extracted circuit
-        
+        str: SHA-256 hex digest of the configuration
+    """
+    return hashlib.sha256(
+        json.dumps(
+            {
+                "components": settings.COMPONENT_DESCRIPTIONS,
+                "strategy": [
+                    settings.COMPONENT_DETECTION_MODE,
+                    settings.CONNECTION_DETECTION_MODE,
+                    settings.CONNECTION_VERIFY_THRESHOLD,
+                    settings.SHEET_DETECTION_SCALE,
+                ],
+                "models": [
+                    settings.MODEL_NAME,
+                    settings.LLM_BACKENDS,
+                    settings.LLM_HEDGE_MODEL,
+                ],
+                "image_profile": ImageProfile.from_settings(settings).key,
+            },
+            sort_keys=True
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+_config_fingerprint = _fingerprint_config(settings)
+
+
+@contextmanager
+def _timed_stage(stage: str) -> Iterator[None]:
+    """Record the duration of a pipeline stage in its histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency[stage].observe(time.perf_counter() - start)
+
+
+def _result_cache_key(operation: str, image: ImageContext) -> str:
+    """Build the result cache key of an analysis of an image.
+
+    Args:
+        operation: Name of the analysis (e.g. "schema" or "components")
+        image: Decoded image being analyzed
+
+    Returns:
+        str: Key combining the image digest with everything that affects
+        the result: model, seed and prompt/config version.
+    """
+    return make_cache_key(
+        operation,
+        image.content_hash,
+        settings.MODEL_NAME,
+        str(settings.SEED),
+        settings.PROMPT_VERSION,
+        _config_fingerprint,
+    )
+
+
+# Results are copied in and out of the cache (and between the requests
+# sharing an analysis), so a caller mutating its response cannot change
+# what later requests receive.
+def _get_cached_result(cache_key: str) -> Optional[Any]:
+    if result_cache is None:
+        return None
+    return copy.deepcopy(result_cache.get(cache_key))
+
+
+def _store_result(cache_key: str, result: Any) -> None:
+    if result_cache is not None:
+        result_cache.set(cache_key, copy.deepcopy(result))
+
+
+async def _coalesce(
+    cache_key: str,
+    analyze: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Share one analysis among concurrent requests for the same result.
+
+    The LLM calls of the analysis share one LLM_RETRY_BUDGET for retrying
+    their failures.
+
+    Args:
+        cache_key: Result cache key identifying the analysis
+        analyze: Runs the analysis and stores its result
+
+    Returns:
+        Any: The result of the analysis
+    """
+    async def run() -> Any:
+        with retry_budget(RetryBudget(settings.LLM_RETRY_BUDGET)):
+            return await analyze()
+
+    if analysis_flights is None:
+        return await run()
+    return copy.deepcopy(await analysis_flights.do(cache_key, run))
+
+
+def _schema_signature(schema: Dict[str, Any]) -> Tuple[frozenset, frozenset]:
+    """Order-insensitive summary of a schema used to compare analyses."""
+    components = frozenset(
+        (component["id"], component["type"])
+        for component in schema["components"]
+    )
+    connections = frozenset(
+        frozenset((connection["component"], other))
+        for connection in schema["connections"]
+        for other in connection["connections"]
+    )
+    return components, connections
+
+
+ImageInput = Union[bytes, ImageContext]
+
+
+async def identify_components(image_bytes: ImageInput) -> set[str]:
+    return await component_identifier.identify_components(image_bytes)
+
+async def identify_connections(components: set[str], image_bytes: ImageInput) -> List[Dict[str, Any]]:
+    return await connection_identifier.identify_connections(
+        components, image_bytes
+    )
+
+async def _detect_sheet(image: ImageContext) -> Tuple[ImageContext, int]:
+    """Crop the circuit diagram and return it with its perceptual hash.
+
     Raises:
         ValueError: If circuit diagram cannot be detected in the image
     """
-    detector = SheetDetectorService(llm_service)
-    result = await detector.process_uploaded_image(image_bytes)
+    result = await sheet_detector.process_uploaded_image(image)
     
     if result["status"] != "Circuit diagram detected and cropped successfully.":
         raise ValueError("Failed to detect circuit diagram in image")
@@ -38,9 +222,24 @@ async def extract_sheet_image(image_bytes: bytes) -> bytes:
     if not result["cropped_image"]:
         raise ValueError("No circuit diagram found in processed image")
         
-    return result["cropped_image"]
+    return result["cropped_context"], result["perceptual_hash"]
+
+async def extract_sheet_image(image_bytes: ImageInput) -> bytes:
+    """Extract and process the circuit diagram from the uploaded image.
+    
+    Args:
+        image_bytes: Raw image bytes containing the circuit diagram
+        
+    Returns:
+        bytes: Processed image bytes of the extracted circuit
+        
+    Raises:
+        ValueError: If circuit diagram cannot be detected in the image
+    """
+    cropped_image, _ = await _detect_sheet(ImageContext.ensure(image_bytes))
+    return cropped_image.raw_bytes
 
-async def extract_schema(image_bytes: bytes) -> Dict[str, Any]:
+async def extract_schema(image_bytes: ImageInput) -> Dict[str, Any]:
     """Extract a full circuit schema from an image using the CircuitSchema model.
     
     This function:
@@ -49,24 +248,92 @@ async def extract_schema(image_bytes: bytes) -> Dict[str, Any]:
     3. Returns the analysis in CircuitSchema format
 
     If basic is False, we go into a more detailed analysis of the circuit
+
+    Results are cached by image content, so a repeated upload of the same
+    image is answered without any LLM call. A re-photographed sheet whose
+    crop is perceptually close to a recent one reuses that analysis, and
+    concurrent requests for the same image share a single analysis.
+
+    The image is wrapped in a single ImageContext, so every stage shares
+    one decoded copy and one base64 encoding of the original and the crop.
+
+    With SPECULATIVE_CONNECTIONS enabled, the connection checks start
+    together with the component stage instead of after it.
     """
-    page_image_bytes = await extract_sheet_image(image_bytes)
+    image = ImageContext.ensure(image_bytes)
+    cache_key = _result_cache_key("schema", image)
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        logger.info("Serving circuit schema from result cache")
+        return cached
+
+    return await _coalesce(cache_key, lambda: _analyze_schema(image, cache_key))
+
+async def _analyze_schema(image: ImageContext, cache_key: str) -> Dict[str, Any]:
+    """Run the schema analysis of an image that is not in the result cache."""
+    with _timed_stage("sheet_detection"):
+        page_image, sheet_hash = await _detect_sheet(image)
+    emit_progress("sheet_cropped", {
+        "width": page_image.width, "height": page_image.height
+    })
+
+    near_duplicate = None
+    if near_duplicate_index is not None:
+        near_duplicate = near_duplicate_index.find(sheet_hash)
+    if near_duplicate is not None:
+        reused_schema, distance = near_duplicate
+        if random.random() >= settings.NEAR_DUPLICATE_VERIFY_RATE:
+            logger.info(
+                f"Reusing analysis of a near-duplicate sheet "
+                f"(distance {distance})"
+            )
+            _store_result(cache_key, reused_schema)
+            return copy.deepcopy(reused_schema)
+        logger.info("Verifying near-duplicate match with a full analysis")
     
-    components = await identify_components(page_image_bytes)
-    logger.info(f"Components: {components}")
-    connections = await identify_connections(components, page_image_bytes)
+    if settings.SPECULATIVE_CONNECTIONS:
+        with _timed_stage("speculative_analysis"):
+            components, connections = await speculative_analyzer.analyze(
+                page_image
+            )
+        logger.info(f"Components: {components}")
+    else:
+        with _timed_stage("components"):
+            components = await identify_components(page_image)
+        logger.info(f"Components: {components}")
+        with _timed_stage("connections"):
+            connections = await identify_connections(components, page_image)
     logger.info(f"Connections: {connections}")
-    return {
+    schema = {
         "components": components,
         "connections": connections
     }
+    _store_result(cache_key, schema)
+    if near_duplicate_index is not None:
+        if near_duplicate is not None:
+            near_duplicate_index.record_verification(
+                _schema_signature(schema)
+                == _schema_signature(near_duplicate[0])
+            )
+        near_duplicate_index.add(sheet_hash, copy.deepcopy(schema))
+    return schema
 
-async def extract_components(image_bytes: bytes) -> List[str]:
+async def extract_components(image_bytes: ImageInput) -> List[str]:
     """Extract only the components list from the schema as return it as a list
 
     This is a simplified version of the full schema extraction
     """
+    image = ImageContext.ensure(image_bytes)
+    cache_key = _result_cache_key("components", image)
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        logger.info("Serving circuit components from result cache")
+        return cached
 
-    components_available = await identify_components(image_bytes)
+    async def analyze() -> List[str]:
+        with _timed_stage("components"):
+            components = list(await identify_components(image))
+        _store_result(cache_key, components)
+        return components
 
-    return list(components_available)
\ No newline at end of file
+    return await _coalesce(cache_key, analyze)
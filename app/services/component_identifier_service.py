@@ -1,15 +1,29 @@
-from typing import Set, Dict, Any, List, Tuple
+from typing import Set, Dict, Any, List, Tuple, Union
 from loguru import logger
+from app.services.image_context import ImageContext
 from app.services.llm_client import LLMService
+from app.services.progress import emit_progress
 from app.prompt_schemas.component_presence_schema import (
     BatteryPresence,
+    ComponentPresence,
     LEDPresence,
     ResistorPresence,
-    SwitchPresence
+    SwitchPresence,
+    build_component_presence_batch_schema
 )
 from app.core.config import Settings
+from collections import defaultdict
 import asyncio
 
+# Presence schemas written for specific components; the components of any
+# other TOML file in app/prompts/components use ComponentPresence
+PRESENCE_SCHEMAS = {
+    "battery": BatteryPresence,
+    "led": LEDPresence,
+    "resistor": ResistorPresence,
+    "switch": SwitchPresence,
+}
+
 
 class ComponentIdentifierService:
     def __init__(self, settings: Settings, llm_service: LLMService):
@@ -21,23 +35,21 @@ class ComponentIdentifierService:
         """
         self.llm_service = llm_service
         self.settings = settings
-        self._semaphore = asyncio.Semaphore(self.settings.MAX_PARALLEL_REQUESTS)
-        self.component_checkers = {
-            "battery": self._is_there_a_battery,
-            "led": self._is_there_a_led,
-            "resistor": self._is_there_a_resistor,
-            "switch": self._is_there_a_switch,
-        }
+        # Both detection modes check every TOML file in
+        # app/prompts/components, in this order
+        self.component_types = tuple(sorted(settings.COMPONENT_DESCRIPTIONS))
+        self.component_ids = self._assign_component_ids(self.component_types)
         self.circuit_description_prompt = (
-            "Starting at the top-left corner of the circuit diagram, describe in "
-            "detailed and clear terms how the shapes along the circuit line "
-            "appear as if you are walking along the path of the wire. Provide a "
-            "step-by-step \"tour\" of the circuit, describing every turn, "
-            "connection, or distinct feature you encounter, until you eventually "
-            "return to the starting point. Do not make any assumptions about the "
-            "specific components or symbols in the circuit—focus solely on "
-            "describing the physical shapes and structure of the lines as you "
-            "navigate them. Be as thorough and explicit as possible"
+            "Starting at the top-left corner of the circuit diagram, describe "
+            "in detailed and clear terms how the shapes along the circuit "
+            "line appear as if you are walking along the path of the wire. "
+            "Provide a step-by-step \"tour\" of the circuit, describing every "
+            "turn, connection, or distinct feature you encounter, until you "
+            "eventually return to the starting point. Do not make any "
+            "assumptions about the specific components or symbols in the "
+            "circuit—focus solely on describing the physical shapes and "
+            "structure of the lines as you navigate them. Be as thorough and "
+            "explicit as possible"
         )
 
     async def identify_components(
@@ -63,72 +75,220 @@ class ComponentIdentifierService:
         
         return description, components
 
-    async def _get_circuit_description(self, image_bytes: bytes) -> str:
+    async def _get_circuit_description(self, image: ImageContext) -> str:
         """Get a detailed description of the circuit layout.
 
         Args:
-            image_bytes: The image data as bytes.
+            image: The image shared by all calls of the request.
 
         Returns:
             str: Detailed description of the circuit layout.
         """
         response = await self.llm_service.communicate(
             prompt=self.circuit_description_prompt,
-            image_bytes=image_bytes,
+            image_bytes=image,
             temperature=self.settings.TEMPERATURE
         )
         return response
 
-    async def identify_components(self, image_bytes: bytes) -> List[Dict[str, str]]:
+    async def identify_components(
+        self,
+        image_bytes: Union[bytes, ImageContext]
+    ) -> List[Dict[str, str]]:
         """Given an image, identify the components present.
 
         Args:
-            image_bytes: The image data as bytes.
+            image_bytes: The image data as bytes, or an ImageContext shared
+                with the other stages of the request.
 
         Returns:
             List[Dict[str, str]]: List of components with their type and ID.
-            Example: [{"type": "battery", "id": "b1"}, {"type": "led", "id": "l1"}]
+            Example:
+            [{"type": "battery", "id": "b1"}, {"type": "led", "id": "l1"}]
         """
-        description = await self._get_circuit_description(image_bytes)
+        image = ImageContext.ensure(image_bytes)
+        description = await self._get_circuit_description(image)
         logger.info("Generated circuit description")
         logger.debug(f"Circuit description: {description}")
+        emit_progress("circuit_description", {"description": description})
 
-        async def check_component(name: str, checker: callable) -> tuple[str, bool]:
-            async with self._semaphore:
-                # Modify the checker functions to accept description parameter
-                result = await checker(image_bytes, description)
-                return name, result
-
-        # Run all component checks in parallel with semaphore control
-        tasks = [
-            check_component(name, checker)
-            for name, checker in self.component_checkers.items()
-        ]
-        results = await asyncio.gather(*tasks)
-        
-        # Convert results to dictionary
-        components = dict(results)
+        if self.settings.COMPONENT_DETECTION_MODE == "batched":
+            try:
+                components = await self._check_components_batched(
+                    image, description
+                )
+            except ValueError as e:
+                logger.warning(
+                    f"Batched presence check failed, falling back to "
+                    f"per-component checks: {e}"
+                )
+                components = await self._check_components_individually(
+                    image, description
+                )
+        else:
+            components = await self._check_components_individually(
+                image, description
+            )
         
         logger.debug(f"Identified components: {components}")
         component_list = [
-            {"type": component, "id": f"{component[0]}1"} 
+            self.component_entry(component)
             for component, presence in components.items() 
             if presence
         ]
         
         return component_list
 
+    def candidate_components(self) -> List[Dict[str, str]]:
+        """List every component identify_components can report.
+
+        Returns:
+            List[Dict[str, str]]: Components with their type and ID, in the
+            order identify_components reports them.
+        """
+        return [self.component_entry(name) for name in self.component_types]
+
+    def component_entry(self, component_type: str) -> Dict[str, str]:
+        """Build the component reported for a detected component type.
+
+        Args:
+            component_type: Name of the component type, e.g. "battery".
+
+        Returns:
+            Dict[str, str]: The component with its type and ID.
+        """
+        return {
+            "type": component_type,
+            "id": self.component_ids[component_type],
+        }
+
+    @staticmethod
+    def _assign_component_ids(
+        component_types: Tuple[str, ...]
+    ) -> Dict[str, str]:
+        """Give each component type a unique ID: its initial and a counter.
+
+        Types sharing an initial are numbered in order, e.g. "battery" and
+        "buzzer" become "b1" and "b2".
+        """
+        counters: Dict[str, int] = defaultdict(int)
+        component_ids = {}
+        for component_type in component_types:
+            prefix = component_type[0]
+            counters[prefix] += 1
+            component_ids[component_type] = f"{prefix}{counters[prefix]}"
+        return component_ids
+
+    async def _check_components_individually(
+        self,
+        image: ImageContext,
+        description: str
+    ) -> Dict[str, bool]:
+        """Ask one presence question per component type.
+
+        Args:
+            image: The image shared by all calls of the request.
+            description: Circuit layout description of the image.
+
+        Returns:
+            Dict[str, bool]: Presence of each component type.
+        """
+        async def check_component(name: str) -> Tuple[str, bool]:
+            schema = PRESENCE_SCHEMAS.get(name, ComponentPresence)
+            result = await self._check_component(
+                image, name, schema, description
+            )
+            self._emit_component(name, result)
+            return name, result
+
+        # Run all component checks in parallel; LLMService limits how many
+        # calls are in flight across all requests
+        tasks = [check_component(name) for name in self.component_types]
+        results = await asyncio.gather(*tasks)
+        
+        # Convert results to dictionary
+        return dict(results)
+
+    async def _check_components_batched(
+        self,
+        image: ImageContext,
+        description: str
+    ) -> Dict[str, bool]:
+        """Answer the presence of every configured component in one call.
+
+        The response schema holds one presence block per TOML file in
+        app/prompts/components, so new components need no code change.
+
+        Args:
+            image: The image shared by all calls of the request.
+            description: Circuit layout description of the image.
+
+        Returns:
+            Dict[str, bool]: Presence of each component type.
+
+        Raises:
+            ValueError: If the LLM call or response validation fails.
+        """
+        component_descriptions = self.settings.COMPONENT_DESCRIPTIONS
+        names = self.component_types
+        schema = build_component_presence_batch_schema(names)
+        criteria = "\n\n".join(
+            f"Component \"{name}\":\n"
+            f"{component_descriptions[name]['identification'].strip()}"
+            for name in names
+        )
+        prompt = (
+            "Given a circuit diagram, analyze it for each of the components "
+            "listed below.\n"
+            "\n"
+            "Context:\n"
+            "A detailed description of the circuit layout is provided below. "
+            "Use this description \n"
+            "along with the visual information to make your determination.\n"
+            "\n"
+            "Circuit Layout Description:\n"
+            f"{description}\n"
+            "\n"
+            f"{criteria}\n"
+            "\n"
+            "Important: \n"
+            "- Decide on each component independently, using only its own "
+            "criteria\n"
+            "- Focus on identifying definitive evidence of the component\n"
+            "- Consider both the visual representation and how it fits within "
+            "the described circuit path\n"
+        )
+
+        response = await self.llm_service.communicate(
+            prompt=prompt,
+            image_bytes=image,
+            schema=schema,
+            temperature=self.settings.TEMPERATURE
+        )
+        presence = {name: response[name]["is_present"] for name in names}
+        for name, is_present in presence.items():
+            self._emit_component(name, is_present)
+        return presence
+
+    def _emit_component(self, component_type: str, is_present: bool) -> None:
+        """Report the presence decision of a component as a progress event."""
+        emit_progress("component", {
+            **self.component_entry(component_type),
+            "is_present": is_present,
+        })
+
     async def _check_component(
         self, 
-        image_bytes: bytes, 
+        image: ImageContext, 
         component_name: str, 
         schema: Any,
         circuit_description: str
     ) -> bool:
         """Check for component presence using configured prompt."""
-        prompt = self.settings.COMPONENT_DESCRIPTIONS[component_name]["identification"]
+        descriptions = self.settings.COMPONENT_DESCRIPTIONS
+        prompt = descriptions[component_name]["identification"]
         return await self._check_component_base(
-            image_bytes, 
+            image, 
             prompt, 
             schema,
             circuit_description
@@ -136,44 +296,36 @@ class ComponentIdentifierService:
 
     async def _check_component_base(
         self, 
-        image_bytes: bytes, 
+        image: ImageContext, 
         prompt: str, 
         schema: Any,
         circuit_description: str
     ) -> bool:
-        # Using two shot prompting to help the LLM understand the circuit before identifying the component
-        enhanced_prompt = f"""Given a circuit diagram, analyze it for specific components.
-
-Context:
-A detailed description of the circuit layout is provided below. Use this description 
-along with the visual information to make your determination.
-
-Circuit Layout Description:
-{circuit_description}
-
-{prompt}
-
-Important: 
-- Focus on identifying definitive evidence of the component
-- Consider both the visual representation and how it fits within the described circuit path
-"""
+        # Using two shot prompting to help the LLM understand the circuit
+        # before identifying the component
+        enhanced_prompt = (
+            "Given a circuit diagram, analyze it for specific components.\n"
+            "\n"
+            "Context:\n"
+            "A detailed description of the circuit layout is provided below. "
+            "Use this description \n"
+            "along with the visual information to make your determination.\n"
+            "\n"
+            "Circuit Layout Description:\n"
+            f"{circuit_description}\n"
+            "\n"
+            f"{prompt}\n"
+            "\n"
+            "Important: \n"
+            "- Focus on identifying definitive evidence of the component\n"
+            "- Consider both the visual representation and how it fits within "
+            "the described circuit path\n"
+        )
 
         response = await self.llm_service.communicate(
             prompt=enhanced_prompt,
-            image_bytes=image_bytes,
+            image_bytes=image,
             schema=schema,
             temperature=self.settings.TEMPERATURE
         )
         return response['is_present']
-
-    async def _is_there_a_battery(self, image_bytes: bytes, description: str) -> bool:
-        return await self._check_component(image_bytes, "battery", BatteryPresence, description)
-
-    async def _is_there_a_resistor(self, image_bytes: bytes, description: str) -> bool:
-        return await self._check_component(image_bytes, "resistor", ResistorPresence, description)
-
-    async def _is_there_a_led(self, image_bytes: bytes, description: str) -> bool:
-        return await self._check_component(image_bytes, "led", LEDPresence, description)
-
-    async def _is_there_a_switch(self, image_bytes: bytes, description: str) -> bool:
-        return await self._check_component(image_bytes, "switch", SwitchPresence, description)
@@ -1,57 +1,119 @@
-from typing import Set, Dict, Any, List, Tuple
+from typing import Set, Dict, Any, List, Optional, Tuple, Union
 import asyncio
-from app.prompt_schemas.connection_schema import ComponentConnection
+from loguru import logger
+from app.prompt_schemas.connection_schema import CircuitNetlist, ComponentConnection
+from app.services.image_context import ImageContext
 from app.services.llm_client import LLMService
+from app.services.progress import emit_progress
 from app.core.config import Settings
 
+ComponentPair = Tuple[Dict[str, str], Dict[str, str]]
+
+
 class ConnectionIdentifierService:
 
     def __init__(self, settings: Settings, llm_service: LLMService):
         self.llm_service = llm_service
         self.settings = settings
-        self._semaphore = asyncio.Semaphore(self.settings.MAX_PARALLEL_REQUESTS)
-
-    async def _check_connection_with_semaphore(
-        self, comp1: str, comp2: str, image_bytes: bytes
-    ) -> bool:
-        """Wrapper for _check_connection that uses a semaphore."""
-        async with self._semaphore:
-            return await self._check_connection(comp1, comp2, image_bytes)
 
     async def identify_connections(
         self, 
         components: List[Dict[str, str]], 
-        image_bytes: bytes
+        image_bytes: Union[bytes, ImageContext]
     ) -> List[Dict[str, Any]]:
         """
         Identifies connections between components in the circuit.
         
         Args:
             components: List of component dictionaries with 'id' and 'type'
-            image_bytes: The circuit diagram image bytes
+            image_bytes: The circuit diagram image bytes, or an ImageContext
+                shared with the other stages of the request
             
         Returns:
             List of dictionaries containing component and their connections
         """
-        # Create all possible component pairs
-        connection_tasks = []
-        component_pairs: List[Tuple[Dict[str, str], Dict[str, str]]] = []
+        image = ImageContext.ensure(image_bytes)
+        component_pairs = self.component_pairs(components)
+        connection_results = await self.check_pairs(component_pairs, image)
+        return self.build_connections(
+            components, component_pairs, connection_results
+        )
+
+    @staticmethod
+    def component_pairs(
+        components: List[Dict[str, str]]
+    ) -> List[ComponentPair]:
+        """
+        Lists the pairs of components of different types to check.
+
+        Args:
+            components: List of component dictionaries with 'id' and 'type'
+
+        Returns:
+            List of component pairs
+        """
+        component_pairs: List[ComponentPair] = []
         
         for i, comp in enumerate(components):
             for other_comp in components[i + 1:]:
                 if other_comp["type"] != comp["type"]:
                     component_pairs.append((comp, other_comp))
-                    connection_tasks.append(
-                        self._check_connection_with_semaphore(
-                            comp["type"],
-                            other_comp["type"],
-                            image_bytes
-                        )
-                    )
-        
-        # Run all connection checks in parallel
-        connection_results = await asyncio.gather(*connection_tasks)
-        
+        return component_pairs
+
+    async def check_pairs(
+        self,
+        component_pairs: List[ComponentPair],
+        image: ImageContext
+    ) -> List[bool]:
+        """
+        Checks the connection of component pairs with the configured mode.
+
+        Args:
+            component_pairs: Pairs of components to check
+            image: The image shared by all calls of the request
+
+        Returns:
+            Whether each pair is connected, in input order
+        """
+        if not component_pairs:
+            return []
+        if self.settings.CONNECTION_DETECTION_MODE == "batched":
+            return await self._check_connections_batched(
+                component_pairs, image
+            )
+        return await self._check_connections_pairwise(component_pairs, image)
+
+    @staticmethod
+    def emit_connection(pair: ComponentPair, is_connected: bool) -> None:
+        """
+        Reports the decision on a component pair as a progress event.
+
+        Args:
+            pair: The pair of components that was checked
+            is_connected: Whether the components are connected
+        """
+        emit_progress("connection", {
+            "components": [pair[0]["id"], pair[1]["id"]],
+            "is_connected": is_connected,
+        })
+
+    @staticmethod
+    def build_connections(
+        components: List[Dict[str, str]],
+        component_pairs: List[ComponentPair],
+        connection_results: List[bool]
+    ) -> List[Dict[str, Any]]:
+        """
+        Formats pair results as the connections of each component.
+
+        Args:
+            components: List of component dictionaries with 'id' and 'type'
+            component_pairs: Pairs of components that were checked
+            connection_results: Whether each pair is connected
+
+        Returns:
+            List of dictionaries containing component and their connections
+        """
         # Build the connections map
         connections_map = {comp["id"]: [] for comp in components}
         
@@ -66,19 +128,224 @@ class ConnectionIdentifierService:
             for comp_id, connections in connections_map.items()
         ]
 
-    async def _check_connection(self, comp1: str, comp2: str, image_bytes: bytes) -> bool:
+    async def _check_connections_pairwise(
+        self,
+        component_pairs: List[ComponentPair],
+        image: ImageContext
+    ) -> List[bool]:
+        """Ask one connection question per component pair.
+
+        Args:
+            component_pairs: Pairs of components to check.
+            image: The image shared by all calls of the request.
+
+        Returns:
+            List[bool]: Whether each pair is connected, in input order.
+        """
+        # Run all connection checks in parallel; LLMService limits how many
+        # calls are in flight across all requests
+        return list(await asyncio.gather(*(
+            self._check_pair(pair, image) for pair in component_pairs
+        )))
+
+    async def _check_pair(
+        self,
+        pair: ComponentPair,
+        image: ImageContext
+    ) -> bool:
+        """Ask the connection question of one pair and report the answer."""
+        comp, other_comp = pair
+        is_connected = await self._check_connection(
+            comp["type"], other_comp["type"], image
+        )
+        self.emit_connection(pair, is_connected)
+        return is_connected
+
+    async def _check_connections_batched(
+        self,
+        component_pairs: List[ComponentPair],
+        image: ImageContext
+    ) -> List[bool]:
+        """Answer every component pair with a single netlist call.
+
+        Pairs the answer leaves out, contradicts itself on, or rates below
+        CONNECTION_VERIFY_THRESHOLD are re-checked with pairwise calls. If
+        the netlist call fails, every pair is checked pairwise; if the
+        re-check of a pair fails, the netlist answer of that pair is kept.
+
+        Args:
+            component_pairs: Pairs of components to check.
+            image: The image shared by all calls of the request.
+
+        Returns:
+            List[bool]: Whether each pair is connected, in input order.
+
+        Raises:
+            ValueError: If a pair the netlist left out cannot be checked.
+        """
+        prompt = self._generate_netlist_prompt(component_pairs)
+        try:
+            response = await self.llm_service.communicate(
+                prompt=prompt,
+                image_bytes=image,
+                schema=CircuitNetlist,
+                temperature=self.settings.TEMPERATURE
+            )
+            answers = self._symmetrize_netlist(
+                CircuitNetlist.model_validate(response), component_pairs
+            )
+        except ValueError as e:
+            logger.warning(
+                f"Batched connection check failed, falling back to "
+                f"pairwise checks: {e}"
+            )
+            return await self._check_connections_pairwise(
+                component_pairs, image
+            )
+
+        results: List[Optional[bool]] = []
+        uncertain: List[int] = []
+        for index, (comp, other_comp) in enumerate(component_pairs):
+            answer = answers.get(frozenset((comp["id"], other_comp["id"])))
+            if (
+                answer is None
+                or answer[1] < self.settings.CONNECTION_VERIFY_THRESHOLD
+            ):
+                uncertain.append(index)
+                results.append(None)
+            else:
+                results.append(answer[0])
+                self.emit_connection((comp, other_comp), answer[0])
+
+        if uncertain:
+            logger.info(
+                f"Verifying {len(uncertain)} of {len(component_pairs)} "
+                f"connections with pairwise checks"
+            )
+            verified = await asyncio.gather(*(
+                self._verify_pair(component_pairs[index], answers, image)
+                for index in uncertain
+            ))
+            for index, is_connected in zip(uncertain, verified):
+                results[index] = is_connected
+
+        return results
+
+    async def _verify_pair(
+        self,
+        pair: ComponentPair,
+        answers: Dict[frozenset, Tuple[bool, float]],
+        image: ImageContext
+    ) -> bool:
+        """Re-check an uncertain pair, keeping the netlist answer on failure.
+
+        Raises:
+            ValueError: If the check fails and the netlist left the pair out.
+        """
+        try:
+            return await self._check_pair(pair, image)
+        except ValueError as e:
+            answer = answers.get(frozenset((pair[0]["id"], pair[1]["id"])))
+            if answer is None:
+                raise
+            logger.warning(
+                f"Verifying {pair[0]['id']}-{pair[1]['id']} failed, keeping "
+                f"the netlist answer: {e}"
+            )
+            self.emit_connection(pair, answer[0])
+            return answer[0]
+
+    @staticmethod
+    def _symmetrize_netlist(
+        netlist: CircuitNetlist,
+        component_pairs: List[ComponentPair]
+    ) -> Dict[frozenset, Tuple[bool, float]]:
+        """Map each requested pair to its (is_connected, confidence) answer.
+
+        Assessments are treated as undirected. Those naming unknown
+        components, self-loops or pairs that were not asked are dropped,
+        and pairs answered inconsistently get zero confidence.
+
+        Args:
+            netlist: The validated LLM answer.
+            component_pairs: Pairs of components that were asked.
+
+        Returns:
+            Dict[frozenset, Tuple[bool, float]]: Answers keyed by the pair
+            of component IDs.
+        """
+        requested: Set[frozenset] = {
+            frozenset((comp["id"], other_comp["id"]))
+            for comp, other_comp in component_pairs
+        }
+        answers: Dict[frozenset, Tuple[bool, float]] = {}
+        for assessment in netlist.connections:
+            pair = frozenset((
+                assessment.component_1.strip(), assessment.component_2.strip()
+            ))
+            if pair not in requested:
+                logger.debug(f"Ignoring unexpected connection {assessment}")
+                continue
+            previous = answers.get(pair)
+            if previous is not None and previous[0] != assessment.is_connected:
+                answers[pair] = (assessment.is_connected, 0.0)
+            elif previous is None or assessment.confidence < previous[1]:
+                answers[pair] = (assessment.is_connected, assessment.confidence)
+        return answers
+
+    async def _check_connection(self, comp1: str, comp2: str, image: ImageContext) -> bool:
         """
         Checks if two components are connected in the circuit.
         """
         prompt = self._generate_connection_prompt(comp1, comp2)
         response = await self.llm_service.communicate(
             prompt=prompt,
-            image_bytes=image_bytes,
+            image_bytes=image,
             schema=ComponentConnection,
             temperature=self.settings.TEMPERATURE
         )
         return response["is_connected"]
 
+    def _generate_netlist_prompt(self, component_pairs: List[ComponentPair]) -> str:
+        """
+        Generates a prompt asking for the connection of every component pair at once.
+        """
+        components: Dict[str, str] = {}
+        for comp, other_comp in component_pairs:
+            components[comp["id"]] = comp["type"]
+            components[other_comp["id"]] = other_comp["type"]
+
+        component_lines = "\n".join(
+            f"        - {comp_id}: {comp_type} (represented as "
+            f"{self.settings.COMPONENT_DESCRIPTIONS[comp_type]['visual_representation']})"
+            for comp_id, comp_type in components.items()
+        )
+        pair_lines = "\n".join(
+            f"        - {comp['id']} and {other_comp['id']}"
+            for comp, other_comp in component_pairs
+        )
+
+        return f"""
+        You are analyzing a hand-sketched circuit diagram. Your task is to determine, for each pair 
+        of components listed below, whether there is a direct connection between them.
+
+        Components:
+{component_lines}
+
+        Pairs to assess:
+{pair_lines}
+
+        A connection exists if:
+        1. The components are directly connected by a continuous line
+        2. There shouldn't be any other components in between them just the line
+
+        Important rules:
+        - Give exactly one assessment per listed pair, using the component IDs above
+        - Assess each pair independently of the others
+        - Look for continuous lines or paths between the components
+        - Use a low confidence when the sketch is ambiguous for that pair
+        """
+
     def _generate_connection_prompt(self, comp1: str, comp2: str) -> str:
         """
         Generates a specific prompt for checking connection between two components.
@@ -101,4 +368,4 @@ class ConnectionIdentifierService:
         - Only focus on these two specific components
         - Ignore all other components unless they form part of the connection path
         - Look for continuous lines or paths between the components
-        """ 
\ No newline at end of file
+        """ 
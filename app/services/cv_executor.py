@@ -0,0 +1,130 @@
+"""
+Thread pool for the CPU-bound image work of a request.
+
+The OpenCV steps of sheet detection and LLM image preprocessing (JPEG
+decoding, resizing, blurring, edge detection, contour search, encoding)
+are synchronous and take tens of milliseconds on phone photos. Run on the
+event loop, they stall every other request in flight for that long.
+OpenCV releases the GIL while it works, so ``CVExecutor`` runs these steps
+on a small thread pool instead, where they also proceed in parallel.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import get_settings
+from app.core.metrics import get_metrics_registry
+
+T = TypeVar("T")
+
+
+class CVExecutor:
+    """Runs blocking image work on a lazily created thread pool."""
+
+    def __init__(self, max_workers: int) -> None:
+        """Initialize the executor; threads are started on first use.
+
+        Args:
+            max_workers: Size of the thread pool, 0 to run the work inline
+                on the calling thread (i.e. on the event loop).
+        """
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.tasks = 0
+        self.in_flight = 0
+        self.run_seconds = 0.0
+        self.queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="cv"
+            )
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on the pool and await its result.
+
+        The call sees the context variables of the caller, like
+        ``asyncio.to_thread``.
+
+        Args:
+            func: Blocking callable.
+            *args: Positional arguments of the callable.
+
+        Returns:
+            T: The value returned by the callable.
+        """
+        self.tasks += 1
+        if self.max_workers <= 0:
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self.run_seconds += time.perf_counter() - start
+
+        submitted = time.perf_counter()
+
+        def timed() -> T:
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                waited = start - submitted
+                with self._lock:
+                    self.run_seconds += time.perf_counter() - start
+                    self.queue_seconds += waited
+                    self.max_queue_seconds = max(
+                        self.max_queue_seconds, waited
+                    )
+
+        context = contextvars.copy_context()
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), functools.partial(context.run, timed)
+            )
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        """Stop the threads once their work is done (restarted on next use)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the pool size, load and time spent waiting for a thread.
+
+        Returns:
+            Dict[str, Any]: Thread count, tasks run and in flight, total
+            run time and queueing time (total and max) in seconds.
+        """
+        return {
+            "max_workers": self.max_workers,
+            "tasks": self.tasks,
+            "in_flight": self.in_flight,
+            "run_seconds": self.run_seconds,
+            "queue_seconds": self.queue_seconds,
+            "max_queue_seconds": self.max_queue_seconds,
+        }
+
+
+@lru_cache()
+def get_cv_executor() -> CVExecutor:
+    """Get the process-wide CV executor singleton.
+
+    Returns:
+        CVExecutor: The shared executor sized by CV_THREAD_POOL_SIZE,
+        registered as "cv_executor" metrics.
+    """
+    executor = CVExecutor(get_settings().CV_THREAD_POOL_SIZE)
+    get_metrics_registry().register("cv_executor", executor.metrics)
+    return executor
@@ -0,0 +1,314 @@
+"""
+Process pool for the OpenCV pipelines, with shared-memory frame transfer.
+
+Parts of the OpenCV pipelines (contour filtering, NumPy glue, the Python
+code between calls) hold the GIL, so on a many-core host the CV thread
+pool stops scaling once those parts contend. ``CVProcessExecutor`` runs
+the pipelines in worker processes instead. Pickling a decoded 12 MP frame
+to a worker would copy 36 MB through a pipe and again into the worker;
+here every NumPy array argument is copied once into a
+``multiprocessing.shared_memory`` block that the worker maps without
+copying, and the block is released once the worker is done with it.
+``ImageContext`` arguments hand their frame over: it is moved into the
+block (decoded into it if the context has not decoded it yet), so the
+caller does not hold the frame twice. Workers are expected to return
+small results (crop coordinates, encoded bytes).
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar, Union
+)
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.metrics import get_metrics_registry
+from app.services.cv_executor import CVExecutor, get_cv_executor
+from app.services.image_context import ImageContext
+
+T = TypeVar("T")
+
+
+class SharedFrame(NamedTuple):
+    """Picklable handle of an array stored in shared memory."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedImage(NamedTuple):
+    """Picklable handle of an ImageContext with its frame in shared memory."""
+    raw_bytes: bytes
+    mime_type: str
+    frame: Optional[SharedFrame]  # None if the image is not decodable
+
+
+def _share_array(array: np.ndarray, blocks: List[SharedMemory]) -> SharedFrame:
+    """Copy an array into a new shared memory block, added to ``blocks``."""
+    block = SharedMemory(create=True, size=max(1, array.nbytes))
+    blocks.append(block)
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return SharedFrame(block.name, array.shape, array.dtype.str)
+
+
+def _share_arrays(
+    args: Tuple[Any, ...]
+) -> Tuple[Tuple[Any, ...], List[SharedMemory]]:
+    """Copy the array and image arguments into new shared memory blocks.
+
+    Image contexts give up their decoded frame, which the block replaces.
+
+    Returns:
+        Tuple[Tuple[Any, ...], List[SharedMemory]]: The arguments with
+        arrays and images replaced by their SharedFrame and SharedImage
+        handles, and the blocks.
+    """
+    shipped = []
+    blocks: List[SharedMemory] = []
+    try:
+        for arg in args:
+            if isinstance(arg, np.ndarray):
+                shipped.append(_share_array(arg, blocks))
+            elif isinstance(arg, ImageContext):
+                frame = arg.take_array()
+                shipped.append(SharedImage(
+                    arg.raw_bytes,
+                    arg.mime_type,
+                    None if frame is None else _share_array(frame, blocks)
+                ))
+                del frame
+            else:
+                shipped.append(arg)
+    except BaseException:
+        _release(blocks)
+        raise
+    return tuple(shipped), blocks
+
+
+def _release(blocks: List[SharedMemory]) -> None:
+    """Unmap and delete shared memory blocks created by this process."""
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _release_staged(staging: "asyncio.Future[Any]") -> None:
+    """Release the blocks of a staging abandoned by its caller."""
+    if not staging.cancelled() and staging.exception() is None:
+        _, blocks = staging.result()
+        _release(blocks)
+
+
+def _init_worker() -> None:
+    """Keep each worker on one core; the pool provides the parallelism."""
+    cv2.setNumThreads(1)
+
+
+def _map_frame(frame: SharedFrame, blocks: List[SharedMemory]) -> np.ndarray:
+    """Worker side: map a shared frame, its block added to ``blocks``."""
+    block = SharedMemory(name=frame.name)
+    blocks.append(block)
+    return np.ndarray(frame.shape, np.dtype(frame.dtype), buffer=block.buf)
+
+
+def _run_with_frames(func: Callable[..., T], args: Tuple[Any, ...]) -> T:
+    """Worker side: map the shared frames, then call the function."""
+    blocks: List[SharedMemory] = []
+    resolved = []
+    for arg in args:
+        if isinstance(arg, SharedFrame):
+            resolved.append(_map_frame(arg, blocks))
+        elif isinstance(arg, SharedImage):
+            resolved.append(ImageContext(
+                arg.raw_bytes,
+                mime_type=arg.mime_type,
+                array=(
+                    None if arg.frame is None
+                    else _map_frame(arg.frame, blocks)
+                )
+            ))
+        else:
+            resolved.append(arg)
+    try:
+        return func(*resolved)
+    finally:
+        del resolved
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # A view escaped (e.g. held by a traceback); the mapping
+                # is released when it is garbage collected
+                pass
+
+
+class CVProcessExecutor:
+    """Runs CV pipelines on worker processes fed through shared memory."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        stager: Optional[CVExecutor] = None
+    ) -> None:
+        """Initialize the executor; workers are spawned on first use.
+
+        Args:
+            max_workers: Number of worker processes, the CPU count if None.
+            stager: Thread executor copying the frames into shared memory,
+                so the copy does not block the event loop. Copied inline
+                if None.
+        """
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self._stager = stager or CVExecutor(0)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.tasks = 0
+        self.in_flight = 0
+        self.shared_bytes = 0
+        self.worker_restarts = 0
+        self.run_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Workers are spawned: forking a process running the event
+            # loop, HTTP clients and thread pools is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on a worker process and await its result.
+
+        NumPy array arguments reach the worker through shared memory as
+        arrays of the same shape and dtype. ImageContext arguments reach
+        it as contexts whose frame is in shared memory, and no longer hold
+        their decoded frame (it is decoded again if used later). Other
+        arguments and the result are pickled.
+
+        Args:
+            func: Module-level (picklable) callable.
+            *args: Positional arguments of the callable.
+
+        Returns:
+            T: The value returned by the callable.
+
+        Raises:
+            BrokenProcessPool: If a worker died; the pool is rebuilt on the
+                next call.
+        """
+        self.tasks += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            pool = self._get_pool()
+            shipped, blocks = await self._stage(args)
+            self.shared_bytes += sum(block.size for block in blocks)
+            try:
+                return await asyncio.wrap_future(
+                    self._submit(pool, func, shipped, blocks)
+                )
+            except BrokenProcessPool:
+                logger.error("A CV worker process died; restarting the pool")
+                if self._pool is pool:
+                    self._pool = None
+                    self.worker_restarts += 1
+                    pool.shutdown(wait=False)
+                raise
+        finally:
+            self.in_flight -= 1
+            self.run_seconds += time.perf_counter() - start
+
+    @staticmethod
+    def _submit(
+        pool: ProcessPoolExecutor,
+        func: Callable[..., T],
+        shipped: Tuple[Any, ...],
+        blocks: List[SharedMemory]
+    ) -> "Future[T]":
+        """Submit a call whose blocks are released once it has settled.
+
+        The worker keeps running (or has yet to map the blocks) when the
+        caller is cancelled, so the blocks must not be released with the
+        caller; a cancelled call that never started settles at once.
+        """
+        try:
+            future = pool.submit(_run_with_frames, func, shipped)
+        except BaseException:
+            _release(blocks)
+            raise
+        future.add_done_callback(lambda _: _release(blocks))
+        return future
+
+    async def _stage(
+        self,
+        args: Tuple[Any, ...]
+    ) -> Tuple[Tuple[Any, ...], List[SharedMemory]]:
+        """Share the arguments on the stager, releasing them if cancelled."""
+        staging = asyncio.ensure_future(
+            self._stager.run(_share_arrays, args)
+        )
+        try:
+            return await asyncio.shield(staging)
+        except asyncio.CancelledError:
+            staging.add_done_callback(_release_staged)
+            raise
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (respawned on next use)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the pool size, load and shared memory traffic.
+
+        Returns:
+            Dict[str, Any]: Worker count, tasks run and in flight, total
+            time in calls (seconds), bytes passed through shared memory and
+            restarts after a worker died.
+        """
+        return {
+            "max_workers": self.max_workers,
+            "tasks": self.tasks,
+            "in_flight": self.in_flight,
+            "run_seconds": self.run_seconds,
+            "shared_bytes": self.shared_bytes,
+            "worker_restarts": self.worker_restarts,
+        }
+
+
+@lru_cache()
+def get_cv_pipeline_executor() -> Union[CVExecutor, CVProcessExecutor]:
+    """Get the executor of the OpenCV pipelines selected by CV_EXECUTOR.
+
+    Returns:
+        Union[CVExecutor, CVProcessExecutor]: The shared CV thread pool
+        ("thread"), or a process pool of CV_PROCESS_POOL_SIZE workers
+        registered as "cv_process_pool" metrics ("process").
+
+    Raises:
+        ValueError: If CV_EXECUTOR is neither "thread" nor "process".
+    """
+    settings = get_settings()
+    if settings.CV_EXECUTOR == "thread":
+        return get_cv_executor()
+    if settings.CV_EXECUTOR != "process":
+        raise ValueError(
+            f"CV_EXECUTOR must be 'thread' or 'process', "
+            f"not {settings.CV_EXECUTOR!r}"
+        )
+    executor = CVProcessExecutor(
+        settings.CV_PROCESS_POOL_SIZE, stager=get_cv_executor()
+    )
+    get_metrics_registry().register("cv_process_pool", executor.metrics)
+    return executor
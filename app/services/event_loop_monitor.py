@@ -0,0 +1,102 @@
+"""
+Event-loop lag probe.
+
+A coroutine that sleeps for a fixed interval wakes up late by however
+long the loop was busy running synchronous code. ``EventLoopLagMonitor``
+measures that delay continuously, so work that blocks the loop (and
+every request waiting on it) shows up in the metrics.
+"""
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import get_settings
+from app.core.metrics import LatencyHistogram, get_metrics_registry
+
+# Upper bounds in seconds of the lag histogram buckets
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop runs a periodic wake-up."""
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        """Initialize a stopped monitor.
+
+        Args:
+            interval: Seconds between two probes.
+            clock: Monotonic clock, replaceable in tests.
+        """
+        self.interval = interval
+        self._clock = clock
+        self._task: Optional[asyncio.Task] = None
+        self.histogram = LatencyHistogram(LAG_BUCKETS)
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        """Start probing the running event loop (no-op if running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._probe())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _probe(self) -> None:
+        while True:
+            start = self._clock()
+            await asyncio.sleep(self.interval)
+            self.record(self._clock() - start - self.interval)
+
+    def record(self, lag: float) -> None:
+        """Record how late one wake-up was.
+
+        Args:
+            lag: Delay past the scheduled wake-up in seconds.
+        """
+        lag = max(0.0, lag)
+        self.histogram.observe(lag)
+        self.max_lag = max(self.max_lag, lag)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the lag distribution.
+
+        Returns:
+            Dict[str, Any]: Probe interval, max and mean lag, the total
+            lag ("blocked_seconds", a lower bound of the time the loop was
+            blocked) and the lag histogram, all in seconds.
+        """
+        count = self.histogram.count
+        return {
+            "interval": self.interval,
+            "probes": count,
+            "max_lag": self.max_lag,
+            "mean_lag": self.histogram.total / count if count else 0.0,
+            "blocked_seconds": self.histogram.total,
+            "lag": self.histogram.as_dict(),
+        }
+
+
+@lru_cache()
+def get_event_loop_monitor() -> EventLoopLagMonitor:
+    """Get the process-wide event-loop monitor singleton.
+
+    Returns:
+        EventLoopLagMonitor: The shared monitor probing every
+        EVENT_LOOP_MONITOR_INTERVAL seconds, registered as "event_loop"
+        metrics.
+    """
+    monitor = EventLoopLagMonitor(get_settings().EVENT_LOOP_MONITOR_INTERVAL)
+    get_metrics_registry().register("event_loop", monitor.metrics)
+    return monitor
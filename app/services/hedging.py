@@ -0,0 +1,231 @@
+"""
+Hedged LLM requests.
+
+The latency of an analysis is that of its slowest check, so a single slow
+provider response dominates the tail. ``RequestHedger`` tracks the recent
+latency of each model; when a call has not answered by a high percentile
+of it, a duplicate call is started (possibly to another model), the first
+valid response wins and the other call is cancelled. Hedges are paid from
+a token bucket refilled by a fixed fraction of every call, so they never
+exceed that fraction of the traffic, even in bursts.
+"""
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from typing import (
+    Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+
+    def __init__(self, window: int = 200) -> None:
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent latencies kept.
+        """
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def observe(self, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        self._latencies.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency below which the given share of recent calls answered.
+
+        Args:
+            percentile: Percentile between 0 and 100.
+
+        Returns:
+            Optional[float]: Latency in seconds (nearest rank), or None if no
+            latency was recorded.
+        """
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        rank = math.ceil(percentile / 100 * len(ordered))
+        return ordered[min(len(ordered), max(1, rank)) - 1]
+
+
+class HedgeBudget:
+    """Token bucket limiting hedges to a fraction of all calls."""
+
+    def __init__(self, max_fraction: float, max_tokens: float = 10.0) -> None:
+        """Initialize an empty bucket.
+
+        Args:
+            max_fraction: Tokens earned per call; a hedge costs one token.
+            max_tokens: Bucket capacity, bounding a burst of hedges after a
+                quiet period.
+        """
+        self.max_fraction = max_fraction
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+
+    def deposit(self) -> None:
+        """Earn the share of a new call."""
+        self._tokens = min(self.max_tokens, self._tokens + self.max_fraction)
+
+    def try_spend(self) -> bool:
+        """Take the token of a hedge if one is available."""
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class HedgeStats:
+    """Counters of hedged calls.
+
+    Attributes:
+        calls (int): Calls run through the hedger
+        hedges (int): Duplicate calls started
+        hedge_wins (int): Calls answered by the duplicate first
+        budget_denied (int): Slow calls not hedged for lack of budget
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters for the metrics registry."""
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+        }
+
+
+class RequestHedger:
+    """Service duplicating calls slower than a latency percentile."""
+
+    def __init__(
+        self,
+        percentile: float,
+        max_fraction: float,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Initialize the hedger.
+
+        Args:
+            percentile: Percentile of recent latency after which a call is
+                hedged.
+            max_fraction: Maximum share of calls that may be hedged.
+            min_samples: Latencies recorded for a model before its calls
+                are hedged.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self.percentile = percentile
+        self._min_samples = min_samples
+        self._clock = clock
+        self._budget = HedgeBudget(max_fraction)
+        self._trackers: Dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+        self.stats = HedgeStats()
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds after which a call of a model is hedged.
+
+        Args:
+            key: Model (or backend) the call is routed to.
+
+        Returns:
+            Optional[float]: The latency percentile, or None while too few
+            latencies are known.
+        """
+        tracker = self._trackers[key]
+        if len(tracker) < self._min_samples:
+            return None
+        return tracker.percentile(self.percentile)
+
+    async def run(
+        self,
+        key: str,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run a call, hedging it if it is slower than usual.
+
+        Args:
+            key: Model (or backend) the primary call is routed to.
+            primary: Starts the call.
+            hedge: Starts the duplicate call.
+
+        Only the latency of primary calls is recorded: a duplicate may go
+        to another model and waits for its own slot.
+
+        Returns:
+            T: The first successful response.
+
+        Raises:
+            Exception: The error of the primary call if no call succeeded.
+        """
+        self.stats.calls += 1
+        self._budget.deposit()
+        delay = self.hedge_delay(key)
+        tracker = self._trackers[key]
+
+        tasks = [asyncio.ensure_future(self._timed(primary, tracker))]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    if self._budget.try_spend():
+                        self.stats.hedges += 1
+                        tasks.append(asyncio.ensure_future(hedge()))
+                    else:
+                        self.stats.budget_denied += 1
+            return await self._first_success(tasks)
+        finally:
+            # Cancels the loser, or both calls if the caller went away
+            for task in tasks:
+                task.cancel()
+
+    async def _timed(
+        self,
+        call: Callable[[], Awaitable[T]],
+        tracker: LatencyTracker
+    ) -> T:
+        start = self._clock()
+        result = await call()
+        tracker.observe(self._clock() - start)
+        return result
+
+    async def _first_success(self, tasks: List["asyncio.Future[T]"]) -> T:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in tasks:
+                if task in done and task.exception() is None:
+                    if task is not tasks[0]:
+                        self.stats.hedge_wins += 1
+                    return task.result()
+        raise tasks[0].exception()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return hedge counters and the current hedge delay per model.
+
+        Returns:
+            Dict[str, Any]: Hedging metrics for the metrics registry.
+        """
+        return {
+            **self.stats.as_dict(),
+            "percentile": self.percentile,
+            "hedge_after_seconds": {
+                key: self.hedge_delay(key) for key in list(self._trackers)
+            },
+        }
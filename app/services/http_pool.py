@@ -0,0 +1,168 @@
+"""
+Shared HTTP connection pool for the LLM provider clients.
+
+Both the Groq SDK and LiteLLM talk to their providers over httpx. Left to
+their defaults, each picks its own transport with no control over pool
+size, keep-alive or connect timeouts, and bursts of calls pay for new TCP
+and TLS handshakes. ``HTTPConnectionPool`` owns one tuned
+``httpx.AsyncClient`` that both backends reuse, and reports how well its
+connections are being reused. Connections are bound to the event loop that
+opened them, so the client belongs to one loop: the app opens it in its
+lifespan and closes it on shutdown, and a client is rebuilt when used from
+another loop.
+"""
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import httpx
+import litellm
+from loguru import logger
+
+from app.core.config import Settings, get_settings
+from app.core.metrics import get_metrics_registry
+
+
+class HTTPConnectionPool:
+    """Shared ``httpx.AsyncClient`` of the running loop, sized from the settings."""
+
+    def __init__(self, settings: Settings) -> None:
+        """Initialize the pool; the client is created on first use.
+
+        Args:
+            settings: Application settings with the HTTP_* pool options.
+        """
+        self._settings = settings
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self.requests = 0
+        self.new_connections = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The client of the running loop, rebuilt if it has been closed.
+
+        Must be used from a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+            self._loop = loop
+        elif self._loop is not loop:
+            # The connections of the previous loop cannot be closed from
+            # this one; they are dropped with the client
+            logger.debug("Rebuilding the HTTP client for a new event loop")
+            self._client = self._build_client()
+            self._loop = loop
+        return self._client
+
+    def ensure_open(self) -> httpx.AsyncClient:
+        """Make sure the running loop has an open client.
+
+        Builds it (and installs it as LiteLLM's session) unless it already
+        exists; called at app startup and before every LiteLLM call.
+
+        Returns:
+            httpx.AsyncClient: The client.
+        """
+        return self.client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        settings = self._settings
+        http2 = settings.HTTP2_ENABLED
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning(
+                    "HTTP2_ENABLED is set but the h2 package is not "
+                    "installed; falling back to HTTP/1.1"
+                )
+                http2 = False
+
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=httpx.Timeout(
+                settings.LLM_API_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT
+            ),
+            event_hooks={"request": [self._on_request]},
+        )
+        # LiteLLM takes the session of its OpenAI-compatible providers from
+        # a module global, so it follows the client of the current loop
+        litellm.aclient_session = client
+        return client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        """Count the request and trace whether it opens a new connection."""
+        self.requests += 1
+        previous_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+
+    async def aclose(self) -> None:
+        """Close the client and its connections (it is rebuilt on next use).
+
+        Must be called from the loop the client belongs to.
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        if litellm.aclient_session is self._client:
+            litellm.aclient_session = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return pool utilization and connection reuse figures.
+
+        Returns:
+            Dict[str, Any]: Open/active/idle connections, utilization of
+            HTTP_MAX_CONNECTIONS, and the share of requests served on an
+            already open connection.
+        """
+        connections = []
+        if self._client is not None and not self._client.is_closed:
+            # httpx does not expose its pool; httpcore's pool lists its
+            # connections publicly.
+            pool = getattr(self._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        active = len(connections) - idle
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "max_connections": self._settings.HTTP_MAX_CONNECTIONS,
+            "open_connections": len(connections),
+            "active_connections": active,
+            "idle_connections": idle,
+            "utilization": active / self._settings.HTTP_MAX_CONNECTIONS,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": reused / self.requests if self.requests else 0.0,
+        }
+
+
+@lru_cache()
+def get_http_pool() -> HTTPConnectionPool:
+    """Get the process-wide connection pool singleton.
+
+    Returns:
+        HTTPConnectionPool: The shared pool, registered as "http_pool"
+        metrics.
+    """
+    pool = HTTPConnectionPool(get_settings())
+    get_metrics_registry().register("http_pool", pool.metrics)
+    return pool
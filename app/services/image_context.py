@@ -0,0 +1,250 @@
+"""
+Per-request image holder shared by every pipeline stage.
+
+An ``ImageContext`` wraps the bytes of one image and memoizes everything
+derived from them (content hash, decoded array, base64 data URL, JPEG
+encoding) so that a request decodes, hashes and encodes each image once,
+no matter how many LLM calls or CV steps consume it.
+"""
+import base64
+import hashlib
+import io
+from typing import (
+    Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar, Union
+)
+
+import cv2
+import numpy as np
+from PIL import Image
+
+T = TypeVar("T")
+
+# Magic-number prefixes of the image formats accepted by the API
+_MIME_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+# EXIF orientations displayed rotated by 90 degrees (width and height swap)
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+_EXIF_ORIENTATION = 0x0112
+
+
+def sniff_mime_type(image_bytes: bytes, default: str = "image/jpeg") -> str:
+    """Detect the MIME type of encoded image bytes from their header.
+
+    Args:
+        image_bytes: Encoded image bytes.
+        default: Type returned when the format is not recognized.
+
+    Returns:
+        str: The detected MIME type, ``default`` if unknown.
+    """
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime_type in _MIME_SIGNATURES:
+        if image_bytes.startswith(signature):
+            return mime_type
+    return default
+
+
+class cached_property(Generic[T]):
+    """Lock-free ``functools.cached_property``.
+
+    Before Python 3.12, ``functools.cached_property`` holds a lock shared
+    by every instance of the class while computing, which would serialize
+    the decoding of unrelated images on the CV thread pool. Two threads
+    computing the same value concurrently both do the work instead; the
+    results are equal.
+    """
+
+    def __init__(self, func: Callable[[Any], T]) -> None:
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> T:
+        if instance is None:
+            return self
+        # Stored in the instance dict, which takes precedence from now on
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+class ImageContext:
+    """Encoded image bytes plus lazily memoized derived representations.
+
+    Attributes:
+        raw_bytes (bytes): The encoded image exactly as received/produced
+        mime_type (str): MIME type of ``raw_bytes``
+    """
+
+    def __init__(
+        self,
+        raw_bytes: bytes,
+        mime_type: Optional[str] = None,
+        array: Optional[np.ndarray] = None
+    ) -> None:
+        """Initialize the context.
+
+        Args:
+            raw_bytes: Encoded image bytes.
+            mime_type: MIME type of the bytes; sniffed when omitted.
+            array: Already decoded BGR image matching ``raw_bytes``, if
+                the caller has one, so it is not decoded again.
+        """
+        self.raw_bytes = raw_bytes
+        self.mime_type = mime_type or sniff_mime_type(raw_bytes)
+        self._derived: Dict[Hashable, Any] = {}
+        if array is not None:
+            self.__dict__["array"] = array
+
+    @classmethod
+    def from_array(
+        cls,
+        array: np.ndarray,
+        extension: str = ".jpg"
+    ) -> "ImageContext":
+        """Build a context from a decoded image by encoding it once.
+
+        Args:
+            array: BGR image.
+            extension: OpenCV encoder extension, e.g. ".jpg" or ".png".
+
+        Returns:
+            ImageContext: Context whose bytes and array are both known.
+
+        Raises:
+            ValueError: If OpenCV fails to encode the image.
+        """
+        success, buffer = cv2.imencode(extension, array)
+        if not success:
+            raise ValueError(f"Failed to encode image as {extension}")
+        return cls(buffer.tobytes(), array=array)
+
+    @classmethod
+    def ensure(cls, image: Union[bytes, "ImageContext"]) -> "ImageContext":
+        """Wrap raw bytes in a context, passing existing contexts through.
+
+        Args:
+            image: Encoded image bytes or an existing context.
+
+        Returns:
+            ImageContext: A context for the image.
+        """
+        if isinstance(image, ImageContext):
+            return image
+        return cls(image)
+
+    def __len__(self) -> int:
+        return len(self.raw_bytes)
+
+    def memoize(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return a derived value, computing it on first use only.
+
+        Args:
+            key: Identifies the derived value (e.g. a preprocessing profile).
+            factory: Computes the value from this image.
+
+        Returns:
+            Any: The memoized value.
+        """
+        if key not in self._derived:
+            self._derived[key] = factory()
+        return self._derived[key]
+
+    @cached_property
+    def content_hash(self) -> str:
+        """SHA-256 hex digest of the encoded bytes."""
+        return hashlib.sha256(self.raw_bytes).hexdigest()
+
+    @cached_property
+    def array(self) -> Optional[np.ndarray]:
+        """Decoded BGR image, or None if the bytes are not decodable."""
+        return self._decode()
+
+    @property
+    def decoded(self) -> bool:
+        """Whether the image was decoded and the frame is held."""
+        return "array" in self.__dict__
+
+    def take_array(self) -> Optional[np.ndarray]:
+        """Remove the decoded image from the context and return it.
+
+        For handing the frame over without keeping a second reference to
+        it. The image is decoded if it was not yet, and decoded again if
+        ``array`` is used later.
+
+        Returns:
+            Optional[np.ndarray]: The decoded BGR image, None if the bytes
+            are not decodable.
+        """
+        if "array" in self.__dict__:
+            return self.__dict__.pop("array")
+        return self._decode()
+
+    @cached_property
+    def size(self) -> Optional[Tuple[int, int]]:
+        """Width and height of the decoded image, None if not decodable.
+
+        Read from the image header unless the image is already decoded, so
+        asking for the dimensions does not decode a full photo. The EXIF
+        orientation is applied like OpenCV applies it when decoding.
+        """
+        if "array" not in self.__dict__:
+            try:
+                with Image.open(io.BytesIO(self.raw_bytes)) as header:
+                    width, height = header.size
+                    orientation = header.getexif().get(_EXIF_ORIENTATION)
+            except Exception:
+                pass  # let OpenCV decide
+            else:
+                if orientation in _TRANSPOSED_ORIENTATIONS:
+                    width, height = height, width
+                return width, height
+        if self.array is None:
+            return None
+        return self.array.shape[1], self.array.shape[0]
+
+    @property
+    def height(self) -> int:
+        """Height of the decoded image in pixels."""
+        return self.size[1]
+
+    @property
+    def width(self) -> int:
+        """Width of the decoded image in pixels."""
+        return self.size[0]
+
+    @cached_property
+    def base64(self) -> str:
+        """Base64 encoding of the raw bytes."""
+        return base64.b64encode(self.raw_bytes).decode("utf-8")
+
+    @cached_property
+    def data_url(self) -> str:
+        """``data:`` URL of the raw bytes labelled with their MIME type."""
+        return f"data:{self.mime_type};base64,{self.base64}"
+
+    @cached_property
+    def jpeg_bytes(self) -> bytes:
+        """JPEG encoding of the image, reusing the raw bytes if possible.
+
+        Raises:
+            ValueError: If the image cannot be encoded as JPEG.
+        """
+        if self.mime_type == "image/jpeg":
+            return self.raw_bytes
+        success, buffer = cv2.imencode(".jpg", self.array)
+        if not success:
+            raise ValueError("Failed to encode image as JPEG")
+        return buffer.tobytes()
+
+    def _decode(self) -> Optional[np.ndarray]:
+        return cv2.imdecode(
+            np.frombuffer(self.raw_bytes, np.uint8), cv2.IMREAD_COLOR
+        )
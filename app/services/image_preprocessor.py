@@ -0,0 +1,159 @@
+"""
+Preprocessing of images before they are sent to a vision LLM.
+
+Vision-token cost and upload latency grow with the number of pixels, and
+hand-drawn black-on-white sketches survive aggressive downscaling and
+binarization. ``ImagePreprocessor`` applies the configured
+``ImageProfile`` once per image and memoizes the result on its
+``ImageContext`` so every LLM call of a request reuses the same payload.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from pydantic import BaseModel, Field
+
+from app.core.config import Settings
+from app.services.image_context import ImageContext
+
+# OpenCV extension, MIME type and quality flag of each output format
+_ENCODERS: Dict[str, Tuple[str, str, Optional[int]]] = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+    "png": (".png", "image/png", None),
+}
+
+
+class ImageProfile(BaseModel):
+    """Preprocessing applied to images sent to the LLM.
+
+    Attributes:
+        max_long_edge: Longest side in pixels; larger images are scaled down
+        grayscale: Convert the image to grayscale
+        binarize: Convert the image to black and white (implies grayscale)
+        format: Output format, or "original" to keep the source encoding
+            when no pixel transformation is needed
+        quality: JPEG/WebP quality from 1 to 100
+    """
+    max_long_edge: Optional[int] = Field(default=None, gt=0)
+    grayscale: bool = False
+    binarize: bool = False
+    format: str = Field(
+        default="original", pattern="^(original|jpeg|webp|png)$"
+    )
+    quality: int = Field(default=90, ge=1, le=100)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ImageProfile":
+        """Build the profile configured in the settings.
+
+        Args:
+            settings: Application settings.
+
+        Returns:
+            ImageProfile: The configured profile.
+        """
+        return cls(
+            max_long_edge=settings.LLM_IMAGE_MAX_EDGE,
+            grayscale=settings.LLM_IMAGE_GRAYSCALE,
+            binarize=settings.LLM_IMAGE_BINARIZE,
+            format=settings.LLM_IMAGE_FORMAT,
+            quality=settings.LLM_IMAGE_QUALITY,
+        )
+
+    @property
+    def key(self) -> str:
+        """Stable identifier of the profile used in memoization keys."""
+        return self.model_dump_json()
+
+
+class ImagePreprocessor:
+    """Service producing the LLM payload of an image for a profile."""
+
+    def __init__(self, profile: ImageProfile):
+        """Initialize the preprocessor.
+
+        Args:
+            profile: The preprocessing profile to apply.
+        """
+        self.profile = profile
+
+    def prepare(self, image: ImageContext) -> ImageContext:
+        """Return the image to send to the LLM, computing it only once.
+
+        Args:
+            image: The request image.
+
+        Returns:
+            ImageContext: The preprocessed image, or ``image`` itself when
+            the profile leaves it unchanged.
+
+        Raises:
+            ValueError: If the image cannot be decoded or encoded.
+        """
+        return image.memoize(
+            ("llm_payload", self.profile.key),
+            lambda: self._preprocess(image)
+        )
+
+    def _preprocess(self, image: ImageContext) -> ImageContext:
+        profile = self.profile
+        if profile.format == "original" and not self._transforms(image):
+            return image
+
+        array = image.array
+        if array is None:
+            raise ValueError("Image could not be decoded for preprocessing")
+
+        height, width = array.shape[:2]
+        long_edge = max(height, width)
+        if profile.max_long_edge and long_edge > profile.max_long_edge:
+            scale = profile.max_long_edge / long_edge
+            array = cv2.resize(
+                array,
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+
+        if profile.grayscale or profile.binarize:
+            array = cv2.cvtColor(array, cv2.COLOR_BGR2GRAY)
+        if profile.binarize:
+            array = cv2.adaptiveThreshold(
+                array, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                cv2.THRESH_BINARY, 31, 15
+            )
+
+        output_format = profile.format
+        if output_format == "original":
+            output_format = self._format_of(image.mime_type)
+        return self._encode(array, output_format)
+
+    def _transforms(self, image: ImageContext) -> bool:
+        """Whether the profile changes the pixels of the image."""
+        profile = self.profile
+        if profile.grayscale or profile.binarize:
+            return True
+        if profile.max_long_edge is None:
+            return False
+        # Read from the header: an image within the limit is not decoded
+        size = image.size
+        if size is None:
+            raise ValueError("Image could not be decoded for preprocessing")
+        return max(size) > profile.max_long_edge
+
+    def _encode(self, array: np.ndarray, output_format: str) -> ImageContext:
+        extension, mime_type, quality_flag = _ENCODERS[output_format]
+        params: List[Any] = []
+        if quality_flag is not None:
+            params = [quality_flag, self.profile.quality]
+        success, buffer = cv2.imencode(extension, array, params)
+        if not success:
+            raise ValueError(f"Failed to encode image as {output_format}")
+        return ImageContext(buffer.tobytes(), mime_type=mime_type)
+
+    @staticmethod
+    def _format_of(mime_type: str) -> str:
+        for output_format, (_, encoder_mime, _) in _ENCODERS.items():
+            if encoder_mime == mime_type:
+                return output_format
+        return "jpeg"
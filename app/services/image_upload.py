@@ -0,0 +1,238 @@
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastapi import HTTPException, Request
+from loguru import logger
+from starlette.datastructures import FormData, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from app.core.config import Settings
+from app.core.exceptions import (
+    ImageTooLargeError,
+    InvalidContentLengthError,
+    InvalidMultipartError,
+)
+from app.services.image_context import sniff_mime_type
+
+GENERIC_CONTENT_TYPES = {"", "application/octet-stream"}
+
+
+class ImageUploadReader:
+    """Service for reading binary image uploads under the size limit.
+
+    Request bodies are consumed chunk by chunk so that an oversized body
+    is rejected from its declared Content-Length, or as soon as it
+    crosses the limit, instead of after it has been buffered completely.
+    Multipart bodies are parsed here for the same reason: FastAPI's
+    ``File(...)`` parameters spool the whole body before the endpoint runs.
+    """
+
+    CHUNK_SIZE: int = 64 * 1024
+    # Room for the boundaries and part headers around the file content
+    MULTIPART_OVERHEAD: int = 64 * 1024
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize the upload reader.
+
+        Args:
+            settings: Application settings containing the size limit
+        """
+        self._settings = settings
+
+    async def read_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        content_length: Optional[int] = None,
+        max_size: Optional[int] = None,
+        too_large: Callable[[], HTTPException] = ImageTooLargeError
+    ) -> bytes:
+        """
+        Read a streamed request body.
+
+        Args:
+            chunks: Async iterator over the body chunks
+            content_length: Declared body length, checked before reading
+            max_size: Size limit, ``MAX_IMAGE_SIZE`` by default
+            too_large: Exception raised when the limit is exceeded
+
+        Returns:
+            bytes: The complete body
+
+        Raises:
+            HTTPException: ``too_large()`` if the body exceeds the limit
+        """
+        parts: List[bytes] = []
+        async for chunk in self._capped(
+            chunks, content_length, max_size, too_large
+        ):
+            parts.append(chunk)
+        return b"".join(parts)
+
+    async def read_form(
+        self,
+        request: Request,
+        max_size: Optional[int] = None,
+        max_files: int = 1,
+        too_large: Callable[[], HTTPException] = ImageTooLargeError
+    ) -> FormData:
+        """
+        Parse a multipart/form-data request body under a size limit.
+
+        The caller owns the returned form and must close it.
+
+        Args:
+            request: The incoming request, its body not yet consumed
+            max_size: Body size limit, ``MAX_IMAGE_SIZE`` plus the multipart
+                overhead by default
+            max_files: Maximum number of files in the form
+            too_large: Exception raised when the limit is exceeded
+
+        Returns:
+            FormData: The parsed form, files spooled to temporary files
+
+        Raises:
+            HTTPException: ``too_large()`` if the body exceeds the limit
+            InvalidMultipartError: If the body is not a valid multipart form
+        """
+        content_type = request.headers.get("content-type", "")
+        if not content_type.lower().startswith("multipart/form-data"):
+            raise InvalidMultipartError()
+        if max_size is None:
+            max_size = self._settings.MAX_IMAGE_SIZE + self.MULTIPART_OVERHEAD
+
+        chunks = self._capped(
+            request.stream(),
+            self.parse_content_length(request.headers.get("content-length")),
+            max_size,
+            too_large
+        )
+        try:
+            return await MultiPartParser(
+                request.headers, chunks, max_files=max_files
+            ).parse()
+        except MultiPartException as e:
+            logger.warning(f"Invalid multipart body: {e.message}")
+            raise InvalidMultipartError()
+
+    @staticmethod
+    def form_files(form: FormData, field: str) -> List[UploadFile]:
+        """
+        Get the files uploaded under a form field.
+
+        Args:
+            form: The parsed form
+            field: Name of the file field
+
+        Returns:
+            List[UploadFile]: The uploaded files, in form order
+
+        Raises:
+            InvalidMultipartError: If the field holds no file
+        """
+        files = [
+            value for value in form.getlist(field)
+            if not isinstance(value, str)
+        ]
+        if not files:
+            raise InvalidMultipartError()
+        return files
+
+    async def read_upload(self, upload: UploadFile) -> bytes:
+        """
+        Read a multipart file upload.
+
+        Args:
+            upload: The uploaded file
+
+        Returns:
+            bytes: The file content
+
+        Raises:
+            ImageTooLargeError: If the file exceeds the size limit
+        """
+        if upload.size is not None:
+            self._check_size(upload.size)
+
+        async def iter_chunks() -> AsyncIterator[bytes]:
+            while chunk := await upload.read(self.CHUNK_SIZE):
+                yield chunk
+
+        return await self.read_stream(iter_chunks())
+
+    @staticmethod
+    def parse_content_length(header: Optional[str]) -> Optional[int]:
+        """
+        Parse a Content-Length header.
+
+        Args:
+            header: Header value, None if the client sent none
+
+        Returns:
+            Optional[int]: The declared body length, None if not declared
+
+        Raises:
+            InvalidContentLengthError: If the value is not a non-negative
+                integer
+        """
+        if not header:
+            return None
+        try:
+            content_length = int(header)
+        except ValueError:
+            raise InvalidContentLengthError()
+        if content_length < 0:
+            raise InvalidContentLengthError()
+        return content_length
+
+    @staticmethod
+    def resolve_content_type(
+        declared: Optional[str],
+        image_bytes: bytes
+    ) -> str:
+        """
+        Determine the content type of an uploaded image.
+
+        Args:
+            declared: Content type declared by the client, if any
+            image_bytes: The uploaded bytes
+
+        Returns:
+            str: The declared type, or the type sniffed from the bytes when
+            the client only declared a generic binary type (left unchanged
+            if the bytes are not a recognized image format)
+        """
+        content_type = (declared or "").split(";")[0].strip().lower()
+        if content_type in GENERIC_CONTENT_TYPES:
+            return sniff_mime_type(image_bytes, default=content_type)
+        return content_type
+
+    async def _capped(
+        self,
+        chunks: AsyncIterator[bytes],
+        content_length: Optional[int],
+        max_size: Optional[int],
+        too_large: Callable[[], HTTPException]
+    ) -> AsyncIterator[bytes]:
+        """Yield the chunks, raising once their total exceeds the limit."""
+        if max_size is None:
+            max_size = self._settings.MAX_IMAGE_SIZE
+        if content_length is not None:
+            self._check_size(content_length, max_size, too_large)
+
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            self._check_size(size, max_size, too_large)
+            yield chunk
+
+    def _check_size(
+        self,
+        size: int,
+        max_size: Optional[int] = None,
+        too_large: Callable[[], HTTPException] = ImageTooLargeError
+    ) -> None:
+        if max_size is None:
+            max_size = self._settings.MAX_IMAGE_SIZE
+        if size > max_size:
+            logger.warning(f"Upload size {size} exceeds limit {max_size}")
+            raise too_large()
@@ -0,0 +1,256 @@
+"""
+Background execution of circuit analyses as jobs.
+
+A schema analysis takes tens of seconds, too long to hold an HTTP
+connection open under load. ``JobManager`` accepts analyses into a
+bounded queue, drains it with a fixed pool of asyncio workers and keeps
+each result for a limited time so clients can poll for it.
+"""
+import asyncio
+import time
+import uuid
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import Settings, get_settings
+from app.core.exceptions import JobQueueFullError
+from app.core.metrics import LatencyHistogram, get_metrics_registry
+from app.services.circuit_service import extract_components, extract_schema
+
+JobHandler = Callable[[bytes], Awaitable[Any]]
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job:
+    """An analysis submitted to the JobManager.
+
+    Attributes:
+        id (str): Unique job identifier
+        kind (str): Name of the handler running the job
+        status (JobStatus): Current state
+        result (Any): Handler result once succeeded
+        error (Optional[str]): Error message once failed
+        created_at (float): Submission time (epoch seconds)
+        started_at (Optional[float]): Start time (epoch seconds)
+        finished_at (Optional[float]): Completion time (epoch seconds)
+    """
+
+    def __init__(self, kind: str, image_bytes: bytes) -> None:
+        """Initialize a queued job.
+
+        Args:
+            kind: Name of the handler running the job.
+            image_bytes: Validated image to analyze.
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = JobStatus.QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.image_bytes: Optional[bytes] = image_bytes
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has succeeded or failed."""
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class JobManager:
+    """Service running submitted analyses on a bounded worker pool."""
+
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        workers: int,
+        max_pending: int,
+        result_ttl: float
+    ) -> None:
+        """Initialize the manager; workers start on first use.
+
+        Args:
+            handlers: Coroutine functions analyzing image bytes, by job kind.
+            workers: Number of jobs run concurrently.
+            max_pending: Maximum number of queued jobs before submissions
+                are rejected.
+            result_ttl: Seconds finished jobs are kept for polling.
+        """
+        self._handlers = handlers
+        self._worker_count = max(1, workers)
+        self._max_pending = max_pending
+        self._result_ttl = result_ttl
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+        self._rejected = 0
+        self._failed = 0
+        self._succeeded = 0
+        self._queue_wait = LatencyHistogram()
+        self._latency = LatencyHistogram()
+
+    @property
+    def kinds(self) -> List[str]:
+        """Names of the job kinds that can be submitted."""
+        return list(self._handlers)
+
+    def start(self) -> None:
+        """Start the worker pool in the running event loop (idempotent)."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_pending)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"job-worker-{index}")
+            for index in range(self._worker_count)
+        ]
+        logger.info(f"Started {self._worker_count} job workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued and running jobs are abandoned."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._queue = None
+
+    def submit(self, kind: str, image_bytes: bytes) -> Job:
+        """Queue an analysis of an image.
+
+        Args:
+            kind: Job kind, one of ``kinds``.
+            image_bytes: Validated image to analyze.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            KeyError: If the kind is unknown.
+            JobQueueFullError: If max_pending jobs are already queued.
+        """
+        if kind not in self._handlers:
+            raise KeyError(f"Unknown job kind: {kind}")
+        self.start()
+        self._purge_expired()
+
+        job = Job(kind, image_bytes)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise JobQueueFullError()
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job that is pending or whose result has not expired.
+
+        Args:
+            job_id: Identifier returned by submit.
+
+        Returns:
+            Optional[Job]: The job, or None if unknown or expired.
+        """
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self._queue_wait.observe(job.started_at - job.created_at)
+        self._running += 1
+        try:
+            job.result = await self._handlers[job.kind](job.image_bytes)
+            job.status = JobStatus.SUCCEEDED
+            self._succeeded += 1
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            self._failed += 1
+        finally:
+            self._running -= 1
+            job.finished_at = time.time()
+            job.image_bytes = None
+            self._latency.observe(job.finished_at - job.created_at)
+
+    def _purge_expired(self) -> None:
+        if self._result_ttl <= 0:
+            return
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and now - job.finished_at > self._result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue, outcome and latency figures.
+
+        Returns:
+            Dict[str, Any]: Job metrics for the metrics registry.
+        """
+        return {
+            "queue_length": self._queue.qsize() if self._queue else 0,
+            "max_pending": self._max_pending,
+            "running": self._running,
+            "workers": len(self._workers),
+            "stored_jobs": len(self._jobs),
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "queue_wait_seconds": self._queue_wait.as_dict(),
+            "latency_seconds": self._latency.as_dict(),
+        }
+
+
+def build_job_manager(settings: Settings) -> JobManager:
+    """Build the job manager running the circuit analyses.
+
+    Args:
+        settings: Application settings with the job pool configuration.
+
+    Returns:
+        JobManager: Manager with "schema" and "components" job kinds.
+    """
+    return JobManager(
+        handlers={
+            "schema": extract_schema,
+            "components": extract_components,
+        },
+        workers=settings.JOB_WORKERS,
+        max_pending=settings.JOB_MAX_PENDING,
+        result_ttl=settings.JOB_RESULT_TTL,
+    )
+
+
+@lru_cache()
+def get_job_manager() -> JobManager:
+    """Get the process-wide job manager singleton.
+
+    Returns:
+        JobManager: The shared manager, registered as "jobs" metrics.
+    """
+    manager = build_job_manager(get_settings())
+    get_metrics_registry().register("jobs", manager.metrics)
+    return manager
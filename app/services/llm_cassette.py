@@ -0,0 +1,156 @@
+"""
+Record/replay of LLM provider responses.
+
+In "record" mode every provider response is stored in a cassette file,
+keyed by the digest of its request and together with its latency. In
+"replay" mode the responses are served from the cassette without any
+network access, optionally after sleeping the recorded latency, so the
+benchmarks and tests can run offline and measure the pipeline's own
+overhead. The cassette is a JSON Lines file, one call per line.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from app.core.config import Settings
+from app.services.retry_policy import LLMRequestError
+
+
+class LLMCassette:
+    """Store of recorded provider responses.
+
+    Attributes:
+        path (str): Cassette file
+        mode (str): "record" or "replay"
+        emulate_latency (bool): Whether replayed calls sleep their latency
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str,
+        emulate_latency: bool = False
+    ) -> None:
+        """Initialize the cassette, loading the calls already recorded.
+
+        Args:
+            path: Cassette file, created when recording.
+            mode: "record" or "replay".
+            emulate_latency: Sleep the recorded latency when replaying.
+
+        Raises:
+            ValueError: If the mode is unknown, or replaying a cassette
+                that does not exist.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "replay" and not os.path.exists(path):
+            raise ValueError(f"Cassette not found: {path}")
+        self.path = path
+        self.mode = mode
+        self.emulate_latency = emulate_latency
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._replayed = 0
+        self._missing = 0
+        self._recorded = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as cassette_file:
+                for line in cassette_file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+        logger.info(
+            f"LLM cassette in {mode} mode with {len(self._entries)} "
+            f"recorded calls: {path}"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def call(
+        self,
+        key: str,
+        request: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Replay the response of a request, or record it.
+
+        Args:
+            key: Digest identifying the request.
+            request: Sends the request to the provider.
+
+        Returns:
+            str: Raw provider response.
+
+        Raises:
+            LLMRequestError: When replaying a request that was not recorded.
+        """
+        if self.mode == "replay":
+            entry = self._entries.get(key)
+            if entry is None:
+                self._missing += 1
+                raise LLMRequestError(
+                    f"No recorded response for LLM request {key[:12]} in "
+                    f"cassette {self.path}"
+                )
+            if self.emulate_latency:
+                await asyncio.sleep(entry["latency_seconds"])
+            self._replayed += 1
+            return entry["response"]
+
+        if key in self._entries:
+            return await request()
+        start = time.monotonic()
+        response = await request()
+        self._record(key, response, time.monotonic() - start)
+        return response
+
+    def _record(self, key: str, response: str, latency: float) -> None:
+        entry = {
+            "key": key,
+            "response": response,
+            "latency_seconds": round(latency, 4),
+        }
+        self._entries[key] = entry
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as cassette_file:
+            cassette_file.write(json.dumps(entry) + "\n")
+        self._recorded += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return cassette usage counters.
+
+        Returns:
+            Dict[str, Any]: Cassette metrics for the metrics registry.
+        """
+        return {
+            "mode": self.mode,
+            "entries": len(self._entries),
+            "replayed": self._replayed,
+            "missing": self._missing,
+            "recorded": self._recorded,
+        }
+
+
+def build_llm_cassette(settings: Settings) -> Optional[LLMCassette]:
+    """Build the LLM cassette configured in the settings.
+
+    Args:
+        settings: Application settings.
+
+    Returns:
+        Optional[LLMCassette]: The cassette, or None if LLM_CASSETTE_MODE
+        is "off".
+    """
+    if settings.LLM_CASSETTE_MODE == "off":
+        return None
+    return LLMCassette(
+        settings.LLM_CASSETTE_PATH,
+        settings.LLM_CASSETTE_MODE,
+        emulate_latency=settings.LLM_CASSETTE_EMULATE_LATENCY
+    )
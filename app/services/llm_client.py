@@ -1,13 +1,73 @@
+import copy
 import os
-from typing import Dict, Any, List, Optional
+from typing import Awaitable, Dict, Any, List, Optional, Tuple, Union
 import json
-import base64
 import asyncio
+import time
 from litellm import acompletion
 from groq import AsyncGroq
+import httpx
 from pydantic import BaseModel
 from loguru import logger
 from app.core.config import Settings
+from app.core.metrics import get_metrics_registry
+from app.services.cv_executor import get_cv_executor
+from app.services.hedging import RequestHedger
+from app.services.http_pool import get_http_pool
+from app.services.image_context import ImageContext
+from app.services.image_preprocessor import ImagePreprocessor, ImageProfile
+from app.services.llm_cassette import build_llm_cassette
+from app.services.llm_router import LLMRouter
+from app.services.llm_scheduler import (
+    DEFAULT_IMAGE_TOKENS,
+    LLMScheduler,
+    SpeculationBudgetExhausted,
+    estimate_image_tokens,
+    estimate_text_tokens,
+)
+from app.services.result_cache import build_llm_cache, make_cache_key
+from app.services.retry_policy import (
+    LLMRequestError, RetryBudget, RetryPolicy, classify_error,
+    current_retry_budget
+)
+from app.services.single_flight import SingleFlight
+
+
+class LLMUsageStats:
+    """Call and token counters of the requests sent to the LLM provider."""
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, completion: Any) -> None:
+        """Add the usage reported with a completion to the counters.
+
+        Args:
+            completion: Chat completion returned by Groq or LiteLLM.
+        """
+        self.calls += 1
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.completion_tokens += (
+                getattr(usage, "completion_tokens", 0) or 0
+            )
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters as a dictionary.
+
+        Returns:
+            Dict[str, int]: Calls and prompt/completion/total tokens.
+        """
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+        }
 
 
 class LLMService:
@@ -20,19 +80,169 @@ class LLMService:
             settings: Application settings
         """
         self._settings = settings
-        self._groq_client = AsyncGroq()
+        self._http_pool = get_http_pool()
+        self._groq_client: Optional[AsyncGroq] = None
+        self._groq_http_client: Optional[httpx.AsyncClient] = None
+        self.usage = LLMUsageStats()
+        get_metrics_registry().register("llm_usage", self.usage.as_dict)
+        self._preprocessor = ImagePreprocessor(
+            ImageProfile.from_settings(settings)
+        )
+        self.scheduler = LLMScheduler(
+            max_in_flight=settings.MAX_PARALLEL_REQUESTS,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        )
+        get_metrics_registry().register(
+            "llm_scheduler", self.scheduler.metrics
+        )
+        self.retry_policy = RetryPolicy(
+            max_attempts=settings.LLM_RETRY_MAX_ATTEMPTS,
+            base_delay=settings.LLM_RETRY_BASE_DELAY,
+            max_delay=settings.LLM_RETRY_MAX_DELAY,
+        )
+        get_metrics_registry().register(
+            "llm_retries", self.retry_policy.metrics
+        )
+        self._router = None
+        if settings.LLM_BACKENDS:
+            self._router = LLMRouter(
+                backends=[settings.MODEL_NAME, *settings.LLM_BACKENDS],
+                ewma_alpha=settings.LLM_ROUTER_EWMA_ALPHA,
+                failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                cooldown_seconds=settings.LLM_BREAKER_COOLDOWN,
+            )
+            get_metrics_registry().register(
+                "llm_router", self._router.metrics
+            )
+        self._hedger = None
+        if settings.LLM_HEDGING_ENABLED:
+            self._hedger = RequestHedger(
+                percentile=settings.LLM_HEDGE_PERCENTILE,
+                max_fraction=settings.LLM_HEDGE_MAX_FRACTION,
+                min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+            )
+            get_metrics_registry().register(
+                "llm_hedging", self._hedger.metrics
+            )
+        self._flights = None
+        if settings.SINGLE_FLIGHT_ENABLED:
+            self._flights = SingleFlight()
+            get_metrics_registry().register(
+                "llm_single_flight", self._flights.metrics
+            )
+        self._cassette = build_llm_cassette(settings)
+        if self._cassette is not None:
+            get_metrics_registry().register(
+                "llm_cassette", self._cassette.metrics
+            )
+        self._response_cache = build_llm_cache(settings)
+        if self._response_cache is not None:
+            get_metrics_registry().register(
+                "llm_cache", self._response_cache.metrics
+            )
+
+    def _request_digest(
+        self,
+        messages: List[Dict[str, Any]],
+        image: ImageContext,
+        model: str,
+        schema: Optional[BaseModel],
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        """Compute the memoization key of an LLM call.
+
+        The image is represented by its SHA-256 and the preprocessing
+        profile rather than its payload, so the digest stays cheap to
+        compute and a cache hit never pays for preprocessing.
+
+        Args:
+            messages: Context messages and the final prompt text
+            image: Image sent with the prompt
+            model: Model the request is routed to
+            schema: Optional Pydantic model the response is validated with
+            temperature: Effective sampling temperature
+            max_tokens: Effective completion token limit
+
+        Returns:
+            str: Hex digest identifying the call.
+        """
+        return make_cache_key(
+            json.dumps(messages, sort_keys=True, default=str),
+            image.content_hash,
+            self._preprocessor.profile.key,
+            model,
+            schema.__name__ if schema else "",
+            repr(temperature),
+            str(max_tokens),
+            str(self._settings.SEED),
+        )
+
+    def _estimate_image_tokens(self, image: ImageContext) -> int:
+        """Estimate the prompt tokens of an image as sent to the LLM.
 
-    @staticmethod
-    def _encode_image_bytes(image_bytes: bytes) -> str:
-        """Encode image bytes to base64 string.
+        The estimate uses the dimensions of the image after the
+        preprocessing profile's downscaling and is memoized on the image.
 
         Args:
-            image_bytes: Raw image bytes
+            image: The request image (before preprocessing).
 
         Returns:
-            str: Base64 encoded image string
+            int: Estimated number of image tokens.
         """
-        return base64.b64encode(image_bytes).decode('utf-8')
+        def estimate() -> int:
+            if image.size is None:
+                return DEFAULT_IMAGE_TOKENS
+            width, height = image.size
+            max_edge = self._preprocessor.profile.max_long_edge
+            if max_edge and max(width, height) > max_edge:
+                scale = max_edge / max(width, height)
+                width, height = round(width * scale), round(height * scale)
+            return estimate_image_tokens(width, height)
+
+        return image.memoize(
+            ("image_tokens", self._preprocessor.profile.key), estimate
+        )
+
+    async def _prepare(self, image: ImageContext) -> ImageContext:
+        """Preprocess an image for the LLM on the CV executor.
+
+        The concurrent calls of a request share a single preprocessing of
+        their image.
+
+        Args:
+            image: The request image.
+
+        Returns:
+            ImageContext: The image to send, as ``ImagePreprocessor.prepare``.
+
+        Raises:
+            ValueError: If the image cannot be decoded or encoded.
+        """
+        preparation = image.memoize(
+            ("llm_payload_preparation", self._preprocessor.profile.key),
+            lambda: asyncio.ensure_future(
+                get_cv_executor().run(self._preprocessor.prepare, image)
+            )
+        )
+        # A cancelled call does not cancel the other calls' preprocessing
+        return await asyncio.shield(preparation)
+
+    def _groq(self) -> AsyncGroq:
+        """Get the Groq client bound to the shared connection pool."""
+        http_client = self._http_pool.client
+        if self._groq_http_client is not http_client:
+            # The pool client is rebuilt after a shutdown closed it or on
+            # another event loop. Retries are left to retry_policy rather
+            # than the SDK.
+            self._groq_client = AsyncGroq(
+                http_client=http_client,
+                base_url=self._settings.LLM_API_BASE,
+                max_retries=0
+            )
+            self._groq_http_client = http_client
+        return self._groq_client
 
     async def _communicate_groq(
         self,
@@ -47,7 +257,7 @@ class LLMService:
             # Remove 'groq/' prefix from model name
             clean_model = model.replace('groq/', '')
             
-            completion = await self._groq_client.chat.completions.create(
+            completion = await self._groq().chat.completions.create(
                 model=clean_model,
                 messages=messages,
                 temperature=temperature or self._settings.TEMPERATURE,
@@ -56,9 +266,10 @@ class LLMService:
                 response_format={"type": "json_object"} if schema else None,
                 seed=self._settings.SEED,
             )
+            self.usage.record(completion)
             return completion.choices[0].message.content
         except Exception as e:
-            raise ValueError(f"Groq API request failed: {str(e)}")
+            raise ValueError(f"Groq API request failed: {str(e)}") from e
 
     async def _communicate_litellm(
         self,
@@ -68,22 +279,24 @@ class LLMService:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
     ) -> str:
-        """Communicate with LLM with optional schema validation and context.
-        
+        """Handle communication through LiteLLM.
+
+        OpenAI-compatible providers go through the shared connection pool,
+        whose client LiteLLM uses as its session.
+
         Args:
-            prompt: The prompt to send
-            image_bytes: The image bytes to analyze
-            schema: Optional Pydantic model for structured output
-            context_messages: Optional list of previous messages for context
-            model: Optional model override
+            messages: The chat messages to send
+            model: The model to call
+            schema: Optional Pydantic model; JSON output is requested if set
             temperature: Optional temperature override
             max_tokens: Optional max tokens override
 
         Returns:
-            Dict[str, Any]: The validated response from the LLM
+            str: The raw content of the response
 
         Raises:
-            ValueError: If the API request fails or response validation fails
+            asyncio.TimeoutError: If no answer arrives within LLM_API_TIMEOUT
+            Exception: Any error raised by LiteLLM
         """
         completion_kwargs = {
             "model": model,
@@ -94,21 +307,33 @@ class LLMService:
             "stream": False,
             "seed": self._settings.SEED,
             "stop": None,
+            # Retries are left to retry_policy rather than the client
+            "max_retries": 0,
         }
 
         if schema:
             completion_kwargs["response_format"] = {"type": "json_object"}
+        if self._settings.LLM_API_BASE:
+            # Any model is then served by the OpenAI-compatible endpoint
+            completion_kwargs.update(
+                api_base=f"{self._settings.LLM_API_BASE.rstrip('/')}/v1",
+                custom_llm_provider="openai",
+                api_key=os.getenv("OPENAI_API_KEY") or "unused",
+            )
 
+        # LiteLLM uses the pooled client of this loop as its session
+        self._http_pool.ensure_open()
         completion = await asyncio.wait_for(
             acompletion(**completion_kwargs),
             timeout=self._settings.LLM_API_TIMEOUT
         )
+        self.usage.record(completion)
         return completion.choices[0].message.content
 
     async def communicate(
         self,
         prompt: str,
-        image_bytes: bytes,
+        image_bytes: Union[bytes, ImageContext],
         schema: Optional[BaseModel] = None,
         context_messages: Optional[List[Dict[str, Any]]] = None,
         model: Optional[str] = None,
@@ -119,7 +344,8 @@ class LLMService:
 
         Args:
             prompt: The prompt to send
-            image_bytes: The image bytes to analyze
+            image_bytes: The image bytes to analyze, or an ImageContext
+                shared between calls so it is encoded only once
             schema: Optional Pydantic model for structured output
             context_messages: Optional list of previous messages for context
             model: Optional model override
@@ -131,8 +357,13 @@ class LLMService:
 
         Raises:
             ValueError: If the API request fails or response validation fails
+
+        Note:
+            Calls made at temperature 0 are deterministic for a fixed seed,
+            so their responses are memoized on a digest of every input, and
+            identical calls made while one is in flight share its response.
         """
-        image_data = self._encode_image_bytes(image_bytes)
+        image = ImageContext.ensure(image_bytes)
         messages = list(context_messages or [])
         final_prompt = prompt
 
@@ -142,55 +373,319 @@ class LLMService:
                 f"\n{json.dumps(schema.model_json_schema(), indent=2)}"
             )
 
+        used_model = model or self._settings.MODEL_NAME
+        used_temperature = temperature or self._settings.TEMPERATURE
+        used_max_tokens = max_tokens or self._settings.MAX_TOKENS
+
+        if used_temperature != 0.0:
+            return await self._request(
+                messages, final_prompt, image, used_model, schema,
+                temperature, max_tokens
+            )
+
+        digest = self._request_digest(
+            messages + [{"role": "user", "content": final_prompt}],
+            image,
+            used_model,
+            schema,
+            used_temperature,
+            used_max_tokens,
+        )
+        if self._response_cache is not None:
+            cached = self._response_cache.get(digest)
+            if cached is not None:
+                logger.debug(f"LLM response served from cache: {digest[:12]}")
+                return copy.deepcopy(cached)
+
+        # Responses are copied into the cache and out to every caller
+        # sharing a call, so a caller mutating its response cannot change
+        # what other callers receive.
+        async def request() -> Any:
+            response = await self._request(
+                messages, final_prompt, image, used_model, schema,
+                temperature, max_tokens
+            )
+            if self._response_cache is not None:
+                self._response_cache.set(digest, copy.deepcopy(response))
+            return response
+
+        if self._flights is None:
+            return await request()
+        return copy.deepcopy(await self._flights.do(digest, request))
+
+    async def _request(
+        self,
+        messages: List[Dict[str, Any]],
+        final_prompt: str,
+        image: ImageContext,
+        model: str,
+        schema: Optional[BaseModel],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Any:
+        """Send one request to the provider and validate the response.
+
+        Args:
+            messages: Context messages preceding the prompt
+            final_prompt: Prompt text including the schema instructions
+            image: Image sent with the prompt
+            model: Model the request is routed to
+            schema: Optional Pydantic model for structured output
+            temperature: Optional temperature override
+            max_tokens: Optional max tokens override
+
+        Returns:
+            Any: The validated response from the LLM
+
+        Raises:
+            LLMRequestError: If the request still fails or returns an invalid
+                response once its retries are exhausted
+
+        Note:
+            Only this request is retried on failure, so the other checks of
+            an analysis keep their results.
+        """
+        messages = list(messages)
+        cassette_key = None
+        if self._cassette is not None:
+            cassette_key = self._request_digest(
+                messages + [{"role": "user", "content": final_prompt}],
+                image,
+                model,
+                schema,
+                temperature or self._settings.TEMPERATURE,
+                max_tokens or self._settings.MAX_TOKENS,
+            )
+        payload = await self._prepare(image)
         messages.append({
             "role": "user",
             "content": [
                 {"type": "text", "text": final_prompt},
                 {
                     "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{image_data}"
-                    }
+                    "image_url": {"url": payload.data_url}
                 },
             ]
         })
 
-        used_model = model or self._settings.MODEL_NAME
+        estimated_tokens = (
+            estimate_text_tokens(json.dumps(messages[:-1], default=str))
+            + estimate_text_tokens(final_prompt)
+            + self._estimate_image_tokens(image)
+            + (max_tokens or self._settings.MAX_TOKENS)
+        )
+
+        budget = current_retry_budget()
+        if budget is None:
+            budget = RetryBudget(self._settings.LLM_RETRY_BUDGET)
+        attempt = 1
+        while True:
+            started = time.monotonic()
+            try:
+                response = await self._hedged_attempt(
+                    messages, model, schema, temperature, max_tokens,
+                    estimated_tokens, cassette_key
+                )
+                if attempt > 1:
+                    self.retry_policy.stats.recovered += 1
+                return response
+            except LLMRequestError as e:
+                if attempt > 1:
+                    budget.spend(time.monotonic() - started)
+                delay = self.retry_policy.next_delay(e, attempt, budget)
+                if delay is None:
+                    raise
+                logger.warning(
+                    f"Retrying LLM call in {delay:.2f}s after attempt "
+                    f"{attempt} failed: {e}"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _hedged_attempt(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        schema: Optional[BaseModel],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        estimated_tokens: int,
+        cassette_key: Optional[str] = None,
+    ) -> Any:
+        """Make one attempt, duplicated if it is slower than usual.
+
+        The attempt goes to the healthiest backend equivalent to the model
+        when LLM_BACKENDS are configured. With hedging enabled, an attempt
+        still unanswered after the LLM_HEDGE_PERCENTILE of its backend's
+        recent latency is duplicated, to LLM_HEDGE_MODEL if set or else to
+        another backend, and the first valid response wins. The delay runs
+        from the admission of the attempt by the scheduler, and attempts
+        with nowhere else to go are not hedged.
+        """
+        primary = self._route(model)
+
+        def attempt(
+            attempt_model: str,
+            slot_held: bool = False
+        ) -> Awaitable[Any]:
+            return self._attempt(
+                messages, attempt_model, schema, temperature, max_tokens,
+                estimated_tokens, cassette_key, slot_held
+            )
+
+        if self._hedger is None or not self._has_hedge_target(model, primary):
+            return await attempt(primary)
+        # The hedge delay runs from the admission of the primary call, so
+        # time spent queueing for a slot is not taken for a slow backend
+        async with self.scheduler.slot(estimated_tokens):
+            return await self._hedger.run(
+                primary,
+                lambda: attempt(primary, slot_held=True),
+                lambda: attempt(
+                    self._settings.LLM_HEDGE_MODEL
+                    or self._route(model, exclude=(primary,))
+                )
+            )
+
+    def _has_hedge_target(self, model: str, primary: str) -> bool:
+        """Whether a hedge of a call routed to ``primary`` can go elsewhere.
+
+        A duplicate sent to the same backend would wait on the same slow
+        service, so calls are only hedged to LLM_HEDGE_MODEL or to another
+        backend of the model.
+        """
+        if self._settings.LLM_HEDGE_MODEL:
+            return self._settings.LLM_HEDGE_MODEL != primary
+        return (
+            self._router is not None
+            and model in self._router
+            and len(self._router.backends) > 1
+        )
+
+    def _route(self, model: str, exclude: Tuple[str, ...] = ()) -> str:
+        """Choose the backend of a call for a model."""
+        if self._router is None or model not in self._router:
+            return model
+        return self._router.choose(exclude)
+
+    async def _attempt(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        schema: Optional[BaseModel],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        estimated_tokens: int,
+        cassette_key: Optional[str] = None,
+        slot_held: bool = False,
+    ) -> Any:
+        """Make one attempt of a request, classifying its failure.
 
+        The attempt waits for a scheduler slot unless ``slot_held`` says the
+        caller already holds one for it.
+
+        Raises:
+            LLMRequestError: If the attempt fails, marked retryable when a
+                new attempt may succeed
+            SpeculationBudgetExhausted: If a speculative call exceeds its
+                budget (never retried)
+        """
         try:
-            # Choose API based on model name
-            if used_model.startswith("groq/"):
-                response = await self._communicate_groq(
-                    messages=messages,
-                    model=used_model,
-                    schema=schema,
-                    temperature=temperature,
-                    max_tokens=max_tokens
+            if slot_held:
+                response = await self._call_backend(
+                    messages, model, schema, temperature, max_tokens,
+                    cassette_key
                 )
             else:
-                response = await self._communicate_litellm(
+                async with self.scheduler.slot(estimated_tokens):
+                    response = await self._call_backend(
+                        messages, model, schema, temperature, max_tokens,
+                        cassette_key
+                    )
+        except SpeculationBudgetExhausted:
+            raise
+        except asyncio.TimeoutError:
+            raise LLMRequestError(
+                f"LLM request timed out after {self._settings.LLM_API_TIMEOUT}s",
+                retryable=True
+            )
+        except Exception as e:
+            retryable, retry_after = classify_error(e)
+            raise LLMRequestError(
+                f"LLM API request failed: {str(e)}",
+                retryable=retryable,
+                retry_after=retry_after
+            ) from e
+
+        if not schema:
+            return response
+        invalid_retryable = self._settings.LLM_RETRY_INVALID_RESPONSES
+        try:
+            data = json.loads(response)
+        except (TypeError, json.JSONDecodeError) as e:
+            raise LLMRequestError(
+                f"Invalid JSON response: {str(e)}",
+                retryable=invalid_retryable
+            )
+        try:
+            return schema.model_validate(data).model_dump()
+        except Exception as e:
+            raise LLMRequestError(
+                f"Response validation failed: {str(e)}",
+                retryable=invalid_retryable
+            )
+
+    async def _call_backend(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        schema: Optional[BaseModel],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        cassette_key: Optional[str] = None,
+    ) -> str:
+        """Send a request to the API serving a model, recording its health.
+
+        With a cassette configured, the response is recorded under, or
+        replayed from, the cassette key of the request.
+        """
+        async def send() -> str:
+            # Choose API based on model name
+            if model.startswith("groq/"):
+                return await self._communicate_groq(
                     messages=messages,
-                    model=used_model,
+                    model=model,
                     schema=schema,
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
-
-            if schema:
-                try:
-                    data = json.loads(response)
-                    validated = schema.model_validate(data)
-                    return validated.model_dump()
-                except json.JSONDecodeError as e:
-                    raise ValueError(f"Invalid JSON response: {str(e)}")
-                except Exception as e:
-                    raise ValueError(f"Response validation failed: {str(e)}")
-
-            return response
-
-        except asyncio.TimeoutError:
-            raise ValueError(
-                f"LLM request timed out after {self._settings.LLM_API_TIMEOUT}s"
+            return await self._communicate_litellm(
+                messages=messages,
+                model=model,
+                schema=schema,
+                temperature=temperature,
+                max_tokens=max_tokens
             )
-        except Exception as e:
-            raise ValueError(f"LLM API request failed: {str(e)}")
\ No newline at end of file
+
+        router = (
+            self._router
+            if self._router is not None and model in self._router
+            else None
+        )
+        started = time.monotonic()
+        try:
+            if self._cassette is not None and cassette_key is not None:
+                response = await self._cassette.call(cassette_key, send)
+            else:
+                response = await send()
+        except asyncio.CancelledError:
+            if router is not None:
+                router.abandon(model)
+            raise
+        except Exception:
+            if router is not None:
+                router.record_failure(model)
+            raise
+        if router is not None:
+            router.record_success(model, time.monotonic() - started)
+        return response
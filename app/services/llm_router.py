@@ -0,0 +1,206 @@
+"""
+Latency-aware routing of LLM calls over equivalent backends.
+
+Several configured models (Groq native or any LiteLLM model) can answer
+the same prompts. ``LLMRouter`` keeps an exponentially weighted moving
+average (EWMA) of the latency and error rate of each of them and sends
+every call to the healthiest one. A backend failing repeatedly has its
+circuit breaker opened and receives no traffic for a cooldown period,
+after which a single probe call decides whether it is closed again.
+"""
+import time
+from enum import Enum
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+
+class BreakerState(str, Enum):
+    """States of a backend circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class BackendHealth:
+    """Health estimate and circuit breaker of one backend.
+
+    Attributes:
+        name (str): Model name of the backend
+        latency (Optional[float]): EWMA of successful call latency
+        error_rate (float): EWMA of the failure indicator
+        consecutive_failures (int): Failures since the last success
+        state (BreakerState): Circuit breaker state
+        routed (int): Calls routed to the backend
+        failures (int): Failed calls
+        opened (int): Times the breaker opened
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.state = BreakerState.CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.routed = 0
+        self.failures = 0
+        self.opened = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the health figures for the metrics registry."""
+        return {
+            "state": self.state.value,
+            "latency_ewma_seconds": self.latency,
+            "error_rate_ewma": self.error_rate,
+            "consecutive_failures": self.consecutive_failures,
+            "routed": self.routed,
+            "failures": self.failures,
+            "breaker_opened": self.opened,
+        }
+
+
+class LLMRouter:
+    """Service choosing the healthiest backend for each LLM call."""
+
+    def __init__(
+        self,
+        backends: List[str],
+        ewma_alpha: float = 0.2,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30.0,
+        error_penalty: float = 4.0,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Initialize the router.
+
+        Args:
+            backends: Equivalent models, in order of preference.
+            ewma_alpha: Weight of the newest observation in the averages.
+            failure_threshold: Consecutive failures opening the breaker.
+            cooldown_seconds: Time an open breaker rejects traffic before a
+                probe call is let through.
+            error_penalty: Latency multiplier per unit of error rate used
+                when comparing backends.
+            clock: Monotonic time source, injectable for tests.
+        """
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = list(dict.fromkeys(backends))
+        self._alpha = ewma_alpha
+        self._failure_threshold = max(1, failure_threshold)
+        self._cooldown = cooldown_seconds
+        self._error_penalty = error_penalty
+        self._clock = clock
+        self._health = {name: BackendHealth(name) for name in self.backends}
+        self._rerouted = 0
+
+    def __contains__(self, backend: str) -> bool:
+        return backend in self._health
+
+    def choose(self, exclude: Collection[str] = ()) -> str:
+        """Pick the backend of the next call.
+
+        Backends with a closed breaker are ranked by EWMA latency inflated
+        by their error rate; a backend without latency yet ranks first so
+        it gets measured. A backend whose cooldown is over receives one
+        probe call. If every breaker is open, the one opened first is
+        used rather than failing the call outright.
+
+        Args:
+            exclude: Backends not to use, e.g. the one a hedged call is
+                already waiting for. Ignored if it leaves no backend.
+
+        Returns:
+            str: Model name of the chosen backend.
+        """
+        candidates = [
+            self._health[name] for name in self.backends
+            if name not in exclude
+        ] or [self._health[name] for name in self.backends]
+
+        now = self._clock()
+        for health in candidates:
+            if (
+                health.state == BreakerState.OPEN
+                and now - health.opened_at >= self._cooldown
+            ):
+                health.state = BreakerState.HALF_OPEN
+        available = [
+            health for health in candidates
+            if health.state == BreakerState.CLOSED
+            or (health.state == BreakerState.HALF_OPEN and not health.probing)
+        ]
+        if available:
+            chosen = min(available, key=self._score)
+        else:
+            chosen = min(candidates, key=lambda health: health.opened_at)
+        if chosen.state == BreakerState.HALF_OPEN:
+            chosen.probing = True
+        if chosen.name != self.backends[0]:
+            self._rerouted += 1
+        chosen.routed += 1
+        return chosen.name
+
+    def _score(self, health: BackendHealth) -> float:
+        if health.latency is None:
+            return 0.0
+        return health.latency * (1 + self._error_penalty * health.error_rate)
+
+    def record_success(self, backend: str, latency: float) -> None:
+        """Record a call answered by a backend.
+
+        Args:
+            backend: Model name of the backend.
+            latency: Seconds the call took.
+        """
+        health = self._health[backend]
+        health.latency = (
+            latency if health.latency is None
+            else self._alpha * latency + (1 - self._alpha) * health.latency
+        )
+        health.error_rate *= 1 - self._alpha
+        health.consecutive_failures = 0
+        health.probing = False
+        health.state = BreakerState.CLOSED
+
+    def record_failure(self, backend: str) -> None:
+        """Record a call a backend failed to answer.
+
+        Args:
+            backend: Model name of the backend.
+        """
+        health = self._health[backend]
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.error_rate = self._alpha + (1 - self._alpha) * health.error_rate
+        if (
+            health.state == BreakerState.HALF_OPEN
+            or health.consecutive_failures >= self._failure_threshold
+        ):
+            if health.state != BreakerState.OPEN:
+                health.opened += 1
+            health.state = BreakerState.OPEN
+            health.opened_at = self._clock()
+        health.probing = False
+
+    def abandon(self, backend: str) -> None:
+        """Record a call cancelled before a backend answered.
+
+        Args:
+            backend: Model name of the backend.
+        """
+        self._health[backend].probing = False
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return routing decisions and breaker states.
+
+        Returns:
+            Dict[str, Any]: Router metrics for the metrics registry.
+        """
+        return {
+            "preferred": self.backends[0],
+            "rerouted": self._rerouted,
+            "backends": {
+                name: health.as_dict() for name, health in self._health.items()
+            },
+        }
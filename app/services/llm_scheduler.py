@@ -0,0 +1,317 @@
+"""
+Process-wide admission control for LLM provider calls.
+
+Every LLM call of every request goes through the single ``LLMScheduler``
+owned by ``LLMService``. It admits callers in FIFO order while keeping the
+number of calls in flight and the requests/tokens sent over the last
+minute within the configured budgets, so that concurrent HTTP requests
+cannot multiply the provider load and run into 429 responses.
+
+Calls made inside ``speculate(budget)`` are speculative: each one is
+charged to the budget, and they only take a slot left idle by the calls
+of the critical path, which are never queued behind them.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional, Tuple
+)
+
+# Tokens assumed for an image whose dimensions are unknown (2x2 tiles)
+DEFAULT_IMAGE_TOKENS = 765
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Estimate the prompt tokens of an image from its dimensions.
+
+    Uses the tiling rule of high-detail vision inputs: the image is fitted
+    into 2048x2048, its short side scaled down to 768 pixels, and every
+    512x512 tile costs 170 tokens on top of a fixed 85.
+
+    Args:
+        width: Image width in pixels.
+        height: Image height in pixels.
+
+    Returns:
+        int: Estimated number of prompt tokens.
+    """
+    if width <= 0 or height <= 0:
+        return DEFAULT_IMAGE_TOKENS
+    scale = min(1.0, 2048 / max(width, height))
+    short_side = min(width, height) * scale
+    if short_side > 768:
+        scale *= 768 / short_side
+    tiles = (
+        math.ceil(width * scale / 512) * math.ceil(height * scale / 512)
+    )
+    return 85 + 170 * tiles
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Estimate the tokens of a text at roughly four characters per token.
+
+    Args:
+        text: Prompt text.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    return math.ceil(len(text) / 4)
+
+
+class SpeculationBudgetExhausted(Exception):
+    """Raised when a speculative call exceeds the budget of its request."""
+
+
+class SpeculationBudget:
+    """Number of speculative LLM calls a request may still make."""
+
+    def __init__(self, max_calls: int) -> None:
+        """Initialize the budget.
+
+        Args:
+            max_calls: Speculative calls allowed.
+        """
+        self.max_calls = max_calls
+        self.calls = 0
+
+    def charge(self) -> None:
+        """Charge one speculative call.
+
+        Raises:
+            SpeculationBudgetExhausted: If every allowed call was made.
+        """
+        if self.calls >= self.max_calls:
+            raise SpeculationBudgetExhausted(
+                f"Speculation budget of {self.max_calls} calls exhausted"
+            )
+        self.calls += 1
+
+
+_speculation: ContextVar[Optional[SpeculationBudget]] = ContextVar(
+    "llm_speculation", default=None
+)
+
+
+@contextmanager
+def speculate(budget: SpeculationBudget) -> Iterator[SpeculationBudget]:
+    """Make the LLM calls of the enclosed code speculative.
+
+    Args:
+        budget: Budget charged for each call.
+
+    Yields:
+        SpeculationBudget: The budget.
+    """
+    token = _speculation.set(budget)
+    try:
+        yield budget
+    finally:
+        _speculation.reset(token)
+
+
+class LLMScheduler:
+    """FIFO scheduler enforcing in-flight, RPM and TPM budgets.
+
+    Attributes:
+        max_in_flight (int): Maximum number of concurrent calls
+        requests_per_minute (Optional[int]): Request budget per window
+        tokens_per_minute (Optional[int]): Token budget per window
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            max_in_flight: Maximum number of calls running at once.
+            requests_per_minute: Calls allowed per window, None for no limit.
+            tokens_per_minute: Estimated tokens allowed per window, None for
+                no limit.
+            window_seconds: Length of the sliding rate window.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window_seconds = window_seconds
+        self._clock = clock
+        # asyncio.Lock wakes its waiters in FIFO order, and only the caller
+        # holding it waits for capacity, so callers are admitted in order.
+        # Both are bound to the event loop they are created in.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._admission: Optional[asyncio.Lock] = None
+        self._capacity: Optional[asyncio.Condition] = None
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._in_flight = 0
+        self._queued = 0
+        self._critical_queued = 0
+        self._admitted = 0
+        self._speculative = 0
+        self._rate_limited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0) -> AsyncIterator[None]:
+        """Wait for a turn within every budget and hold it for one call.
+
+        Speculative calls (made inside ``speculate``) are charged to their
+        budget, and wait for a free slot with no other call queued.
+
+        Args:
+            estimated_tokens: Estimated prompt plus completion tokens.
+
+        Yields:
+            None: While the call is in flight.
+
+        Raises:
+            SpeculationBudgetExhausted: If the call is speculative and its
+                budget is spent.
+        """
+        admission, capacity = self._primitives()
+        budget = _speculation.get()
+        start = self._clock()
+        self._queued += 1
+        try:
+            if budget is not None:
+                budget.charge()
+                self._speculative += 1
+                await self._wait_for_idle_slot(capacity)
+            else:
+                self._critical_queued += 1
+            try:
+                async with admission:
+                    await self._wait_for_capacity(capacity)
+                    await self._wait_for_rate(estimated_tokens)
+                    self._in_flight += 1
+                    self._record_admission(estimated_tokens, start)
+            finally:
+                if budget is None:
+                    self._critical_queued -= 1
+                    if not self._critical_queued:
+                        async with capacity:
+                            capacity.notify_all()
+        finally:
+            self._queued -= 1
+
+        try:
+            yield
+        finally:
+            async with capacity:
+                # A slot of a replaced loop was dropped with its counts
+                if capacity is self._capacity:
+                    self._in_flight -= 1
+                # Waiters wait for different conditions
+                capacity.notify_all()
+
+    def _primitives(self) -> Tuple[asyncio.Lock, asyncio.Condition]:
+        """Admission lock and capacity condition of the running loop.
+
+        The scheduler is built at import time and outlives event loops
+        (tests, benchmarks and ``TestClient`` without ``with`` run one loop
+        per call), so the primitives are re-created whenever the running
+        loop changes. Calls of the previous loop are gone with it, even those
+        abandoned before they released their slot, so the counts of calls
+        in flight and queued start over as well.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._admission = asyncio.Lock()
+            self._capacity = asyncio.Condition()
+            self._in_flight = 0
+            self._queued = 0
+            self._critical_queued = 0
+        return self._admission, self._capacity
+
+    async def _wait_for_idle_slot(self, capacity: asyncio.Condition) -> None:
+        async with capacity:
+            await capacity.wait_for(
+                lambda: self._in_flight < self.max_in_flight
+                and not self._critical_queued
+            )
+
+    async def _wait_for_capacity(self, capacity: asyncio.Condition) -> None:
+        async with capacity:
+            await capacity.wait_for(
+                lambda: self._in_flight < self.max_in_flight
+            )
+
+    async def _wait_for_rate(self, estimated_tokens: int) -> None:
+        rate_limited = False
+        while True:
+            delay = self._rate_delay(estimated_tokens)
+            if delay <= 0:
+                break
+            rate_limited = True
+            await asyncio.sleep(delay)
+        if rate_limited:
+            self._rate_limited += 1
+
+    def _rate_delay(self, estimated_tokens: int) -> float:
+        """Seconds until the call fits the rate budgets (0 if it fits)."""
+        now = self._clock()
+        window_start = now - self._window_seconds
+        while self._window and self._window[0][0] <= window_start:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+        if not self._window:
+            # A single call always fits an empty window, even if its
+            # estimate exceeds the token budget on its own.
+            return 0.0
+
+        fits_requests = (
+            self.requests_per_minute is None
+            or len(self._window) < self.requests_per_minute
+        )
+        fits_tokens = (
+            self.tokens_per_minute is None
+            or self._window_tokens + estimated_tokens <= self.tokens_per_minute
+        )
+        if fits_requests and fits_tokens:
+            return 0.0
+        return self._window[0][0] + self._window_seconds - now
+
+    def _record_admission(self, estimated_tokens: int, start: float) -> None:
+        now = self._clock()
+        self._window.append((now, estimated_tokens))
+        self._window_tokens += estimated_tokens
+        wait = now - start
+        self._admitted += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue, wait-time and budget usage figures.
+
+        Returns:
+            Dict[str, Any]: Scheduler metrics for the metrics registry.
+        """
+        return {
+            "queue_depth": self._queued,
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "admitted": self._admitted,
+            "speculative": self._speculative,
+            "rate_limited": self._rate_limited,
+            "avg_wait_seconds": (
+                self._total_wait / self._admitted if self._admitted else 0.0
+            ),
+            "max_wait_seconds": self._max_wait,
+            "window_requests": len(self._window),
+            "window_tokens": self._window_tokens,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+        }
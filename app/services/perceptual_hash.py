@@ -0,0 +1,186 @@
+"""
+Perceptual hashing of circuit sheets for near-duplicate detection.
+
+Two photos of the same hand-drawn sheet taken seconds apart never share
+their bytes, but their perceptual hashes differ in only a few bits.
+``PerceptualHashIndex`` keeps the hashes of recently analyzed sheets so a
+new submission within a Hamming distance threshold can reuse the earlier
+analysis.
+
+Sheets are hashed with a 256-bit DCT hash (pHash). Hand-drawn circuits
+on white paper look alike at low resolution: the 64-bit dHash of two
+different benchmark sheets (v1/circuit_2 and v1/circuit_4) differs by
+only 7 bits, about as much as a re-encoded photo of one sheet. Their
+pHashes differ by 72 bits or more, against 14 at most for re-encoded,
+shifted or re-exposed copies of a sheet.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def compute_phash(image: np.ndarray, hash_size: int = 16) -> int:
+    """Compute the DCT perceptual hash of an image.
+
+    The image is reduced to a ``4 * hash_size`` square grayscale thumbnail,
+    and each bit encodes whether one of its ``hash_size x hash_size``
+    lowest DCT frequencies is above their median (the DC term excluded).
+
+    Args:
+        image: BGR or grayscale image.
+        hash_size: Number of frequencies kept per axis.
+
+    Returns:
+        int: The ``hash_size ** 2`` bit hash.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    side = hash_size * 4
+    thumbnail = cv2.resize(
+        image, (side, side), interpolation=cv2.INTER_AREA
+    ).astype(np.float32)
+    frequencies = cv2.dct(thumbnail)[:hash_size, :hash_size].flatten()
+    bits = frequencies > np.median(frequencies[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Return the number of differing bits between two hashes."""
+    return bin(first ^ second).count("1")
+
+
+class NearDuplicateStats:
+    """Lookup, hit and false-match counters of a perceptual hash index."""
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.lookups = 0
+        self.hits = 0
+        self.verifications = 0
+        self.false_matches = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a dictionary.
+
+        Returns:
+            Dict[str, Any]: Counter values with the derived hit rate and
+            false-match rate (over verified hits).
+        """
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "verifications": self.verifications,
+            "false_matches": self.false_matches,
+            "false_match_rate": (
+                self.false_matches / self.verifications
+                if self.verifications else 0.0
+            ),
+        }
+
+
+class PerceptualHashIndex:
+    """Bounded index of recent perceptual hashes searchable by distance.
+
+    Entries are kept in insertion order and evicted once the index holds
+    ``max_entries`` entries or an entry is older than ``ttl_seconds``.
+    Lookups are a linear scan, which is cheap for the few hundred recent
+    sheets the index is meant to hold.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        max_entries: int,
+        ttl_seconds: float
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            threshold: Maximum Hamming distance treated as a duplicate.
+            max_entries: Maximum number of hashes kept.
+            ttl_seconds: Age after which an entry is dropped; 0 keeps
+                entries until they are evicted by size.
+        """
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self.stats = NearDuplicateStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def find(self, phash: int) -> Optional[Tuple[Any, int]]:
+        """Find the closest recent entry within the distance threshold.
+
+        Args:
+            phash: Perceptual hash of the new image.
+
+        Returns:
+            Optional[Tuple[Any, int]]: The stored value and its distance,
+            or None if no entry is close enough.
+        """
+        with self._lock:
+            self._expire()
+            self.stats.lookups += 1
+            best: Optional[Tuple[Any, int]] = None
+            for stored_hash, (_, value) in self._entries.items():
+                distance = hamming_distance(phash, stored_hash)
+                if distance <= self._threshold and (
+                    best is None or distance < best[1]
+                ):
+                    best = (value, distance)
+            if best is not None:
+                self.stats.hits += 1
+            return best
+
+    def add(self, phash: int, value: Any) -> None:
+        """Store the analysis of an image under its perceptual hash.
+
+        Args:
+            phash: Perceptual hash of the image.
+            value: Analysis result to reuse for near-duplicates.
+        """
+        with self._lock:
+            self._entries[phash] = (time.monotonic(), value)
+            self._entries.move_to_end(phash)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def record_verification(self, matched: bool) -> None:
+        """Record whether a verified near-duplicate hit was correct.
+
+        Args:
+            matched: True if a fresh analysis agreed with the reused one.
+        """
+        with self._lock:
+            self.stats.verifications += 1
+            if not matched:
+                self.stats.false_matches += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a metrics snapshot of the index.
+
+        Returns:
+            Dict[str, Any]: Counter values and the number of entries.
+        """
+        metrics = self.stats.as_dict()
+        metrics["entries"] = len(self._entries)
+        metrics["threshold"] = self._threshold
+        return metrics
+
+    def _expire(self) -> None:
+        if not self._ttl:
+            return
+        cutoff = time.monotonic() - self._ttl
+        while self._entries:
+            oldest_hash = next(iter(self._entries))
+            if self._entries[oldest_hash][0] >= cutoff:
+                break
+            del self._entries[oldest_hash]
@@ -0,0 +1,50 @@
+"""
+Progress events of a running analysis.
+
+Pipeline stages report intermediate results (crop ready, each component
+and connection decided) with ``emit_progress``. Callers interested in them,
+such as the streaming endpoints, install a listener with
+``listen_progress``. The listener lives in a context variable, so it
+follows the analysis through every coroutine and task it starts without
+being passed through each service call, and concurrent requests never see
+each other's events.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+ProgressListener = Callable[[str, Dict[str, Any]], None]
+
+_listener: ContextVar[Optional[ProgressListener]] = ContextVar(
+    "progress_listener", default=None
+)
+
+
+def emit_progress(event: str, data: Dict[str, Any]) -> None:
+    """Report a progress event to the listener of the current analysis.
+
+    Args:
+        event: Name of the event, e.g. "component".
+        data: JSON-serializable payload of the event.
+    """
+    listener = _listener.get()
+    if listener is not None:
+        listener(event, data)
+
+
+@contextmanager
+def listen_progress(listener: Optional[ProgressListener]) -> Iterator[None]:
+    """Send the progress events emitted within the block to a listener.
+
+    Args:
+        listener: Called synchronously with the name and payload of each
+            event, or None to discard the events of the block.
+
+    Yields:
+        None
+    """
+    token = _listener.set(listener)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
@@ -0,0 +1,386 @@
+"""
+Content-addressed caching of analysis results.
+
+The cache is made of pluggable backends that share the ``CacheBackend``
+interface: a bounded in-process LRU tier with TTL expiry, an optional
+SQLite tier that survives restarts, and ``TieredCache`` which chains the
+two so that disk hits are promoted back into memory.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import Settings
+
+
+def make_cache_key(*parts: str) -> str:
+    """Build a SHA-256 cache key from an ordered sequence of parts.
+
+    Args:
+        *parts: Strings that together identify a cached value.
+
+    Returns:
+        str: Hex digest identifying the combination of parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class CacheStats:
+    """Hit, miss and eviction counters for a cache backend."""
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a dictionary.
+
+        Returns:
+            Dict[str, Any]: Counter values and the derived hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CacheBackend(ABC):
+    """Interface shared by all result cache backends."""
+
+    def __init__(self) -> None:
+        """Initialize the backend statistics."""
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or None on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable ``value`` under ``key``."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry from the backend."""
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a metrics snapshot for this backend.
+
+        Returns:
+            Dict[str, Any]: Counter values of the backend.
+        """
+        return self.stats.as_dict()
+
+
+class MemoryLRUCache(CacheBackend):
+    """In-process LRU cache with entry-count and TTL eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        """Initialize the memory cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before the least
+                recently used one is evicted.
+            ttl_seconds: Time-to-live of an entry; 0 disables expiry.
+        """
+        super().__init__()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self._ttl if self._ttl else 0.0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self.stats.sets += 1
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        metrics = super().metrics()
+        metrics["entries"] = len(self._entries)
+        return metrics
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache tier stored in a SQLite table.
+
+    Values are stored as JSON. Entries are ordered by last access so the
+    table can be trimmed to ``max_entries`` in LRU order.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        max_entries: int,
+        ttl_seconds: float
+    ) -> None:
+        """Open (and create if needed) the cache table.
+
+        Args:
+            path: Path of the SQLite database file.
+            table: Name of the table holding the entries.
+            max_entries: Maximum number of rows kept in the table.
+            ttl_seconds: Time-to-live of an entry; 0 disables expiry.
+
+        Raises:
+            ValueError: If the table name is not a valid identifier.
+        """
+        super().__init__()
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+
+        self._table = table
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_accessed_at "
+                f"ON {table} (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at and expires_at < now:
+                self._connection.execute(
+                    f"DELETE FROM {self._table} WHERE key = ?", (key,)
+                )
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._connection.execute(
+                f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?",
+                (now, key)
+            )
+        self.stats.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires_at = now + self._ttl if self._ttl else 0.0
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self._table} "
+                "(key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self.stats.sets += 1
+            (count,) = self._connection.execute(
+                f"SELECT COUNT(*) FROM {self._table}"
+            ).fetchone()
+            overflow = count - self._max_entries
+            if overflow > 0:
+                self._connection.execute(
+                    f"DELETE FROM {self._table} WHERE key IN ("
+                    f"SELECT key FROM {self._table} "
+                    "ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.stats.evictions += overflow
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self._table}")
+
+
+class TieredCache(CacheBackend):
+    """Memory-first cache with an optional persistent second tier."""
+
+    def __init__(
+        self,
+        memory: MemoryLRUCache,
+        disk: Optional[CacheBackend] = None
+    ) -> None:
+        """Initialize the tiered cache.
+
+        Args:
+            memory: The in-process tier, consulted first.
+            disk: Optional persistent tier consulted on memory misses.
+        """
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.stats.sets += 1
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        metrics = super().metrics()
+        metrics["evictions"] = self.memory.stats.evictions
+        metrics["memory"] = self.memory.metrics()
+        if self.disk is not None:
+            metrics["evictions"] += self.disk.stats.evictions
+            metrics["disk"] = self.disk.metrics()
+        return metrics
+
+
+def build_tiered_cache(
+    max_entries: int,
+    ttl_seconds: float,
+    sqlite_path: Optional[str],
+    disk_max_entries: int,
+    table: str
+) -> TieredCache:
+    """Build a memory cache optionally backed by a SQLite tier.
+
+    Args:
+        max_entries: Maximum number of entries of the memory tier.
+        ttl_seconds: Time-to-live of entries in both tiers.
+        sqlite_path: Path of the SQLite database, or None for memory only.
+        disk_max_entries: Maximum number of rows of the SQLite tier.
+        table: SQLite table name used by the persistent tier.
+
+    Returns:
+        TieredCache: The configured cache.
+    """
+    memory = MemoryLRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    disk = None
+    if sqlite_path:
+        disk = SQLiteCache(
+            path=sqlite_path,
+            table=table,
+            max_entries=disk_max_entries,
+            ttl_seconds=ttl_seconds
+        )
+        logger.info(f"Cache table {table} persisted to {sqlite_path}")
+    return TieredCache(memory, disk)
+
+
+def build_result_cache(
+    settings: Settings,
+    table: str = "pipeline_results"
+) -> Optional[TieredCache]:
+    """Build the pipeline result cache configured in the settings.
+
+    Args:
+        settings: Application settings.
+        table: SQLite table name used by the persistent tier.
+
+    Returns:
+        Optional[TieredCache]: The configured cache, or None if caching
+        is disabled.
+    """
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+
+    return build_tiered_cache(
+        max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESULT_CACHE_TTL,
+        sqlite_path=settings.RESULT_CACHE_SQLITE_PATH,
+        disk_max_entries=settings.RESULT_CACHE_DISK_MAX_ENTRIES,
+        table=table
+    )
+
+
+def build_llm_cache(
+    settings: Settings,
+    table: str = "llm_responses"
+) -> Optional[TieredCache]:
+    """Build the LLM call memoization cache configured in the settings.
+
+    Args:
+        settings: Application settings.
+        table: SQLite table name used by the persistent tier.
+
+    Returns:
+        Optional[TieredCache]: The configured cache, or None if call
+        memoization is disabled.
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    return build_tiered_cache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.LLM_CACHE_TTL,
+        sqlite_path=settings.LLM_CACHE_SQLITE_PATH,
+        disk_max_entries=settings.LLM_CACHE_DISK_MAX_ENTRIES,
+        table=table
+    )
@@ -0,0 +1,280 @@
+"""
+Retry policy of individual LLM calls.
+
+An analysis fans out into many presence and connection checks. A transient
+failure of one of them (rate limit, 5xx, timeout, malformed JSON) should
+not fail the whole request, so ``LLMService`` retries the failed call alone
+according to a ``RetryPolicy``: errors are classified as retryable or not,
+retries back off exponentially with full jitter, a ``Retry-After`` header
+sent by the provider is honored, and the time spent retrying is charged to
+a ``RetryBudget`` shared by every call of the analysis request.
+"""
+import asyncio
+import email.utils
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import httpx
+from groq import APIConnectionError
+
+# Status codes worth retrying besides every 5xx
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429})
+
+
+class LLMRequestError(ValueError):
+    """Failed LLM call, carrying whether it is worth retrying.
+
+    Attributes:
+        retryable (bool): Whether a new attempt may succeed
+        retry_after (Optional[float]): Seconds the provider asked to wait
+    """
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = False,
+        retry_after: Optional[float] = None
+    ) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header value.
+
+    Args:
+        value: Delay in seconds or HTTP date, as sent by the provider.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if absent or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def classify_error(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """Decide whether a failed provider call is worth retrying.
+
+    The exception chain is followed, so provider errors re-raised as
+    ValueError are still classified by their original cause.
+
+    Args:
+        error: Exception raised by the provider call.
+
+    Returns:
+        Tuple[bool, Optional[float]]: Whether the call is retryable and the
+        delay requested by a Retry-After header, if any.
+    """
+    current: Optional[BaseException] = error
+    while current is not None:
+        if isinstance(current, LLMRequestError):
+            return current.retryable, current.retry_after
+        if isinstance(current, (
+            asyncio.TimeoutError,
+            ConnectionError,
+            httpx.TransportError,
+            APIConnectionError,
+        )):
+            return True, None
+        status_code = getattr(current, "status_code", None)
+        if isinstance(status_code, int):
+            retryable = (
+                status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+            )
+            return retryable, _retry_after_of(current)
+        current = current.__cause__ or current.__context__
+    return False, None
+
+
+def _retry_after_of(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        seconds = parse_retry_after(retry_after_ms)
+        return seconds / 1000 if seconds is not None else None
+    return parse_retry_after(headers.get("retry-after"))
+
+
+class RetryBudget:
+    """Seconds of retrying allowed to all the LLM calls of one request."""
+
+    def __init__(self, total_seconds: float) -> None:
+        """Initialize the budget.
+
+        Args:
+            total_seconds: Backoff plus retried attempt time allowed.
+        """
+        self.total_seconds = total_seconds
+        self.spent = 0.0
+
+    @property
+    def remaining(self) -> float:
+        """Seconds of retrying left."""
+        return max(0.0, self.total_seconds - self.spent)
+
+    def spend(self, seconds: float) -> None:
+        """Charge time spent retrying to the budget."""
+        self.spent += seconds
+
+
+_budget: ContextVar[Optional[RetryBudget]] = ContextVar(
+    "retry_budget", default=None
+)
+
+
+def current_retry_budget() -> Optional[RetryBudget]:
+    """Budget of the request being processed, if one was installed."""
+    return _budget.get()
+
+
+@contextmanager
+def retry_budget(budget: RetryBudget) -> Iterator[RetryBudget]:
+    """Charge the retries of the calls made within the block to a budget.
+
+    The budget follows the block into the tasks it starts, so concurrent
+    checks of one analysis share it.
+
+    Args:
+        budget: Budget of the request.
+
+    Yields:
+        RetryBudget: The installed budget.
+    """
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+class RetryStats:
+    """Counters of retried LLM calls.
+
+    Attributes:
+        retries (int): Retry attempts made
+        recovered (int): Calls that succeeded after at least one retry
+        not_retryable (int): Calls failed with a non-retryable error
+        attempts_exhausted (int): Calls failed after max_attempts
+        budget_exhausted (int): Calls failed because the request budget
+            could not cover the next backoff
+    """
+
+    def __init__(self) -> None:
+        self.retries = 0
+        self.recovered = 0
+        self.not_retryable = 0
+        self.attempts_exhausted = 0
+        self.budget_exhausted = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters for the metrics registry."""
+        return {
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "not_retryable": self.not_retryable,
+            "attempts_exhausted": self.attempts_exhausted,
+            "budget_exhausted": self.budget_exhausted,
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and budget.
+
+    Attributes:
+        max_attempts (int): Attempts per call, including the first one
+        base_delay (float): Backoff ceiling of the first retry in seconds
+        max_delay (float): Upper bound of the backoff ceiling in seconds
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        rng: Callable[[], float] = random.random
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            max_attempts: Attempts per call, 1 disables retries.
+            base_delay: Backoff ceiling of the first retry, doubled for each
+                following one.
+            max_delay: Upper bound of the backoff ceiling.
+            rng: Source of uniform numbers in [0, 1), injectable for tests.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng
+        self.stats = RetryStats()
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before the retry following a failed attempt.
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 1.
+
+        Returns:
+            float: Seconds drawn uniformly below the exponential ceiling.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return ceiling * self._rng()
+
+    def next_delay(
+        self,
+        error: BaseException,
+        attempt: int,
+        budget: RetryBudget
+    ) -> Optional[float]:
+        """Decide whether and when to retry a failed attempt.
+
+        Args:
+            error: Exception raised by the attempt.
+            attempt: Number of the attempt that failed, starting at 1.
+            budget: Retry budget of the request.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None if the
+            call must fail.
+        """
+        retryable, retry_after = classify_error(error)
+        if not retryable:
+            self.stats.not_retryable += 1
+            return None
+        if attempt >= self.max_attempts:
+            self.stats.attempts_exhausted += 1
+            return None
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if delay > budget.remaining:
+            self.stats.budget_exhausted += 1
+            return None
+        budget.spend(delay)
+        self.stats.retries += 1
+        return delay
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the retry counters and policy for the metrics registry."""
+        return {
+            **self.stats.as_dict(),
+            "max_attempts": self.max_attempts,
+        }
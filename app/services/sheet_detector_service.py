@@ -1,12 +1,49 @@
 import cv2
 import numpy as np
-from typing import Dict, Optional, Tuple
+from typing import (
+    TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
+)
 import asyncio
 import os
 from pydantic import BaseModel
-from app.services.llm_client import LLMService
+from app.services.cv_executor import CVExecutor
+from app.services.cv_process_pool import (
+    CVProcessExecutor, get_cv_pipeline_executor
+)
+from app.services.image_context import ImageContext
+from app.services.perceptual_hash import compute_phash
 from app.prompt_schemas.circuit_location_schema import CircuitLocation
 
+if TYPE_CHECKING:
+    # Not imported at runtime so that CV worker processes, which import
+    # this module, do not load the LLM clients
+    from app.services.llm_client import LLMService
+
+
+# Smallest contour area in pixels considered a circuit at full resolution
+CIRCUIT_MIN_AREA = 1000
+# Reductions of the photo the contour search can run on (1 disables it),
+# with the OpenCV flags decoding the photo reduced by them
+_REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+}
+DETECTION_SCALES = (1, *_REDUCED_DECODE_FLAGS)
+# Reduced-scale pixels added around the contours found at reduced scale
+# before refining them at full resolution
+PYRAMID_PADDING = 6
+# Full-resolution pixels from an edge of the refinement window within
+# which a contour may be cut by it (blur, Canny and closing support)
+PYRAMID_EDGE_GUARD = 5
+
+
+class CircuitCrop(NamedTuple):
+    """Result of the CV pipeline: the crop bounds and its encodings."""
+    bounds: Tuple[int, int, int, int]  # x_start, y_start, x_end, y_end
+    jpeg_bytes: bytes
+    perceptual_hash: int
+
+
 class SheetDetectorService:
     """Service for detecting and processing circuit diagrams in images.
     
@@ -22,10 +59,24 @@ class SheetDetectorService:
     The service includes debug capabilities that can save intermediate processing
     steps as images for troubleshooting and optimization.
 
+    The OpenCV steps are CPU-bound and run off the event loop, decoding
+    included, on the executor selected by CV_EXECUTOR: the CV thread pool,
+    or worker processes receiving the frame through shared memory and
+    returning only the crop bounds and encodings.
+
+    With a ``detection_scale`` above 1, the contour is searched on a copy
+    of the photo decoded at reduced resolution (or reduced from the frame
+    when the photo is already decoded), and its bounds are scaled back to
+    crop the full-resolution photo.
+
     Attributes:
         debug (bool): When True, saves intermediate processing steps as images
         _debug_dir (str): Directory where debug images are saved
         llm_service (LLMService): Service for LLM-based image analysis
+        detection_scale (int): Reduction of the photo searched (1, 2, 4)
+        pipeline_executor (Union[CVExecutor, CVProcessExecutor]): Runs
+            the crop pipeline, ``executor`` if given and no
+            ``pipeline_executor`` is
 
     Note:
         While named 'SheetDetector', this service actually focuses on detecting
@@ -34,14 +85,45 @@ class SheetDetectorService:
         obscured or held by users.
     """
 
-    def __init__(self, llm_service: LLMService, debug: bool = False):
+    def __init__(
+        self,
+        llm_service: "LLMService",
+        debug: bool = False,
+        detection_scale: int = 1,
+        executor: Optional[CVExecutor] = None,
+        pipeline_executor: Optional[
+            Union[CVExecutor, CVProcessExecutor]
+        ] = None
+    ):
+        if detection_scale not in DETECTION_SCALES:
+            raise ValueError(
+                f"detection_scale must be one of {DETECTION_SCALES}, "
+                f"not {detection_scale}"
+            )
         self.debug = debug
+        self.detection_scale = detection_scale
         self._debug_dir = "debug_images"
         self.llm_service = llm_service
+        self.pipeline_executor = (
+            pipeline_executor or executor or get_cv_pipeline_executor()
+        )
         if debug:
             os.makedirs(self._debug_dir, exist_ok=True)
 
-    async def _get_circuit_location(self, image_bytes: bytes) -> CircuitLocation:
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle only the CV configuration, for the CV worker processes."""
+        return {
+            "debug": self.debug,
+            "detection_scale": self.detection_scale,
+            "_debug_dir": self._debug_dir,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.llm_service = None
+        self.pipeline_executor = None
+
+    async def _get_circuit_location(self, image: ImageContext) -> CircuitLocation:
         """Use LLM to identify the approximate location of the circuit."""
         prompt = """
         Analyze this image and identify the approximate location of the hand-drawn circuit diagram.
@@ -55,7 +137,7 @@ class SheetDetectorService:
         
         location = await self.llm_service.communicate(
             prompt=prompt,
-            image_bytes=image_bytes,
+            image_bytes=image,
             schema=CircuitLocation
         )
         return CircuitLocation(**location)
@@ -88,14 +170,173 @@ class SheetDetectorService:
             path = os.path.join(self._debug_dir, f"{name}.jpg")
             cv2.imwrite(path, image)
 
-    async def process_uploaded_image(self, image_bytes: bytes) -> Dict[str, Optional[bytes]]:
-        """Processes the uploaded image to detect and extract the circuit diagram."""
-        image = self._read_image(image_bytes)
-        self._save_debug_image(image, "1_original")
-        
+    async def process_uploaded_image(
+        self,
+        image_bytes: Union[bytes, ImageContext]
+    ) -> Dict[str, Any]:
+        """Processes the uploaded image to detect and extract the circuit diagram.
+
+        The result holds a status message, the encoded cropped image, an
+        ImageContext of the crop for the next stages, and the perceptual
+        hash of the crop (None when no circuit was found).
+        """
+        image_context = ImageContext.ensure(image_bytes)
+
         # Get circuit location from LLM
-        location = await self._get_circuit_location(image_bytes)
+        location = await self._get_circuit_location(image_context)
+
+        crop = await self.pipeline_executor.run(
+            self._crop_circuit, image_context, location
+        )
+        if crop is None:
+            return {
+                "status": "Circuit diagram not found.",
+                "cropped_image": None,
+                "cropped_context": None,
+                "perceptual_hash": None
+            }
+
+        # Decoded from the JPEG if needed: a slice of the frame would keep
+        # the whole frame alive, and would not match the bytes exactly
+        cropped_context = ImageContext(crop.jpeg_bytes, mime_type="image/jpeg")
         
+        return {
+            "status": "Circuit diagram detected and cropped successfully.",
+            "cropped_image": crop.jpeg_bytes,
+            "cropped_context": cropped_context,
+            "perceptual_hash": crop.perceptual_hash
+        }
+
+    def _crop_circuit(
+        self,
+        image_context: ImageContext,
+        location: CircuitLocation
+    ) -> Optional[CircuitCrop]:
+        """Find and crop the circuit around its LLM-provided location.
+
+        Blocking OpenCV work including the decoding, run by the pipeline
+        executor (possibly in a worker process, on a frame in shared
+        memory).
+
+        Returns:
+            Optional[CircuitCrop]: The crop, None if no circuit was found.
+        """
+        if self.detection_scale > 1:
+            return self._crop_circuit_reduced(image_context, location)
+
+        image = image_context.array
+        if image is None:
+            return None
+        self._save_debug_image(image, "1_original")
+        return self._crop_full_resolution(image, location)
+
+    def _crop_circuit_reduced(
+        self,
+        image_context: ImageContext,
+        location: CircuitLocation
+    ) -> Optional[CircuitCrop]:
+        """Find the circuit on a reduced copy of the photo, crop at full size.
+
+        A JPEG photo is decoded reduced by ``detection_scale`` (libjpeg
+        scales it while decoding), unless the context already holds the
+        full-resolution frame. Other formats decode at full resolution
+        only, so their frame, needed for the crop anyway, is reduced
+        instead. The corners of the circuit-like contours found there are
+        scaled back, and the contour search is repeated at full resolution
+        only inside that padded window, so the crop is the one a full
+        search gives. When the window holds nothing, or a contour reaching
+        one of its edges (it may extend past it), the full-resolution
+        search runs instead.
+
+        Returns:
+            Optional[CircuitCrop]: The crop, None if no circuit was found.
+        """
+        scale = self.detection_scale
+        if image_context.decoded or image_context.mime_type != "image/jpeg":
+            image = image_context.array
+            if image is None:
+                return None
+            height, width = image.shape[:2]
+            reduced = cv2.resize(
+                image,
+                (-(-width // scale), -(-height // scale)),
+                interpolation=cv2.INTER_AREA
+            )
+        else:
+            reduced = cv2.imdecode(
+                np.frombuffer(image_context.raw_bytes, np.uint8),
+                _REDUCED_DECODE_FLAGS[scale]
+            )
+            if reduced is None:
+                return None
+        self._save_debug_image(reduced, "1_original")
+
+        reduced_roi, (x_offset, y_offset) = self._get_region_of_interest(
+            reduced, location
+        )
+        candidates = self._find_circuit_contours(
+            self._preprocess_image(reduced_roi),
+            min_area=CIRCUIT_MIN_AREA / scale ** 2
+        )
+
+        # The crop is cut from the full-resolution photo
+        image = image_context.array
+        if image is None:
+            return None
+        if not candidates:
+            return self._crop_full_resolution(image, location)
+
+        # Reduced pixel i covers full-resolution pixels [i * r, (i + 1) * r)
+        # where r is close to the scale (reduced sizes are rounded up)
+        x, y, w, h = cv2.boundingRect(np.concatenate(candidates))
+        x_ratio = image.shape[1] / reduced.shape[1]
+        y_ratio = image.shape[0] / reduced.shape[0]
+        roi, (roi_x, roi_y) = self._get_region_of_interest(image, location)
+        roi_x_end = roi_x + roi.shape[1]
+        roi_y_end = roi_y + roi.shape[0]
+        x_start = max(
+            roi_x, int((x + x_offset - PYRAMID_PADDING) * x_ratio)
+        )
+        y_start = max(
+            roi_y, int((y + y_offset - PYRAMID_PADDING) * y_ratio)
+        )
+        x_end = min(
+            roi_x_end,
+            int(np.ceil((x + w + x_offset + PYRAMID_PADDING) * x_ratio))
+        )
+        y_end = min(
+            roi_y_end,
+            int(np.ceil((y + h + y_offset + PYRAMID_PADDING) * y_ratio))
+        )
+
+        window = self._preprocess_image(image[y_start:y_end, x_start:x_end])
+        self._save_debug_image(window, "3_preprocessed")
+        circuit_contour = self._find_circuit_contour(window)
+        if circuit_contour is None:
+            return self._crop_full_resolution(image, location)
+
+        # Window edges inside the region of interest may cut a contour
+        # that the full-resolution search sees whole
+        cx, cy, cw, ch = cv2.boundingRect(circuit_contour)
+        guard = PYRAMID_EDGE_GUARD
+        if (
+            (x_start > roi_x and cx < guard)
+            or (y_start > roi_y and cy < guard)
+            or (x_end < roi_x_end and cx + cw > window.shape[1] - guard)
+            or (y_end < roi_y_end and cy + ch > window.shape[0] - guard)
+        ):
+            return self._crop_full_resolution(image, location)
+
+        return self._cut_crop(
+            image, circuit_contour + np.array([x_start, y_start])
+        )
+
+    def _crop_full_resolution(
+        self,
+        image: np.ndarray,
+        location: CircuitLocation
+    ) -> Optional[CircuitCrop]:
+        """Search the whole region of interest of the photo and crop it."""
         # Get region of interest
         roi, (x_offset, y_offset) = self._get_region_of_interest(image, location)
         self._save_debug_image(roi, "2_roi")
@@ -107,34 +348,34 @@ class SheetDetectorService:
         circuit_contour = self._find_circuit_contour(preprocessed_roi)
         
         if circuit_contour is None:
-            return {
-                "status": "Circuit diagram not found.",
-                "cropped_image": None
-            }
+            return None
         
         # Adjust contour coordinates to original image space
         circuit_contour += np.array([x_offset, y_offset])
-        
+        return self._cut_crop(image, circuit_contour)
+
+    def _cut_crop(
+        self,
+        image: np.ndarray,
+        circuit_contour: np.ndarray
+    ) -> CircuitCrop:
+        """Crop the image around the circuit contour and encode the crop."""
         # Save image with contour drawn
-        contour_image = image.copy()
-        cv2.drawContours(contour_image, [circuit_contour], -1, (0, 255, 0), 2)
-        self._save_debug_image(contour_image, "4_circuit_contour")
+        if self.debug:
+            contour_image = image.copy()
+            cv2.drawContours(contour_image, [circuit_contour], -1, (0, 255, 0), 2)
+            self._save_debug_image(contour_image, "4_circuit_contour")
         
-        warped_image = self._warp_perspective(image, circuit_contour)
+        bounds = self._crop_bounds(image, circuit_contour)
+        x_start, y_start, x_end, y_end = bounds
+        warped_image = image[y_start:y_end, x_start:x_end]
         self._save_debug_image(warped_image, "5_warped")
         
-        cropped_image_bytes = self._encode_image(warped_image)
-        
-        return {
-            "status": "Circuit diagram detected and cropped successfully.",
-            "cropped_image": cropped_image_bytes
-        }
-
-    def _read_image(self, image_bytes: bytes) -> np.ndarray:
-        """Converts image bytes to OpenCV image."""
-        image_np = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(image_np, cv2.IMREAD_COLOR)
-        return image
+        return CircuitCrop(
+            bounds=bounds,
+            jpeg_bytes=self._encode_image(warped_image),
+            perceptual_hash=compute_phash(warped_image)
+        )
 
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """Preprocess the image for contour detection."""
@@ -150,15 +391,7 @@ class SheetDetectorService:
 
     def _find_circuit_contour(self, edged: np.ndarray) -> Optional[np.ndarray]:
         """Finds the contour of the circuit diagram."""
-        contours, _ = cv2.findContours(edged.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
-            return None
-
-        # Filter contours by size and aspect ratio
-        circuit_contours = [
-            c for c in contours if self._is_circuit_contour(c)
-        ]
-
+        circuit_contours = self._find_circuit_contours(edged)
         if not circuit_contours:
             return None
 
@@ -167,15 +400,39 @@ class SheetDetectorService:
         
         return circuit_contours[0]
 
-    def _is_circuit_contour(self, contour: np.ndarray) -> bool:
+    def _find_circuit_contours(
+        self,
+        edged: np.ndarray,
+        min_area: float = CIRCUIT_MIN_AREA
+    ) -> List[np.ndarray]:
+        """Finds the contours likely to be the circuit diagram."""
+        contours, _ = cv2.findContours(
+            edged.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+
+        # Filter contours by size and aspect ratio
+        return [
+            c for c in contours if self._is_circuit_contour(c, min_area)
+        ]
+
+    def _is_circuit_contour(
+        self,
+        contour: np.ndarray,
+        min_area: float = CIRCUIT_MIN_AREA
+    ) -> bool:
         """Checks if the contour is likely a circuit diagram."""
         x, y, w, h = cv2.boundingRect(contour)
         aspect_ratio = w / h if h != 0 else 0
         area = cv2.contourArea(contour)
-        return 0.5 <= aspect_ratio <= 2.0 and area > 1000  # Adjust thresholds as needed
+        # Adjust thresholds as needed
+        return 0.5 <= aspect_ratio <= 2.0 and area > min_area
 
-    def _warp_perspective(self, image: np.ndarray, contour: np.ndarray) -> np.ndarray:
-        """Applies perspective transform to get a top-down view of the circuit."""
+    def _crop_bounds(
+        self,
+        image: np.ndarray,
+        contour: np.ndarray
+    ) -> Tuple[int, int, int, int]:
+        """Bounds of the crop around a contour, with a margin."""
         rect = cv2.boundingRect(contour)
         x, y, w, h = rect
         
@@ -187,10 +444,7 @@ class SheetDetectorService:
         y_start = max(y - margin, 0)
         x_end = min(x + w + margin, image.shape[1])
         y_end = min(y + h + margin, image.shape[0])
-        
-        # Crop the image with the new coordinates
-        cropped = image[y_start:y_end, x_start:x_end]
-        return cropped
+        return x_start, y_start, x_end, y_end
 
     def _encode_image(self, image: np.ndarray) -> bytes:
         """Encodes the image to bytes."""
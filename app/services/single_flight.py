@@ -0,0 +1,117 @@
+"""
+Coalescing of identical concurrent calls.
+
+A result cache only helps once an analysis has finished. When the same
+image is submitted several times while its first analysis is still
+running (client retries, a class uploading the same demo sheet), the
+later callers would start identical pipelines. ``SingleFlight`` makes
+them await the call that is already in flight instead.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlightStats:
+    """Counters of the calls made through a SingleFlight."""
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters as a dictionary.
+
+        Returns:
+            Dict[str, int]: Calls, executions and collapsed calls.
+        """
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+        }
+
+
+class _Flight:
+    """A shared call in progress and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its outcome.
+
+    The shared call runs in its own task. Each caller awaits it through
+    ``asyncio.shield``, so cancelling the caller that started it does not
+    cancel it for the others; it is only cancelled once every caller
+    awaiting it has been cancelled.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group with no call in flight."""
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.stats = SingleFlightStats()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Return the outcome of the call in flight for key, or start it.
+
+        Args:
+            key: Identifies calls that are interchangeable.
+            factory: Starts the call; only invoked if none is in flight.
+
+        Returns:
+            T: The result of the shared call.
+
+        Raises:
+            Exception: Whatever the shared call raised.
+        """
+        self.stats.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(
+                lambda _: self._forget(key, flight)
+            )
+            self.stats.executions += 1
+        else:
+            self.stats.collapsed += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller is gone, nobody needs the result any more.
+                # Later callers must start a new call, not join this one
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved when every caller is gone
+            flight.task.exception()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the counters and the number of calls in flight.
+
+        Returns:
+            Dict[str, Any]: Metrics for the metrics registry.
+        """
+        return {**self.stats.as_dict(), "in_flight": len(self._flights)}
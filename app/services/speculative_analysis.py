@@ -0,0 +1,301 @@
+"""
+Speculative overlap of the component and connection stages.
+
+Without speculation the connection checks of a schema analysis only start
+once every presence check has answered, so the request pays for both
+stages back to back. ``SpeculativeSchemaAnalyzer`` starts the connection
+checks of every candidate component pair together with the component
+stage, then cancels (or discards) the checks of pairs whose components
+turn out to be absent. Speculation trades provider quota for latency, so
+every speculative LLM call (verifications and retries included) is charged
+to a per-request budget, and the scheduler only gives speculative calls
+the slots left idle by the calls of the critical path.
+"""
+import asyncio
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from app.core.config import Settings
+from app.services.component_identifier_service import (
+    ComponentIdentifierService,
+)
+from app.services.connection_identifier_service import (
+    ComponentPair,
+    ConnectionIdentifierService,
+)
+from app.services.image_context import ImageContext
+from app.services.llm_scheduler import (
+    SpeculationBudget,
+    SpeculationBudgetExhausted,
+    speculate,
+)
+from app.services.progress import listen_progress
+
+PairKey = FrozenSet[str]
+
+
+def _pair_key(pair: ComponentPair) -> PairKey:
+    return frozenset((pair[0]["type"], pair[1]["type"]))
+
+
+def _discard(task: asyncio.Task) -> None:
+    """Cancel a task whose result is not needed, silencing its errors."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+class SpeculationStats:
+    """Counters of the speculative connection checks."""
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.requests = 0
+        self.speculative_calls = 0
+        self.cancelled_calls = 0
+        self.discarded_calls = 0
+        self.latency_saved_seconds = 0.0
+        self.last_latency_saved_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a dictionary.
+
+        Returns:
+            Dict[str, Any]: Call counters and estimated latency savings.
+        """
+        return {
+            "requests": self.requests,
+            "speculative_calls": self.speculative_calls,
+            "cancelled_calls": self.cancelled_calls,
+            "discarded_calls": self.discarded_calls,
+            "wasted_calls": self.cancelled_calls + self.discarded_calls,
+            "latency_saved_seconds": self.latency_saved_seconds,
+            "avg_latency_saved_seconds": (
+                self.latency_saved_seconds / self.requests
+                if self.requests else 0.0
+            ),
+            "last_latency_saved_seconds": self.last_latency_saved_seconds,
+        }
+
+
+class _TimedCheck:
+    """A connection check task over one or more pairs and its timing."""
+
+    def __init__(
+        self,
+        pairs: List[ComponentPair],
+        connection_identifier: ConnectionIdentifierService,
+        image: ImageContext,
+        budget: Optional[SpeculationBudget] = None
+    ) -> None:
+        self.pairs = pairs
+        self.budget = budget
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.task = asyncio.create_task(
+            self._run(connection_identifier, image)
+        )
+
+    async def _run(
+        self,
+        connection_identifier: ConnectionIdentifierService,
+        image: ImageContext
+    ) -> List[bool]:
+        try:
+            # Decisions are reported by the analyzer once they are known to
+            # be needed, not for the pairs of absent components
+            with listen_progress(None):
+                if self.budget is None:
+                    return await connection_identifier.check_pairs(
+                        self.pairs, image
+                    )
+                with speculate(self.budget):
+                    return await connection_identifier.check_pairs(
+                        self.pairs, image
+                    )
+        finally:
+            self.finished = time.perf_counter()
+
+
+class SpeculativeSchemaAnalyzer:
+    """Service running the component and connection stages concurrently."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        component_identifier: ComponentIdentifierService,
+        connection_identifier: ConnectionIdentifierService
+    ) -> None:
+        """Initialize the analyzer.
+
+        Args:
+            settings: Application settings with the speculation budget.
+            component_identifier: Service identifying the components.
+            connection_identifier: Service checking the connections.
+        """
+        self.settings = settings
+        self.component_identifier = component_identifier
+        self.connection_identifier = connection_identifier
+        self.stats = SpeculationStats()
+
+    def _speculative_units(
+        self,
+        candidate_pairs: List[ComponentPair]
+    ) -> List[List[ComponentPair]]:
+        """Group candidate pairs into the checks started speculatively.
+
+        A netlist answers every pair in one call, so batched mode
+        speculates a single check; pairwise mode speculates one check per
+        pair, in order, until the budget is spent.
+        """
+        budget = self.settings.SPECULATION_MAX_CALLS
+        if not candidate_pairs or budget < 1:
+            return []
+        if self.settings.CONNECTION_DETECTION_MODE == "batched":
+            return [candidate_pairs]
+        return [[pair] for pair in candidate_pairs[:budget]]
+
+    async def analyze(
+        self,
+        image: ImageContext
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]]]:
+        """Identify components and their connections with overlapping stages.
+
+        Args:
+            image: Cropped circuit diagram shared by all calls.
+
+        Returns:
+            Tuple[List[Dict[str, str]], List[Dict[str, Any]]]: The
+            components and connections, identical in format to running
+            identify_components and then identify_connections.
+
+        Raises:
+            ValueError: If a stage whose result is needed fails.
+        """
+        start = time.perf_counter()
+        candidate_pairs = self.connection_identifier.component_pairs(
+            self.component_identifier.candidate_components()
+        )
+        budget = SpeculationBudget(self.settings.SPECULATION_MAX_CALLS)
+        checks = [
+            _TimedCheck(pairs, self.connection_identifier, image, budget)
+            for pairs in self._speculative_units(candidate_pairs)
+        ]
+
+        try:
+            components = await self.component_identifier.identify_components(
+                image
+            )
+            components_finished = time.perf_counter()
+
+            present = {component["type"] for component in components}
+            needed_checks: List[_TimedCheck] = []
+            for check in checks:
+                if any(_pair_key(pair) <= present for pair in check.pairs):
+                    needed_checks.append(check)
+                elif check.task.done():
+                    self.stats.discarded_calls += 1
+                    _discard(check.task)
+                else:
+                    self.stats.cancelled_calls += 1
+                    _discard(check.task)
+
+            component_pairs = self.connection_identifier.component_pairs(
+                components
+            )
+            speculated = {
+                _pair_key(pair) for check in needed_checks
+                for pair in check.pairs
+            }
+            remaining = [
+                pair for pair in component_pairs
+                if _pair_key(pair) not in speculated
+            ]
+            if remaining:
+                check = _TimedCheck(
+                    remaining, self.connection_identifier, image
+                )
+                checks.append(check)
+                needed_checks.append(check)
+
+            needed_pairs = {_pair_key(pair) for pair in component_pairs}
+            answers: Dict[PairKey, bool] = {}
+            for check in needed_checks:
+                results = await self._check_results(check, needed_pairs, image)
+                for pair, is_connected in zip(check.pairs, results):
+                    answers[_pair_key(pair)] = is_connected
+                    if _pair_key(pair) in needed_pairs:
+                        self.connection_identifier.emit_connection(
+                            pair, is_connected
+                        )
+        finally:
+            # Also stops every check still running if a stage failed
+            for check in checks:
+                _discard(check.task)
+            self.stats.speculative_calls += budget.calls
+
+        connections = self.connection_identifier.build_connections(
+            components,
+            component_pairs,
+            [answers[_pair_key(pair)] for pair in component_pairs]
+        )
+        self._record_latency(start, components_finished, needed_checks)
+        return components, connections
+
+    async def _check_results(
+        self,
+        check: _TimedCheck,
+        needed_pairs: Set[PairKey],
+        image: ImageContext
+    ) -> List[bool]:
+        """Answers of a needed check, on the critical path if it ran dry.
+
+        A speculative check stopped by the exhausted budget (e.g. by the
+        verification calls of a netlist) is run again for its needed
+        pairs, without speculation.
+        """
+        try:
+            return await check.task
+        except SpeculationBudgetExhausted:
+            pairs = [
+                pair for pair in check.pairs if _pair_key(pair) in needed_pairs
+            ]
+            logger.info(
+                f"Speculation budget exhausted, checking {len(pairs)} pairs"
+            )
+            retry = _TimedCheck(pairs, self.connection_identifier, image)
+            check.pairs = pairs
+            check.task = retry.task
+            try:
+                return await check.task
+            finally:
+                check.finished = retry.finished
+
+    def _record_latency(
+        self,
+        start: float,
+        components_finished: float,
+        needed_checks: List[_TimedCheck]
+    ) -> None:
+        """Estimate the latency saved compared with running stages in turn.
+
+        The serial pipeline would have spent the component stage plus the
+        span of the needed connection checks; the saving is that sum minus
+        the elapsed time of the overlapped stages.
+        """
+        finished = time.perf_counter()
+        saved = 0.0
+        if needed_checks:
+            connection_span = (
+                max(check.finished or finished for check in needed_checks)
+                - min(check.started for check in needed_checks)
+            )
+            serial = (components_finished - start) + connection_span
+            saved = max(0.0, serial - (finished - start))
+        self.stats.requests += 1
+        self.stats.latency_saved_seconds += saved
+        self.stats.last_latency_saved_seconds = saved
+        logger.info(f"Speculative connection checks saved {saved:.2f}s")
@@ -0,0 +1,184 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.endpoints import circuit_batch
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def image_bytes() -> bytes:
+    """Fixture to provide the bytes of a benchmark circuit image."""
+    with open("tests/benchmarks/images/v0/circuit_9.png", "rb") as img_file:
+        return img_file.read()
+
+
+@pytest.fixture(autouse=True)
+def fake_extract_schema(monkeypatch) -> None:
+    """Fixture replacing the pipeline with a stub."""
+    async def extract_schema(image_bytes):
+        return {
+            "components": [{"id": "b1", "type": "battery"}],
+            "connections": [{"component": "b1", "connections": []}],
+        }
+
+    monkeypatch.setattr(circuit_batch, "extract_schema", extract_schema)
+
+
+def test_batch_reports_per_item_errors(image_bytes: bytes) -> None:
+    """A bad image fails on its own without failing the batch."""
+    image_data = base64.b64encode(image_bytes).decode("utf-8")
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/batch",
+        json={"images": [
+            {"image_data": image_data},
+            {"image_data": "not base64!"},
+            {"image_data": image_data, "content_type": "text/plain"},
+        ]}
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[0]["result"]["components"] == [{"id": "b1", "type": "battery"}]
+    assert results[0]["error"] is None
+    assert results[1]["error"]["status_code"] == 400
+    assert results[2]["error"] == {
+        "status_code": 400, "detail": "File must be an image"
+    }
+
+
+def test_batch_upload_streams_ndjson(image_bytes: bytes) -> None:
+    """Multipart bundles can be answered as a stream of NDJSON lines."""
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/batch/upload?stream=true",
+        files=[
+            ("files", ("a.png", image_bytes, "image/png")),
+            ("files", ("b.png", image_bytes, "image/png")),
+        ]
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(result["index"] for result in results) == [0, 1]
+    assert all(result["error"] is None for result in results)
+
+
+def test_batch_rejects_empty_batches() -> None:
+    """An empty batch is a client error."""
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/batch", json={"images": []}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_batch_upload_reads_files_as_items_run(
+    monkeypatch, image_bytes: bytes, stream: bool
+) -> None:
+    """Uploads are read one item at a time, not all before the batch runs."""
+    monkeypatch.setattr(circuit_batch.settings, "BATCH_MAX_CONCURRENCY", 1)
+    reads = []
+    read_upload = circuit_batch.ImageUploadReader.read_upload
+
+    async def counting_read_upload(self, upload):
+        reads.append(upload.filename)
+        return await read_upload(self, upload)
+
+    reads_before_analysis = []
+
+    async def extract_schema(image_bytes):
+        reads_before_analysis.append(len(reads))
+        return {"components": [], "connections": []}
+
+    monkeypatch.setattr(
+        circuit_batch.ImageUploadReader, "read_upload", counting_read_upload
+    )
+    monkeypatch.setattr(circuit_batch, "extract_schema", extract_schema)
+
+    response = client.post(
+        f"/api/v0/retrieve-circuit-schema/batch/upload?stream={stream}",
+        files=[
+            ("files", (f"{name}.png", image_bytes, "image/png"))
+            for name in "abc"
+        ]
+    )
+
+    assert response.status_code == 200, response.text
+    assert reads_before_analysis == [1, 2, 3]
+
+
+def test_batch_rejects_total_size_over_limit(
+    monkeypatch, image_bytes: bytes
+) -> None:
+    """Batches over BATCH_MAX_TOTAL_BYTES are rejected with 413."""
+    monkeypatch.setattr(
+        circuit_batch.settings, "BATCH_MAX_TOTAL_BYTES", len(image_bytes)
+    )
+    image_data = base64.b64encode(image_bytes).decode("utf-8")
+
+    upload = client.post(
+        "/api/v0/retrieve-circuit-schema/batch/upload",
+        files=[
+            ("files", ("a.png", image_bytes, "image/png")),
+            ("files", ("b.png", image_bytes, "image/png")),
+        ]
+    )
+    encoded = client.post(
+        "/api/v0/retrieve-circuit-schema/batch",
+        json={"images": [{"image_data": image_data}] * 2}
+    )
+
+    assert upload.status_code == 413
+    assert encoded.status_code == 413
+
+
+@pytest.mark.parametrize("endpoint, content_type", [
+    ("/api/v0/retrieve-circuit-schema/batch", "application/json"),
+    (
+        "/api/v0/retrieve-circuit-schema/batch/upload",
+        "multipart/form-data; boundary=batch"
+    ),
+])
+def test_batch_rejects_declared_size_before_reading(
+    monkeypatch, endpoint: str, content_type: str
+) -> None:
+    """An oversized Content-Length is rejected before the body is read."""
+    monkeypatch.setattr(circuit_batch.settings, "BATCH_MAX_TOTAL_BYTES", 1024)
+    consumed = []
+
+    def body():
+        for _ in range(64):
+            consumed.append(1)
+            yield b"\0" * 4096
+
+    response = client.post(
+        endpoint,
+        content=body(),
+        headers={
+            "Content-Type": content_type,
+            "Content-Length": str(64 * 4096),
+        }
+    )
+
+    assert response.status_code == 413
+    assert consumed == []
+
+
+def test_batch_rejects_malformed_json() -> None:
+    """A body that is not a batch is a validation error."""
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/batch",
+        content=b'{"images": [{"content_type": "image/png"}]}',
+        headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == [
+        "body", "images", 0, "image_data"
+    ]
@@ -0,0 +1,91 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.endpoints import circuit_schema
+from app.services.progress import emit_progress
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def image_data() -> str:
+    """Fixture to provide a base64 encoded benchmark circuit image."""
+    with open("tests/benchmarks/images/v0/circuit_9.png", "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode("utf-8")
+
+
+@pytest.fixture(autouse=True)
+def fake_extract_schema(monkeypatch) -> None:
+    """Fixture replacing the pipeline with a stub emitting progress."""
+    async def extract_schema(image_bytes):
+        emit_progress("sheet_cropped", {"width": 640, "height": 480})
+        emit_progress(
+            "component", {"type": "battery", "id": "b1", "is_present": True}
+        )
+        return {
+            "components": [{"id": "b1", "type": "battery"}],
+            "connections": [{"component": "b1", "connections": []}],
+        }
+
+    monkeypatch.setattr(circuit_schema, "extract_schema", extract_schema)
+
+
+def test_schema_stream_ndjson(image_data: str) -> None:
+    """Progress events precede the final result, one JSON object per line."""
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/stream",
+        json={"image_data": image_data}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == [
+        "sheet_cropped", "component", "result"
+    ]
+    assert events[-1]["data"]["components"] == [{"id": "b1", "type": "battery"}]
+
+
+def test_schema_stream_sse(image_data: str) -> None:
+    """Clients accepting text/event-stream receive Server-Sent Events."""
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/stream",
+        json={"image_data": image_data},
+        headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = response.text.strip().split("\n\n")
+    assert messages[0] == (
+        'event: sheet_cropped\ndata: {"width": 640, "height": 480}'
+    )
+    assert messages[-1].startswith("event: result\ndata: ")
+
+
+def test_schema_stream_reports_errors(monkeypatch, image_data: str) -> None:
+    """A failing analysis ends the stream with an error event."""
+    async def failing_extract_schema(image_bytes):
+        raise ValueError("Failed to detect circuit diagram in image")
+
+    monkeypatch.setattr(
+        circuit_schema, "extract_schema", failing_extract_schema
+    )
+
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/stream",
+        json={"image_data": image_data}
+    )
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events == [{
+        "event": "error",
+        "data": {
+            "status_code": 500,
+            "detail": "Failed to detect circuit diagram in image",
+        },
+    }]
@@ -0,0 +1,171 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.endpoints import circuit_components, circuit_schema
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def image_bytes() -> bytes:
+    """Fixture to provide the bytes of a benchmark circuit image."""
+    image_path = os.path.join(
+        "tests", "benchmarks", "images", "v0", "circuit_5.png"
+    )
+    assert os.path.exists(image_path), f"Image file not found: {image_path}"
+    with open(image_path, "rb") as img_file:
+        return img_file.read()
+
+
+@pytest.fixture
+def received_images(monkeypatch) -> list:
+    """Fixture replacing the analysis services with recording stubs."""
+    received = []
+
+    async def fake_extract_components(image_bytes):
+        received.append(image_bytes)
+        return [{"id": "b1", "type": "battery"}]
+
+    async def fake_extract_schema(image_bytes):
+        received.append(image_bytes)
+        return {
+            "components": [{"id": "b1", "type": "battery"}],
+            "connections": [{"component": "b1", "connections": []}],
+        }
+
+    monkeypatch.setattr(
+        circuit_components, "extract_components", fake_extract_components
+    )
+    monkeypatch.setattr(circuit_schema, "extract_schema", fake_extract_schema)
+    return received
+
+
+@pytest.mark.parametrize("endpoint", [
+    "/api/v0/retrieve-circuit-components/upload",
+    "/api/v0/retrieve-circuit-schema/upload",
+])
+def test_multipart_upload(
+    endpoint: str, image_bytes: bytes, received_images: list
+) -> None:
+    """Multipart uploads reach the pipeline as the original bytes."""
+    response = client.post(
+        endpoint,
+        files={"file": ("circuit.png", image_bytes, "image/png")}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["components"] == [{"id": "b1", "type": "battery"}]
+    assert received_images == [image_bytes]
+
+
+@pytest.mark.parametrize("endpoint", [
+    "/api/v0/retrieve-circuit-components/raw",
+    "/api/v0/retrieve-circuit-schema/raw",
+])
+def test_raw_body_upload(
+    endpoint: str, image_bytes: bytes, received_images: list
+) -> None:
+    """Raw octet-stream bodies are typed from their content."""
+    response = client.post(
+        endpoint,
+        content=image_bytes,
+        headers={"Content-Type": "application/octet-stream"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert received_images == [image_bytes]
+
+
+def test_raw_body_rejects_non_images(received_images: list) -> None:
+    """Bodies that are not images are rejected before any analysis."""
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/raw",
+        content=b"not an image",
+        headers={"Content-Type": "application/octet-stream"}
+    )
+
+    assert response.status_code == 400
+    assert received_images == []
+
+
+@pytest.mark.parametrize("endpoint", [
+    "/api/v0/retrieve-circuit-components/raw",
+    "/api/v0/retrieve-circuit-schema/raw",
+])
+def test_raw_body_rejects_malformed_content_length(
+    endpoint: str, image_bytes: bytes, received_images: list
+) -> None:
+    """A non-numeric Content-Length is a client error."""
+    response = client.post(
+        endpoint,
+        content=image_bytes,
+        headers={
+            "Content-Type": "application/octet-stream",
+            "Content-Length": "12abc",
+        }
+    )
+
+    assert response.status_code == 400
+    assert received_images == []
+
+
+def _multipart_chunks(
+    boundary: str, chunk: bytes, count: int, consumed: list
+):
+    """Yield a multipart body holding one ``count * len(chunk)`` file."""
+    yield (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; '
+        'filename="circuit.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode()
+    for _ in range(count):
+        consumed.append(len(chunk))
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+@pytest.mark.parametrize("endpoint", [
+    "/api/v0/retrieve-circuit-components/upload",
+    "/api/v0/retrieve-circuit-schema/upload",
+])
+@pytest.mark.parametrize("declare_length", [True, False])
+def test_multipart_upload_rejects_oversized_body_early(
+    endpoint: str, declare_length: bool, received_images: list
+) -> None:
+    """Oversized uploads are rejected before the body is received."""
+    max_size = circuit_schema.settings.MAX_IMAGE_SIZE
+    chunk = b"\0" * (1024 * 1024)
+    count = 4 * max_size // len(chunk)
+    boundary = "circuit-boundary"
+    consumed = []
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    if declare_length:
+        headers["Content-Length"] = str(count * len(chunk) + 1024)
+
+    response = client.post(
+        endpoint,
+        content=_multipart_chunks(boundary, chunk, count, consumed),
+        headers=headers
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File too large"
+    assert received_images == []
+    if declare_length:
+        assert consumed == []
+
+
+def test_multipart_upload_requires_a_file(received_images: list) -> None:
+    """A form without the file field is a client error."""
+    response = client.post(
+        "/api/v0/retrieve-circuit-schema/upload",
+        data={"name": "circuit.png"},
+        files={"other": ("circuit.png", b"data", "image/png")}
+    )
+
+    assert response.status_code == 400
+    assert received_images == []
@@ -0,0 +1,105 @@
+"""
+Test suite for the fake LLM provider used for load testing.
+"""
+
+import json
+import random
+from typing import Type
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.prompt_schemas.circuit_location_schema import CircuitLocation
+from app.prompt_schemas.circuit_schema import CircuitSchema
+from app.prompt_schemas.component_presence_schema import ResistorPresence
+from app.prompt_schemas.connection_schema import (
+    CircuitNetlist, ComponentConnection
+)
+from tests.benchmarks.fake_llm_server import (
+    SCHEMA_MARKER, FakeServerConfig, create_fake_llm_app, generate_instance
+)
+
+
+def _chat_request(schema: Type[BaseModel]) -> dict:
+    prompt = (
+        f"Is the resistor present?\n\n{SCHEMA_MARKER}"
+        f"\n{json.dumps(schema.model_json_schema(), indent=2)}"
+    )
+    return {
+        "model": "llama",
+        "messages": [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": "data:,"}},
+            ],
+        }],
+    }
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        CircuitLocation, CircuitSchema, ResistorPresence, ComponentConnection,
+        CircuitNetlist,
+    ],
+)
+def test_generated_instances_validate(schema: Type[BaseModel]) -> None:
+    """Random instances satisfy the prompt schemas."""
+    rng = random.Random(0)
+    for _ in range(20):
+        schema.model_validate(
+            generate_instance(schema.model_json_schema(), rng)
+        )
+
+
+@pytest.mark.parametrize("prefix", ["/openai/v1", "/v1"])
+def test_chat_completion_answers_the_prompt_schema(prefix: str) -> None:
+    """Both the Groq and OpenAI paths answer with schema-valid content."""
+    client = TestClient(create_fake_llm_app(
+        FakeServerConfig(latency_median=0.0, seed=1)
+    ))
+
+    response = client.post(
+        f"{prefix}/chat/completions", json=_chat_request(ResistorPresence)
+    )
+
+    assert response.status_code == 200
+    completion = response.json()
+    content = completion["choices"][0]["message"]["content"]
+    ResistorPresence.model_validate_json(content)
+    assert completion["usage"]["total_tokens"] > 0
+
+
+def test_faults_are_injected_on_demand() -> None:
+    """Fault rates changed at runtime apply to the next calls."""
+    client = TestClient(create_fake_llm_app(
+        FakeServerConfig(latency_median=0.0)
+    ))
+    request = _chat_request(ComponentConnection)
+
+    client.put("/_config", json={"latency_median": 0.0, "rate_429": 1.0})
+    rate_limited = client.post("/v1/chat/completions", json=request)
+    assert rate_limited.status_code == 429
+    assert rate_limited.headers["retry-after"] == "1.0"
+
+    client.put("/_config", json={"latency_median": 0.0, "rate_5xx": 1.0})
+    assert client.post(
+        "/v1/chat/completions", json=request
+    ).status_code in (500, 502, 503)
+
+    client.put(
+        "/_config", json={"latency_median": 0.0, "rate_malformed": 1.0}
+    )
+    malformed = client.post("/v1/chat/completions", json=request)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(malformed.json()["choices"][0]["message"]["content"])
+
+    assert client.get("/_stats").json() == {
+        "requests": 3,
+        "rate_limited": 1,
+        "server_errors": 1,
+        "malformed": 1,
+        "answered": 1,
+    }
@@ -0,0 +1,67 @@
+import asyncio
+import base64
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.endpoints import jobs
+from app.services.job_manager import JobManager
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    """Fixture running the app with a job manager using stub analyses."""
+    async def fake_extract_schema(image_bytes):
+        await asyncio.sleep(0.01)
+        return {
+            "components": [{"id": "b1", "type": "battery"}],
+            "connections": [{"component": "b1", "connections": []}],
+        }
+
+    async def fake_extract_components(image_bytes):
+        return [{"id": "b1", "type": "battery"}]
+
+    manager = JobManager(
+        {"schema": fake_extract_schema, "components": fake_extract_components},
+        workers=1, max_pending=10, result_ttl=60
+    )
+    monkeypatch.setattr(jobs, "get_job_manager", lambda: manager)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def image_data() -> str:
+    """Fixture to provide a base64 encoded benchmark circuit image."""
+    with open("tests/benchmarks/images/v0/circuit_9.png", "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode("utf-8")
+
+
+@pytest.mark.parametrize("kind", ["schema", "components"])
+def test_job_lifecycle(client: TestClient, image_data: str, kind: str) -> None:
+    """A submitted job is accepted at once and its result can be polled."""
+    response = client.post(
+        "/api/v0/jobs", json={"image_data": image_data, "kind": kind}
+    )
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+
+    for _ in range(100):
+        job = client.get(f"/api/v0/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            break
+        time.sleep(0.01)
+
+    assert job["status"] == "succeeded", job
+    assert job["result"]["components"] == [{"id": "b1", "type": "battery"}]
+
+
+def test_job_errors(client: TestClient, image_data: str) -> None:
+    """Unknown jobs and kinds are reported as client errors."""
+    assert client.get("/api/v0/jobs/unknown").status_code == 404
+    response = client.post(
+        "/api/v0/jobs", json={"image_data": image_data, "kind": "netlist"}
+    )
+    assert response.status_code == 400
@@ -1,5 +1,6 @@
 import os
 import json
+import time
 from collections import defaultdict
 from itertools import combinations
 from typing import Dict, Set, Tuple
@@ -17,6 +18,9 @@ async def run_connection_identifier_benchmark() -> None:
     """
     Run benchmark tests for circuit connection detection across multiple
     test cases.
+
+    Set LLM_CASSETTE_MODE=replay to run offline from recorded responses,
+    so the elapsed time measures the pipeline without the provider.
     """
     settings = Settings()
     llm_service = LLMService(settings)
@@ -36,6 +40,7 @@ async def run_connection_identifier_benchmark() -> None:
         "circuit_10",
     ]
 
+    start = time.perf_counter()
     for test_id in test_cases:
         json_path = os.path.join(
             "tests", "benchmarks", "expected_responses", "v0", f"{test_id}.json"
@@ -108,6 +113,13 @@ async def run_connection_identifier_benchmark() -> None:
             f"({connection_stats['correct']}/{connection_stats['total']} correct)"
         )
 
+    usage = llm_service.usage.as_dict()
+    logger.info(
+        f"Mode {settings.CONNECTION_DETECTION_MODE}: {usage['calls']} LLM "
+        f"calls, {usage['total_tokens']} tokens, "
+        f"elapsed {time.perf_counter() - start:.3f}s"
+    )
+
 
 if __name__ == "__main__":
     import asyncio
@@ -0,0 +1,104 @@
+"""Batched vs per-component presence classification benchmark module.
+
+This module compares the per-component presence checks with the single
+batched presence call by latency, LLM calls, tokens and accuracy on the
+v0 benchmark circuits.
+
+Usage:
+    python -m tests.benchmarks.component_batching_benchmark
+"""
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from app.core.config import Settings
+from app.services.component_identifier_service import (
+    ComponentIdentifierService,
+)
+from app.services.llm_client import LLMService
+from tests.benchmarks.image_profile_benchmark import (
+    COMPONENT_TYPES,
+    load_test_cases,
+)
+
+# Constants
+DETECTION_MODES = ["per_component", "batched"]
+
+
+async def benchmark_mode(
+    mode: str,
+    cases: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Benchmark one component detection mode over all test cases.
+
+    Args:
+        mode: Value of COMPONENT_DETECTION_MODE to benchmark.
+        cases: Test cases from load_test_cases.
+
+    Returns:
+        Dictionary with the aggregated statistics of the mode.
+    """
+    settings = Settings(COMPONENT_DETECTION_MODE=mode, LLM_CACHE_ENABLED=False)
+    llm_service = LLMService(settings)
+    identifier = ComponentIdentifierService(settings, llm_service)
+
+    correct: Dict[str, int] = defaultdict(int)
+    latencies = []
+    for case in cases:
+        start = time.perf_counter()
+        components = await identifier.identify_components(case["image_bytes"])
+        latencies.append(time.perf_counter() - start)
+
+        actual = {comp["type"] for comp in components}
+        logger.info(
+            f"{mode} {case['test_id']}: expected "
+            f"{sorted(case['expected'])}, actual {sorted(actual)}"
+        )
+        for component in COMPONENT_TYPES:
+            if (component in actual) == (component in case["expected"]):
+                correct[component] += 1
+
+    usage = llm_service.usage.as_dict()
+    return {
+        "mode": mode,
+        "avg_latency_s": sum(latencies) / len(latencies),
+        "max_latency_s": max(latencies),
+        "calls_per_image": usage["calls"] / len(cases),
+        "tokens_per_image": usage["total_tokens"] / len(cases),
+        "accuracy": {
+            component: correct[component] / len(cases) * 100
+            for component in sorted(COMPONENT_TYPES)
+        },
+    }
+
+
+async def run_component_batching_benchmark() -> None:
+    """Run the detection mode comparison and log a summary."""
+    cases = load_test_cases()
+    if not cases:
+        logger.error("No benchmark test cases found")
+        return
+
+    results = [await benchmark_mode(mode, cases) for mode in DETECTION_MODES]
+
+    logger.info("\nComponent Detection Mode Results:")
+    for result in results:
+        accuracy = ", ".join(
+            f"{component} {value:.0f}%"
+            for component, value in result["accuracy"].items()
+        )
+        logger.info(
+            f"{result['mode']:>13}: "
+            f"latency {result['avg_latency_s']:5.2f} s "
+            f"(max {result['max_latency_s']:5.2f} s), "
+            f"{result['calls_per_image']:.1f} calls and "
+            f"{result['tokens_per_image']:.0f} tokens per image, "
+            f"accuracy: {accuracy}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(run_component_batching_benchmark())
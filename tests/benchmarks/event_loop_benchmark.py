@@ -0,0 +1,173 @@
+"""Event-loop blocking benchmark of the CPU-bound request stages.
+
+Runs concurrent requests through base64 decoding and sheet detection of
+synthetic phone photos, once with the work inline on the event loop
+(``CV_THREAD_POOL_SIZE=0``, the former behavior, with base64 decoded in
+one go), once per thread pool
+size and once per process pool size (``CV_EXECUTOR=process``), and
+reports how long the event loop was blocked (lag of a 5 ms probe) and the
+wall time. The LLM location call is replaced by a fixed answer after a
+short sleep, so only the local work is measured.
+
+Usage:
+    python -m tests.benchmarks.event_loop_benchmark
+    python -m tests.benchmarks.event_loop_benchmark --megapixels 12 \\
+        --requests 16 --pool-sizes 0 2 4 8 --process-workers 4 8
+"""
+import argparse
+import asyncio
+import base64
+import time
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from app.services.cv_executor import CVExecutor
+from app.services.cv_process_pool import CVProcessExecutor
+from app.services.event_loop_monitor import EventLoopLagMonitor
+from app.services.image_decoder import ImageDecoder
+from app.services.sheet_detector_service import SheetDetectorService
+from tests.benchmarks.hot_path_benchmark import synthesize_photo
+
+PROBE_INTERVAL = 0.005
+LOCATION = {"relative_x": 0.5, "relative_y": 0.5, "confidence": 0.5}
+
+
+class FixedLocationLLM:
+    """Answers the location prompt like a provider would, without network."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def communicate(self, **kwargs: Any) -> Dict[str, float]:
+        await asyncio.sleep(self.latency)
+        return LOCATION
+
+
+async def run_scenario(
+    body: str,
+    pool_size: int,
+    requests: int,
+    llm_latency: float,
+    processes: int = 0
+) -> Dict[str, Any]:
+    """Decode and detect the sheet of ``requests`` images concurrently.
+
+    Args:
+        body: Base64 encoded photo.
+        pool_size: CV thread pool size, 0 for inline work.
+        requests: Number of concurrent requests.
+        llm_latency: Seconds taken by the stubbed location call.
+        processes: Worker processes running the crop pipeline, 0 to run
+            it on the thread pool.
+
+    Returns:
+        Dict[str, Any]: Wall time and event-loop lag figures.
+    """
+    executor = CVExecutor(pool_size)
+    pipeline_executor = executor
+    if processes:
+        pipeline_executor = CVProcessExecutor(processes, stager=executor)
+        # Spawn the workers before measuring
+        await asyncio.gather(*(
+            pipeline_executor.run(len, "warm-up") for _ in range(processes)
+        ))
+    detector = SheetDetectorService(
+        FixedLocationLLM(llm_latency),
+        executor=executor,
+        pipeline_executor=pipeline_executor
+    )
+    monitor = EventLoopLagMonitor(PROBE_INTERVAL)
+
+    async def handle() -> None:
+        if pool_size:
+            image_bytes = await ImageDecoder.decode_async(body)
+        else:
+            image_bytes = ImageDecoder.decode(body)
+        result = await detector.process_uploaded_image(image_bytes)
+        if result["cropped_image"] is None:
+            raise RuntimeError("No circuit found in the synthetic photo")
+
+    monitor.start()
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(handle() for _ in range(requests)))
+    wall = time.perf_counter() - start
+    await monitor.stop()
+    pipeline_executor.shutdown()
+    executor.shutdown()
+
+    metrics = monitor.metrics()
+    return {
+        "pool_size": pool_size,
+        "processes": processes,
+        "wall_s": round(wall, 3),
+        "blocked_s": round(metrics["blocked_seconds"], 3),
+        "max_lag_ms": round(metrics["max_lag"] * 1000, 1),
+        "mean_lag_ms": round(metrics["mean_lag"] * 1000, 2),
+    }
+
+
+async def run_event_loop_benchmark(
+    megapixels: float,
+    requests: int,
+    pool_sizes: List[int],
+    llm_latency: float,
+    process_workers: List[int]
+) -> List[Dict[str, Any]]:
+    """Compare every pool size and log a summary."""
+    body = base64.b64encode(synthesize_photo(megapixels)).decode("utf-8")
+    logger.info(
+        f"{requests} concurrent requests, {megapixels} MP photo "
+        f"({len(body) / 1e6:.1f} MB of base64)"
+    )
+
+    results = []
+    for pool_size in pool_sizes:
+        results.append(
+            await run_scenario(body, pool_size, requests, llm_latency)
+        )
+    for processes in process_workers:
+        results.append(await run_scenario(
+            body, max(pool_sizes), requests, llm_latency, processes
+        ))
+
+    logger.info("\nEvent Loop Results:")
+    for result in results:
+        if result["processes"]:
+            mode = f"{result['processes']} processes"
+        elif result["pool_size"]:
+            mode = f"{result['pool_size']} threads"
+        else:
+            mode = "inline"
+        logger.info(
+            f"{mode:>12}: wall {result['wall_s']:6.2f} s, "
+            f"loop blocked {result['blocked_s']:6.2f} s, "
+            f"max lag {result['max_lag_ms']:7.1f} ms, "
+            f"mean lag {result['mean_lag_ms']:6.2f} ms"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument(
+        "--pool-sizes", type=int, nargs="+", default=[0, 4],
+        help="CV thread pool sizes to compare, 0 for inline work"
+    )
+    parser.add_argument(
+        "--process-workers", type=int, nargs="*", default=[],
+        help="process pool sizes to compare (frames are staged into shared "
+             "memory on the largest thread pool)"
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.05,
+        help="seconds taken by the stubbed location call"
+    )
+    args = parser.parse_args()
+    asyncio.run(run_event_loop_benchmark(
+        args.megapixels, args.requests, args.pool_sizes, args.llm_latency,
+        args.process_workers
+    ))
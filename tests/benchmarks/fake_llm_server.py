@@ -0,0 +1,266 @@
+"""Fake OpenAI/Groq-compatible chat completions server.
+
+Stand-in for the LLM provider when load testing the API: requests go
+through the real HTTP stack (connection pool, timeouts, retries) without
+spending quota. Responses follow the JSON schema embedded in the prompt by
+``LLMService.communicate``, so they validate against the models of
+``app/prompt_schemas``. Latency follows a log-normal distribution, and
+429, 5xx, timeouts and malformed JSON can be injected at configurable
+rates, at startup or at runtime through ``PUT /_config``.
+
+Start it and point the API at it with ``LLM_API_BASE``:
+
+    python -m tests.benchmarks.fake_llm_server --port 9000 --rate-429 0.05
+    LLM_API_BASE=http://127.0.0.1:9000 GROQ_API_KEY=fake python main.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+# Marker preceding the schema appended to prompts by LLMService.communicate
+SCHEMA_MARKER = "Output MUST EXACTLY match this JSON schema:"
+
+
+class FakeServerConfig(BaseModel):
+    """Latency and fault injection settings of the fake server."""
+    latency_median: float = Field(0.5, ge=0.0)  # seconds
+    latency_sigma: float = Field(0.3, ge=0.0)  # log-normal shape, 0 = fixed
+    rate_429: float = Field(0.0, ge=0.0, le=1.0)
+    rate_5xx: float = Field(0.0, ge=0.0, le=1.0)
+    rate_timeout: float = Field(0.0, ge=0.0, le=1.0)
+    rate_malformed: float = Field(0.0, ge=0.0, le=1.0)
+    retry_after: Optional[float] = 1.0  # seconds sent with 429 responses
+    timeout_seconds: float = 600.0  # how long a "timed out" call hangs
+    seed: Optional[int] = None
+
+
+def generate_instance(
+    schema: Dict[str, Any],
+    rng: random.Random,
+    definitions: Optional[Dict[str, Any]] = None
+) -> Any:
+    """Generate a random value valid against a JSON schema.
+
+    Supports the subset of JSON Schema produced by pydantic for the prompt
+    schemas: objects, arrays, $ref/$defs, anyOf, enums and numeric bounds.
+
+    Args:
+        schema: JSON schema of the value.
+        rng: Random source.
+        definitions: $defs of the root schema.
+
+    Returns:
+        Any: A value satisfying the schema.
+    """
+    if definitions is None:
+        definitions = schema.get("$defs", {})
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        return generate_instance(definitions[name], rng, definitions)
+    if "anyOf" in schema:
+        options = [
+            option for option in schema["anyOf"]
+            if option.get("type") != "null"
+        ] or schema["anyOf"]
+        return generate_instance(options[0], rng, definitions)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+
+    schema_type = schema.get("type", "object")
+    if schema_type == "object":
+        return {
+            name: generate_instance(property_schema, rng, definitions)
+            for name, property_schema in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        low = schema.get("minItems", 1)
+        count = rng.randint(low, schema.get("maxItems", max(low, 3)))
+        return [
+            generate_instance(schema.get("items", {}), rng, definitions)
+            for _ in range(count)
+        ]
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    if schema_type in ("number", "integer"):
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", 1))
+        if schema_type == "integer":
+            return rng.randint(int(low), int(high))
+        return round(rng.uniform(low, high), 3)
+    if schema_type == "null":
+        return None
+    return "fake " + schema.get("title", "value").lower()
+
+
+def _prompt_schema(messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Extract the JSON schema embedded in the last user prompt."""
+    for message in reversed(messages):
+        content = message.get("content")
+        parts = content if isinstance(content, list) else [
+            {"type": "text", "text": content}
+        ]
+        for part in parts:
+            text = part.get("text") if isinstance(part, dict) else None
+            if text and SCHEMA_MARKER in text:
+                return json.loads(text.split(SCHEMA_MARKER, 1)[1])
+    return None
+
+
+def _draw_fault(
+    config: FakeServerConfig,
+    rng: random.Random
+) -> Optional[str]:
+    """Pick the fault injected into a call, if any."""
+    draw = rng.random()
+    for fault, rate in (
+        ("rate_limited", config.rate_429),
+        ("server_errors", config.rate_5xx),
+        ("timeouts", config.rate_timeout),
+        ("malformed", config.rate_malformed),
+    ):
+        if draw < rate:
+            return fault
+        draw -= rate
+    return None
+
+
+def create_fake_llm_app(config: Optional[FakeServerConfig] = None) -> FastAPI:
+    """Create the fake provider application.
+
+    Args:
+        config: Initial latency and fault settings.
+
+    Returns:
+        FastAPI: App serving the chat completions API under /openai/v1
+        (Groq SDK) and /v1 (OpenAI-compatible clients).
+    """
+    app = FastAPI(title="Fake LLM provider")
+    app.state.config = config or FakeServerConfig()
+    app.state.rng = random.Random(app.state.config.seed)
+    app.state.stats = Counter()
+
+    async def chat_completions(request: Request) -> JSONResponse:
+        settings: FakeServerConfig = app.state.config
+        rng: random.Random = app.state.rng
+        stats: Counter = app.state.stats
+        body = await request.json()
+        stats["requests"] += 1
+
+        await asyncio.sleep(
+            settings.latency_median
+            * rng.lognormvariate(0.0, settings.latency_sigma)
+        )
+
+        fault = _draw_fault(settings, rng)
+        if fault == "rate_limited":
+            stats[fault] += 1
+            headers = {}
+            if settings.retry_after is not None:
+                headers["retry-after"] = str(settings.retry_after)
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached",
+                           "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers=headers
+            )
+        if fault == "server_errors":
+            stats[fault] += 1
+            return JSONResponse(
+                {"error": {"message": "Service unavailable",
+                           "type": "server_error"}},
+                status_code=rng.choice([500, 502, 503])
+            )
+        if fault == "timeouts":
+            stats[fault] += 1
+            await asyncio.sleep(settings.timeout_seconds)
+
+        schema = _prompt_schema(body.get("messages", []))
+        if schema is None:
+            content = "A simple circuit with a battery and a resistor."
+        else:
+            content = json.dumps(generate_instance(schema, rng))
+        if fault == "malformed":
+            stats[fault] += 1
+            content = content[: max(1, len(content) // 2)]
+        stats["answered"] += 1
+
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        completion_tokens = len(content) // 4
+        return JSONResponse({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    for prefix in ("/openai/v1", "/v1"):
+        app.add_api_route(
+            f"{prefix}/chat/completions", chat_completions, methods=["POST"]
+        )
+
+    @app.get("/_config")
+    async def get_config() -> FakeServerConfig:
+        return app.state.config
+
+    @app.put("/_config")
+    async def update_config(config: FakeServerConfig) -> FakeServerConfig:
+        app.state.config = config
+        if config.seed is not None:
+            app.state.rng.seed(config.seed)
+        return config
+
+    @app.get("/_stats")
+    async def get_stats() -> Dict[str, int]:
+        return dict(app.state.stats)
+
+    return app
+
+
+def main() -> None:
+    """Run the fake provider with settings from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    for name, field in FakeServerConfig.model_fields.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=int if name == "seed" else float,
+            default=field.default
+        )
+    args = parser.parse_args()
+
+    import uvicorn
+    config = FakeServerConfig(**{
+        name: getattr(args, name) for name in FakeServerConfig.model_fields
+    })
+    uvicorn.run(
+        create_fake_llm_app(config),
+        host=args.host,
+        port=args.port,
+        log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
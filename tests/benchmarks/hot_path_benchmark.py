@@ -0,0 +1,306 @@
+"""Micro-benchmarks of the CPU work around the LLM calls.
+
+Times the non-LLM hot path of a request, one function at a time, on
+synthetic phone photos of realistic sizes: the circuit sample of
+``assets/sheet_samples`` drawn on a sheet lying on a noisy background,
+JPEG encoded like a camera would. Covered operations:
+
+- ``decode``: ``ImageDecoder.decode`` of the base64 request body;
+- ``validate``: ``ImageValidator.validate``;
+- ``read_image``: ``ImageContext.array`` (JPEG decode);
+- ``preprocess``: ``SheetDetectorService._preprocess_image`` of the ROI;
+- ``find_contour``: ``SheetDetectorService._find_circuit_contour``;
+- ``encode``: ``SheetDetectorService._encode_image`` of the crop;
+- ``prompt_schema``: ``json.dumps(schema.model_json_schema())`` as done
+  when building a prompt, for each prompt schema;
+- ``model_validate``: parsing and validating a response of each schema.
+
+Each operation reports ns/op, its peak allocation per op and its
+throughput per core (operations and megapixels per second). OpenCV runs
+single-threaded unless ``--cv-threads`` says otherwise, so the figures
+are per core.
+
+Usage:
+    python -m tests.benchmarks.hot_path_benchmark
+    python -m tests.benchmarks.hot_path_benchmark --sizes 12 --only encode \\
+        --report tests/benchmarks/reports/hot_path.json
+"""
+import argparse
+import base64
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import cv2
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.config import Settings
+from app.prompt_schemas.circuit_location_schema import CircuitLocation
+from app.prompt_schemas.circuit_schema import CircuitSchema
+from app.prompt_schemas.component_presence_schema import ResistorPresence
+from app.prompt_schemas.connection_schema import (
+    CircuitNetlist, ComponentConnection
+)
+from app.services.image_context import ImageContext
+from app.services.image_decoder import ImageDecoder
+from app.services.image_validation import ImageValidator
+from app.services.sheet_detector_service import SheetDetectorService
+from tests.benchmarks.fake_llm_server import generate_instance
+
+SAMPLE_IMAGE = Path("assets/sheet_samples/output.png")
+# Photo sizes in megapixels, 4:3 like most phone cameras
+DEFAULT_SIZES = (3, 6, 12)
+PROMPT_SCHEMAS: List[Type[BaseModel]] = [
+    CircuitLocation, ResistorPresence, ComponentConnection, CircuitNetlist,
+    CircuitSchema,
+]
+
+
+def synthesize_photo(megapixels: float, seed: int = 0) -> bytes:
+    """Build a JPEG phone photo of the circuit sample.
+
+    The sample is scaled onto a white sheet covering about half of the
+    frame, on a gradient background with sensor-like noise, so contour
+    detection and JPEG coding see realistic content.
+
+    Args:
+        megapixels: Size of the photo.
+        seed: Seed of the noise.
+
+    Returns:
+        bytes: The photo encoded as JPEG (quality 90).
+    """
+    width = int(round((megapixels * 1e6 * 4 / 3) ** 0.5))
+    height = int(round(width * 3 / 4))
+    rng = np.random.default_rng(seed)
+
+    gradient = np.linspace(90, 160, width, dtype=np.float32)
+    photo = np.repeat(gradient[None, :, None], height, axis=0)
+    photo = np.repeat(photo, 3, axis=2)
+
+    sample = cv2.imread(str(SAMPLE_IMAGE))
+    sheet_height = int(height * 0.7)
+    sheet_width = int(sheet_height * 0.75)
+    sheet = cv2.resize(
+        sample, (sheet_width, sheet_height), interpolation=cv2.INTER_LINEAR
+    )
+    top = (height - sheet_height) // 2
+    left = (width - sheet_width) // 2
+    photo[top:top + sheet_height, left:left + sheet_width] = sheet
+
+    photo += rng.normal(0.0, 6.0, photo.shape).astype(np.float32)
+    photo = np.clip(photo, 0, 255).astype(np.uint8)
+    success, buffer = cv2.imencode(
+        ".jpg", photo, [cv2.IMWRITE_JPEG_QUALITY, 90]
+    )
+    if not success:
+        raise RuntimeError("Failed to encode the synthetic photo")
+    return buffer.tobytes()
+
+
+def measure(
+    operation: Callable[[], Any],
+    min_time: float,
+    repeat: int
+) -> Dict[str, float]:
+    """Time an operation and measure its peak allocation.
+
+    The loop count is calibrated so that each of the ``repeat`` runs
+    lasts at least ``min_time``; ns/op is the median over the runs.
+    Allocations are measured in a separate run under tracemalloc, which
+    also sees the NumPy buffers returned by OpenCV.
+
+    Args:
+        operation: Callable performing one operation.
+        min_time: Minimum duration of each timed run in seconds.
+        repeat: Number of timed runs.
+
+    Returns:
+        Dict[str, float]: ns/op (median and min), ops/s per core and peak
+        allocation per op in KiB.
+    """
+    operation()  # warm up caches and lazy imports
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(
+            2, min(10, int(min_time / elapsed) + 1)
+        )
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(loops):
+                operation()
+            timings.append((time.perf_counter_ns() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ns_per_op = statistics.median(timings)
+    return {
+        "ns_per_op": round(ns_per_op),
+        "min_ns_per_op": round(min(timings)),
+        "ops_per_s_per_core": round(1e9 / ns_per_op, 2),
+        "alloc_peak_kib": round((peak - baseline) / 1024, 1),
+        "loops": loops,
+    }
+
+
+def image_operations(
+    megapixels: float,
+    settings: Settings
+) -> Dict[str, Callable[[], Any]]:
+    """Operations of the image hot path on a photo of the given size."""
+    photo = synthesize_photo(megapixels)
+    body = base64.b64encode(photo).decode("utf-8")
+    validator = ImageValidator(settings)
+    # The CV steps under test never call the LLM
+    detector = SheetDetectorService(llm_service=None)
+
+    image = ImageContext(photo).array
+    location = CircuitLocation(relative_x=0.5, relative_y=0.5, confidence=0.5)
+    roi, _ = detector._get_region_of_interest(image, location)
+    edged = detector._preprocess_image(roi)
+    contour = detector._find_circuit_contour(edged)
+    crop = roi
+    if contour is not None:
+        x_start, y_start, x_end, y_end = detector._crop_bounds(roi, contour)
+        crop = roi[y_start:y_end, x_start:x_end]
+
+    return {
+        "decode": lambda: ImageDecoder.decode(body),
+        "validate": lambda: validator.validate("image/jpeg", photo),
+        "read_image": lambda: ImageContext(photo).array,
+        "preprocess": lambda: detector._preprocess_image(roi),
+        "find_contour": lambda: detector._find_circuit_contour(edged),
+        "encode": lambda: detector._encode_image(crop),
+    }
+
+
+def schema_operations(seed: int = 0) -> Dict[str, Callable[[], Any]]:
+    """Prompt building and response validation of each prompt schema."""
+    rng = random.Random(seed)
+    operations = {}
+    for schema in PROMPT_SCHEMAS:
+        response = json.dumps(generate_instance(schema.model_json_schema(), rng))
+        operations[f"prompt_schema[{schema.__name__}]"] = (
+            lambda schema=schema: json.dumps(
+                schema.model_json_schema(), indent=2
+            )
+        )
+        operations[f"model_validate[{schema.__name__}]"] = (
+            lambda schema=schema, response=response: schema.model_validate(
+                json.loads(response)
+            ).model_dump()
+        )
+    return operations
+
+
+def run_hot_path_benchmark(
+    sizes: List[float],
+    only: Optional[List[str]],
+    min_time: float,
+    repeat: int
+) -> List[Dict[str, Any]]:
+    """Benchmark every selected operation and log a summary.
+
+    Args:
+        sizes: Photo sizes in megapixels.
+        only: Operation names (prefixes) to run, None for all.
+        min_time: Minimum duration of each timed run in seconds.
+        repeat: Number of timed runs per operation.
+
+    Returns:
+        List[Dict[str, Any]]: One result per operation and size.
+    """
+    settings = Settings()
+
+    def selected(name: str) -> bool:
+        return only is None or any(name.startswith(prefix) for prefix in only)
+
+    results = []
+    for megapixels in sizes:
+        for name, operation in image_operations(megapixels, settings).items():
+            if not selected(name):
+                continue
+            result = measure(operation, min_time, repeat)
+            result["megapixels_per_s_per_core"] = round(
+                result["ops_per_s_per_core"] * megapixels, 2
+            )
+            results.append({"operation": name, "megapixels": megapixels,
+                            **result})
+    for name, operation in schema_operations().items():
+        if selected(name):
+            results.append({"operation": name, "megapixels": None,
+                            **measure(operation, min_time, repeat)})
+
+    logger.info("\nHot Path Results:")
+    for result in results:
+        size = (
+            f"{result['megapixels']:>4} MP" if result["megapixels"] else " " * 7
+        )
+        logger.info(
+            f"{result['operation']:>36} {size}: "
+            f"{result['ns_per_op']:>14,} ns/op, "
+            f"{result['ops_per_s_per_core']:>12,.1f} ops/s/core, "
+            f"alloc peak {result['alloc_peak_kib']:>10,.1f} KiB"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=lambda value: [float(s) for s in value.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="comma-separated photo sizes in megapixels"
+    )
+    parser.add_argument(
+        "--only", nargs="+",
+        help="operations to run (name prefixes, e.g. encode model_validate)"
+    )
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--cv-threads", type=int, default=1,
+        help="OpenCV threads (1 measures a single core)"
+    )
+    parser.add_argument("--report", type=Path)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(args.cv_threads)
+    results = run_hot_path_benchmark(
+        args.sizes, args.only, args.min_time, args.repeat
+    )
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps({
+            "config": {"cv_threads": args.cv_threads,
+                       "min_time": args.min_time, "repeat": args.repeat},
+            "results": results,
+        }, indent=2))
+        logger.info(f"Report written to {args.report}")
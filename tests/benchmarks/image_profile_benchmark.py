@@ -0,0 +1,196 @@
+"""LLM image preprocessing profile benchmark module.
+
+This module compares image preprocessing profiles by the payload size
+sent to the LLM, the latency of component identification and its
+accuracy on the v0 benchmark circuits.
+
+Usage:
+    python -m tests.benchmarks.image_profile_benchmark
+    python -m tests.benchmarks.image_profile_benchmark --payload-only
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from app.core.config import Settings
+from app.services.component_identifier_service import (
+    ComponentIdentifierService,
+)
+from app.services.image_context import ImageContext
+from app.services.image_preprocessor import ImagePreprocessor, ImageProfile
+from app.services.llm_client import LLMService
+
+# Constants
+COMPONENT_TYPES = {"switch", "resistor", "led", "battery"}
+TEST_CASES = [f"circuit_{i}" for i in range(1, 11)]
+
+# Settings overrides of each profile under comparison
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "original": {},
+    "jpeg_1568": {
+        "LLM_IMAGE_MAX_EDGE": 1568,
+        "LLM_IMAGE_FORMAT": "jpeg",
+        "LLM_IMAGE_QUALITY": 90,
+    },
+    "jpeg_1024_gray": {
+        "LLM_IMAGE_MAX_EDGE": 1024,
+        "LLM_IMAGE_GRAYSCALE": True,
+        "LLM_IMAGE_FORMAT": "jpeg",
+        "LLM_IMAGE_QUALITY": 80,
+    },
+    "webp_1024_gray": {
+        "LLM_IMAGE_MAX_EDGE": 1024,
+        "LLM_IMAGE_GRAYSCALE": True,
+        "LLM_IMAGE_FORMAT": "webp",
+        "LLM_IMAGE_QUALITY": 80,
+    },
+    "png_768_binary": {
+        "LLM_IMAGE_MAX_EDGE": 768,
+        "LLM_IMAGE_BINARIZE": True,
+        "LLM_IMAGE_FORMAT": "png",
+    },
+}
+
+
+def load_test_cases(version: str = "v0") -> List[Dict[str, Any]]:
+    """Load the images and expected components of every test case.
+
+    Args:
+        version: Benchmark data version. Defaults to "v0".
+
+    Returns:
+        List of dictionaries with the test id, image bytes and expected
+        component types.
+    """
+    cases = []
+    for test_id in TEST_CASES:
+        json_path = os.path.join(
+            "tests", "benchmarks", "expected_responses",
+            version, f"{test_id}.json"
+        )
+        image_path = os.path.join(
+            "tests", "benchmarks", "images", version, f"{test_id}.png"
+        )
+        if not os.path.exists(json_path) or not os.path.exists(image_path):
+            logger.warning(f"Skipping {test_id} - missing files")
+            continue
+
+        with open(json_path, "r") as json_file:
+            expected_response = json.load(json_file)
+        with open(image_path, "rb") as img_file:
+            image_bytes = img_file.read()
+
+        cases.append({
+            "test_id": test_id,
+            "image_bytes": image_bytes,
+            "expected": {
+                comp["type"] for comp in expected_response["components"]
+            },
+        })
+    return cases
+
+
+async def benchmark_profile(
+    name: str,
+    overrides: Dict[str, Any],
+    cases: List[Dict[str, Any]],
+    payload_only: bool
+) -> Dict[str, Any]:
+    """Benchmark one preprocessing profile over all test cases.
+
+    Args:
+        name: Profile name.
+        overrides: Settings overrides defining the profile.
+        cases: Test cases from load_test_cases.
+        payload_only: Only measure payload sizes, without LLM calls.
+
+    Returns:
+        Dictionary with the aggregated statistics of the profile.
+    """
+    settings = Settings(LLM_CACHE_ENABLED=False, **overrides)
+    preprocessor = ImagePreprocessor(ImageProfile.from_settings(settings))
+
+    payload_bytes = 0
+    preprocess_seconds = 0.0
+    for case in cases:
+        start = time.perf_counter()
+        payload = preprocessor.prepare(ImageContext(case["image_bytes"]))
+        preprocess_seconds += time.perf_counter() - start
+        payload_bytes += len(payload.data_url)
+
+    result = {
+        "profile": name,
+        "avg_payload_kb": payload_bytes / len(cases) / 1024,
+        "avg_preprocess_ms": preprocess_seconds / len(cases) * 1000,
+    }
+    if payload_only:
+        return result
+
+    identifier = ComponentIdentifierService(settings, LLMService(settings))
+    correct: Dict[str, int] = defaultdict(int)
+    latencies = []
+    for case in cases:
+        start = time.perf_counter()
+        components = await identifier.identify_components(case["image_bytes"])
+        latencies.append(time.perf_counter() - start)
+
+        actual = {comp["type"] for comp in components}
+        for component in COMPONENT_TYPES:
+            if (component in actual) == (component in case["expected"]):
+                correct[component] += 1
+
+    result["avg_latency_s"] = sum(latencies) / len(latencies)
+    result["accuracy"] = (
+        sum(correct.values()) / (len(cases) * len(COMPONENT_TYPES)) * 100
+    )
+    return result
+
+
+async def run_image_profile_benchmark(payload_only: bool = False) -> None:
+    """Run the preprocessing profile comparison and log a summary.
+
+    Args:
+        payload_only: Only measure payload sizes, without LLM calls.
+    """
+    cases = load_test_cases()
+    if not cases:
+        logger.error("No benchmark test cases found")
+        return
+
+    results = []
+    for name, overrides in PROFILES.items():
+        logger.info(f"Benchmarking profile: {name}")
+        results.append(
+            await benchmark_profile(name, overrides, cases, payload_only)
+        )
+
+    logger.info("\nImage Profile Results:")
+    for result in results:
+        line = (
+            f"{result['profile']:>16}: "
+            f"payload {result['avg_payload_kb']:8.1f} KB, "
+            f"preprocess {result['avg_preprocess_ms']:6.1f} ms"
+        )
+        if not payload_only:
+            line += (
+                f", latency {result['avg_latency_s']:5.2f} s, "
+                f"accuracy {result['accuracy']:5.1f}%"
+            )
+        logger.info(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--payload-only",
+        action="store_true",
+        help="Only measure payload sizes, without calling the LLM"
+    )
+    args = parser.parse_args()
+    asyncio.run(run_image_profile_benchmark(args.payload_only))
@@ -0,0 +1,430 @@
+"""End-to-end load and latency benchmark with baseline regression gating.
+
+Drives the real ASGI application in-process (middleware, lifespan, job
+workers, LLM scheduler and connection pool included) at a configurable
+concurrency, either closed loop (a fixed number of clients sending
+requests back to back) or open loop (Poisson arrivals at a fixed rate).
+The LLM backend is pluggable:
+
+- ``fake``: the fake provider of ``fake_llm_server`` started in a
+  subprocess (or the one at ``--llm-api-base``), reached over HTTP;
+- ``replay``: responses replayed from the LLM cassette;
+- ``live``: the configured provider.
+
+The JSON report holds latency percentiles, requests/s, error rate, the
+per-stage latency breakdown of the ``analysis_stages`` metrics and peak
+RSS. With ``--baseline``, the report is compared to a stored one and the
+script exits with status 1 on any regression beyond ``--tolerance``.
+
+    python -m tests.benchmarks.load_benchmark --requests 200 \\
+        --concurrency 16 --baseline tests/benchmarks/baselines/load.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+IMAGES_DIR = Path("tests/benchmarks/images/v1")
+DEFAULT_REPORT = Path("tests/benchmarks/reports/load_report.json")
+ENDPOINTS = {
+    "schema": "/api/v0/retrieve-circuit-schema",
+    "components": "/api/v0/retrieve-circuit-components",
+}
+# Report entries compared to the baseline, and whether higher is worse
+GATED_METRICS = {
+    ("latency_ms", "p50"): True,
+    ("latency_ms", "p95"): True,
+    ("latency_ms", "p99"): True,
+    ("throughput_rps",): False,
+    ("peak_rss_mb",): True,
+}
+# Absolute increase of the error rate tolerated over the baseline
+ERROR_RATE_TOLERANCE = 0.01
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of values (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(-(-q * len(ordered) // 100))))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Percentiles, mean and max of latencies in milliseconds."""
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        "p50": round(percentile(milliseconds, 50), 2),
+        "p95": round(percentile(milliseconds, 95), 2),
+        "p99": round(percentile(milliseconds, 99), 2),
+        "mean": round(sum(milliseconds) / len(milliseconds), 2)
+        if milliseconds else 0.0,
+        "max": round(max(milliseconds, default=0.0), 2),
+    }
+
+
+def stage_breakdown(
+    before: Dict[str, Any],
+    after: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """Per-stage latency of the run from two ``analysis_stages`` snapshots.
+
+    Percentiles are the upper bound of the histogram bucket holding them.
+    """
+    breakdown = {}
+    for stage, histogram in after.items():
+        previous = before.get(stage, {"count": 0, "sum": 0.0, "le": {}})
+        count = histogram["count"] - previous["count"]
+        if count <= 0:
+            continue
+        buckets = [
+            (bound, cumulative - previous["le"].get(bound, 0))
+            for bound, cumulative in histogram["le"].items()
+        ]
+
+        def bucket_bound(q: float) -> Optional[float]:
+            for bound, cumulative in buckets:
+                if cumulative >= q / 100 * count:
+                    return None if bound == "+Inf" else float(bound) * 1000
+            return None
+
+        breakdown[stage] = {
+            "count": count,
+            "mean_ms": round(
+                (histogram["sum"] - previous["sum"]) / count * 1000, 2
+            ),
+            "p50_le_ms": bucket_bound(50),
+            "p95_le_ms": bucket_bound(95),
+        }
+    return breakdown
+
+
+def compare_with_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float
+) -> List[str]:
+    """List the regressions of a report relative to a baseline.
+
+    Args:
+        report: Report of this run.
+        baseline: Stored report of a reference run.
+        tolerance: Relative degradation allowed, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: Description of each regression, empty if none.
+    """
+    if report["config"] != baseline["config"]:
+        return [
+            f"configuration differs from the baseline: {report['config']} "
+            f"vs {baseline['config']}"
+        ]
+
+    regressions = []
+    for path, higher_is_worse in GATED_METRICS.items():
+        current, reference = report, baseline
+        for key in path:
+            current, reference = current[key], reference[key]
+        if higher_is_worse:
+            limit = reference * (1 + tolerance)
+            regressed = current > limit
+        else:
+            limit = reference * (1 - tolerance)
+            regressed = current < limit
+        if regressed:
+            regressions.append(
+                f"{'.'.join(path)} is {current} (baseline {reference}, "
+                f"limit {limit:.2f})"
+            )
+    error_limit = baseline["error_rate"] + ERROR_RATE_TOLERANCE
+    if report["error_rate"] > error_limit:
+        regressions.append(
+            f"error_rate is {report['error_rate']} "
+            f"(baseline {baseline['error_rate']})"
+        )
+    return regressions
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def load_payloads() -> List[Dict[str, str]]:
+    """Base64 request bodies of the benchmark images."""
+    payloads = [
+        {
+            "image_data": base64.b64encode(path.read_bytes()).decode("utf-8"),
+            "content_type": "image/png",
+        }
+        for path in sorted(IMAGES_DIR.glob("*.png"))
+    ]
+    if not payloads:
+        raise SystemExit(f"No benchmark images found in {IMAGES_DIR}")
+    return payloads
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    path: str,
+    payloads: List[Dict[str, str]],
+    requests: int,
+    concurrency: int,
+    rate: Optional[float],
+    rng: random.Random
+) -> List[Tuple[float, int]]:
+    """Send the requests and return their latency and status code.
+
+    Args:
+        client: Client bound to the application.
+        path: Endpoint receiving the requests.
+        payloads: Request bodies, used in turn.
+        requests: Number of requests to send.
+        concurrency: Closed loop: number of clients. Open loop: maximum
+            number of requests in flight.
+        rate: Poisson arrival rate in requests/s, None for a closed loop.
+        rng: Random source of the arrival times.
+
+    Returns:
+        List[Tuple[float, int]]: Latency in seconds (from arrival, so it
+        includes queueing in open loop) and status code of each request.
+    """
+    samples: List[Tuple[float, int]] = []
+
+    async def send(index: int, arrival: float) -> None:
+        try:
+            response = await client.post(
+                path, json=payloads[index % len(payloads)]
+            )
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        samples.append((time.perf_counter() - arrival, status))
+
+    if rate is None:
+        counter = iter(range(requests))
+
+        async def worker() -> None:
+            for index in counter:
+                await send(index, time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return samples
+
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def arrive(index: int) -> None:
+        arrival = time.perf_counter()
+        async with in_flight:
+            await send(index, arrival)
+
+    tasks = []
+    for index in range(requests):
+        tasks.append(asyncio.create_task(arrive(index)))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+    return samples
+
+
+def start_fake_provider(args: argparse.Namespace) -> subprocess.Popen:
+    """Start the fake provider in a subprocess and wait until it answers."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen([
+        sys.executable, "-m", "tests.benchmarks.fake_llm_server",
+        "--port", str(port),
+        "--latency-median", str(args.fake_latency_median),
+        "--latency-sigma", str(args.fake_latency_sigma),
+        "--seed", str(args.seed),
+    ])
+    args.llm_api_base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{args.llm_api_base}/_config", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("The fake LLM provider did not start")
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Set the application settings of the run before the app is imported."""
+    if args.backend == "fake":
+        os.environ["LLM_API_BASE"] = args.llm_api_base
+        os.environ.setdefault("GROQ_API_KEY", "fake")
+    elif args.backend == "replay":
+        os.environ["LLM_CASSETTE_MODE"] = "replay"
+    if not args.telemetry:
+        # Without a collector, exporting spans stalls the event loop
+        os.environ["OTEL_SDK_DISABLED"] = "true"
+    if args.max_parallel_llm is not None:
+        os.environ["MAX_PARALLEL_REQUESTS"] = str(args.max_parallel_llm)
+    if not args.with_caches:
+        # Every request then runs the whole pipeline
+        for name in (
+            "RESULT_CACHE_ENABLED", "LLM_CACHE_ENABLED",
+            "NEAR_DUPLICATE_ENABLED", "SINGLE_FLIGHT_ENABLED",
+        ):
+            os.environ[name] = "false"
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the load against the application and build the report."""
+    from app.main import app
+
+    payloads = load_payloads()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://benchmark",
+            timeout=None
+        ) as client:
+            metrics_before = (await client.get("/api/v0/metrics")).json()
+            start = time.perf_counter()
+            samples = await run_load(
+                client,
+                ENDPOINTS[args.endpoint],
+                payloads,
+                args.requests,
+                args.concurrency,
+                args.rate,
+                random.Random(args.seed)
+            )
+            duration = time.perf_counter() - start
+            metrics_after = (await client.get("/api/v0/metrics")).json()
+
+    succeeded = [latency for latency, status in samples if status == 200]
+    status_codes: Dict[str, int] = {}
+    for _, status in samples:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+    return {
+        "config": {
+            "endpoint": args.endpoint,
+            "backend": args.backend,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "with_caches": args.with_caches,
+        },
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(succeeded) / duration, 3),
+        "error_rate": round(1 - len(succeeded) / len(samples), 4),
+        "status_codes": status_codes,
+        "latency_ms": latency_summary(succeeded),
+        "stages": stage_breakdown(
+            metrics_before.get("analysis_stages", {}),
+            metrics_after.get("analysis_stages", {})
+        ),
+        "peak_rss_mb": peak_rss_mb(),
+        "metrics": {
+            name: metrics_after[name]
+            for name in (
+                "llm_usage", "llm_scheduler", "llm_retries", "http_pool"
+            )
+            if name in metrics_after
+        },
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="schema")
+    parser.add_argument(
+        "--backend", choices=("fake", "replay", "live"), default="fake"
+    )
+    parser.add_argument("--llm-api-base", help="running fake provider URL")
+    parser.add_argument("--fake-latency-median", type=float, default=0.5)
+    parser.add_argument("--fake-latency-sigma", type=float, default=0.3)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--rate", type=float, help="open loop arrival rate in requests/s"
+    )
+    parser.add_argument(
+        "--max-parallel-llm", type=int, help="sets MAX_PARALLEL_REQUESTS"
+    )
+    parser.add_argument(
+        "--with-caches", action="store_true",
+        help="keep result/LLM caches and request coalescing enabled"
+    )
+    parser.add_argument(
+        "--telemetry", action="store_true",
+        help="export traces to Phoenix (needs a running collector)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--update-baseline", action="store_true",
+        help="store this run as the baseline instead of comparing"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark, write the report and gate on the baseline."""
+    args = parse_args()
+    provider = None
+    if args.backend == "fake" and not args.llm_api_base:
+        provider = start_fake_provider(args)
+    try:
+        configure_environment(args)
+        report = asyncio.run(run_benchmark(args))
+    finally:
+        if provider is not None:
+            provider.terminate()
+            provider.wait()
+
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, indent=2))
+    logger.info(
+        f"{report['throughput_rps']} req/s, latency {report['latency_ms']}, "
+        f"error rate {report['error_rate']}, peak RSS "
+        f"{report['peak_rss_mb']} MB; report written to {args.report}"
+    )
+    for stage, timing in report["stages"].items():
+        logger.info(f"Stage {stage}: {timing}")
+
+    if args.baseline is None:
+        return
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        logger.info(f"Baseline updated: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        raise SystemExit(f"Baseline not found: {args.baseline}")
+    regressions = compare_with_baseline(
+        report, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    for regression in regressions:
+        logger.error(f"REGRESSION: {regression}")
+    if regressions:
+        raise SystemExit(1)
+    logger.info("No regression against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ across multiple test cases.
 import asyncio
 import os
 import sys
+import time
 from pathlib import Path
 from typing import Dict, Any
 
@@ -23,7 +24,11 @@ TEST_CASES = [f"circuit_{i}" for i in range(1, 12)]
 
 
 async def run_sheet_detection_benchmark() -> None:
-    """Run benchmark tests for sheet detection across multiple test cases."""
+    """Run benchmark tests for sheet detection across multiple test cases.
+
+    Set LLM_CASSETTE_MODE=replay to run offline from recorded responses,
+    so the elapsed time measures the pipeline without the provider.
+    """
     # Initialize services
     settings = get_settings()
     llm_service = LLMService(settings)
@@ -36,6 +41,7 @@ async def run_sheet_detection_benchmark() -> None:
     output_dir = Path("tests/benchmarks/images/v1/cropped_images")
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    start = time.perf_counter()
     for test_id in TEST_CASES:
         # Construct image path
         image_path = Path(f"tests/benchmarks/images/v1/{test_id}.png")
@@ -83,6 +89,7 @@ async def run_sheet_detection_benchmark() -> None:
         f"Success Rate: {accuracy:.1f}% "
         f"({success_count}/{total_count} successful)"
     )
+    logger.info(f"Elapsed: {time.perf_counter() - start:.3f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+"""Multi-resolution sheet detection benchmark.
+
+Compares the CV work of sheet detection at full resolution
+(``SHEET_DETECTION_SCALE=1``) with the pyramid mode (2, 4), which
+searches the circuit on a reduced decode of the photo, on synthetic phone
+photos of several sizes and on the v1 benchmark images: CPU time per
+image, peak memory during detection, and how close the crops are to the
+full-resolution ones. The LLM location call is replaced by a few fixed
+locations and confidences. ``--decoded`` starts from photos already
+decoded, as when the LLM image preprocessing had to resize them.
+
+Usage:
+    python -m tests.benchmarks.sheet_pyramid_benchmark
+    python -m tests.benchmarks.sheet_pyramid_benchmark --sizes 12 --scales 1 4
+"""
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from app.prompt_schemas.circuit_location_schema import CircuitLocation
+from app.services.cv_executor import CVExecutor
+from app.services.image_context import ImageContext
+from app.services.sheet_detector_service import (
+    DETECTION_SCALES, SheetDetectorService
+)
+from tests.benchmarks.hot_path_benchmark import synthesize_photo
+
+IMAGES_DIR = Path("tests/benchmarks/images/v1")
+LOCATIONS = [
+    CircuitLocation(relative_x=x, relative_y=y, confidence=confidence)
+    for x, y, confidence in [
+        (0.5, 0.5, 0.5), (0.5, 0.5, 0.9), (0.4, 0.6, 0.2), (0.6, 0.45, 0.7)
+    ]
+]
+
+
+def load(image_bytes: bytes, decoded: bool) -> ImageContext:
+    """A fresh context of the photo, decoded beforehand if asked."""
+    image = ImageContext(image_bytes)
+    if decoded:
+        image.array
+    return image
+
+
+def iou(
+    first: Tuple[int, int, int, int],
+    second: Tuple[int, int, int, int]
+) -> float:
+    """Intersection over union of two (x0, y0, x1, y1) rectangles."""
+    width = min(first[2], second[2]) - max(first[0], second[0])
+    height = min(first[3], second[3]) - max(first[1], second[1])
+    intersection = max(0, width) * max(0, height)
+
+    def area(box: Tuple[int, int, int, int]) -> int:
+        return (box[2] - box[0]) * (box[3] - box[1])
+
+    return intersection / (area(first) + area(second) - intersection)
+
+
+def measure(
+    detector: SheetDetectorService,
+    image_bytes: bytes,
+    repeat: int,
+    decoded: bool
+) -> Dict[str, Any]:
+    """CPU time, memory and crops of the detection of one image.
+
+    Args:
+        detector: Detector configured with the scale under test.
+        image_bytes: Encoded photo.
+        repeat: Number of timed runs per location (each on a fresh
+            ImageContext).
+        decoded: Whether the photo is decoded before the detection.
+
+    Returns:
+        Dict[str, Any]: Median CPU milliseconds, peak MiB (largest over
+        the locations), and the crop of each location.
+    """
+    cpu_times = []
+    peak = 0
+    crops = []
+    for location in LOCATIONS:
+        for _ in range(repeat):
+            image = load(image_bytes, decoded)
+            start = time.process_time()
+            detector._crop_circuit(image, location)
+            cpu_times.append(time.process_time() - start)
+
+        image = load(image_bytes, decoded)
+        tracemalloc.start()
+        try:
+            crops.append(detector._crop_circuit(image, location))
+            _, traced_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak = max(peak, traced_peak)
+    return {
+        "cpu_ms": round(float(np.median(cpu_times)) * 1000, 1),
+        "peak_mib": round(peak / 2 ** 20, 1),
+        "crops": crops,
+    }
+
+
+def run_sheet_pyramid_benchmark(
+    sizes: List[float],
+    scales: List[int],
+    repeat: int,
+    decoded: bool = False
+) -> List[Dict[str, Any]]:
+    """Benchmark every scale on every image and log a summary.
+
+    Args:
+        sizes: Sizes in megapixels of the synthetic photos.
+        scales: Detection scales to compare (1 is the reference).
+        repeat: Number of timed runs per image and scale.
+        decoded: Whether the photos are decoded before the detection.
+
+    Returns:
+        List[Dict[str, Any]]: One result per image and scale.
+    """
+    images = [
+        (f"synthetic {size:g} MP", synthesize_photo(size)) for size in sizes
+    ]
+    images += [
+        (path.name, path.read_bytes())
+        for path in sorted(IMAGES_DIR.glob("*.png"))
+    ]
+    detectors = {
+        scale: SheetDetectorService(
+            llm_service=None, detection_scale=scale, executor=CVExecutor(0)
+        )
+        for scale in sorted(set(scales) | {1})
+    }
+
+    results = []
+    for name, image_bytes in images:
+        reference = measure(detectors[1], image_bytes, repeat, decoded)
+        for scale in scales:
+            result = (
+                reference if scale == 1
+                else measure(detectors[scale], image_bytes, repeat, decoded)
+            )
+            matches = 0
+            overlaps = []
+            for crop, expected in zip(result["crops"], reference["crops"]):
+                if crop is None or expected is None:
+                    matches += crop is expected
+                    overlaps.append(float(crop is expected))
+                else:
+                    matches += crop.bounds == expected.bounds
+                    overlaps.append(iou(crop.bounds, expected.bounds))
+            results.append({
+                "image": name,
+                "scale": scale,
+                "cpu_ms": result["cpu_ms"],
+                "peak_mib": result["peak_mib"],
+                "same_crops": matches,
+                "crops": len(LOCATIONS),
+                "min_crop_iou": round(min(overlaps), 4),
+            })
+
+    logger.info("\nSheet Detection Pyramid Results:")
+    for result in results:
+        logger.info(
+            f"{result['image']:>18} 1/{result['scale']}: "
+            f"cpu {result['cpu_ms']:7.1f} ms, "
+            f"peak {result['peak_mib']:6.1f} MiB, "
+            f"same crops {result['same_crops']}/{result['crops']} "
+            f"(min IoU {result['min_crop_iou']:.3f})"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=float, nargs="+", default=[3, 6, 12],
+        help="sizes in megapixels of the synthetic photos"
+    )
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=list(DETECTION_SCALES),
+        choices=DETECTION_SCALES
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--decoded", action="store_true",
+        help="decode the photos before the detection"
+    )
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    run_sheet_pyramid_benchmark(
+        args.sizes, args.scales, args.repeat, args.decoded
+    )
@@ -0,0 +1,55 @@
+"""
+Test suite for the BatchRunner.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.batch_runner import BatchRunner
+
+
+def make_item(index: int, delay: float, tracker: dict):
+    """Build a batch item failing for index 2 and tracking concurrency."""
+    async def item() -> int:
+        tracker["running"] += 1
+        tracker["peak"] = max(tracker["peak"], tracker["running"])
+        try:
+            await asyncio.sleep(delay)
+            if index == 2:
+                raise ValueError("Failed to detect circuit diagram in image")
+            return index * 10
+        finally:
+            tracker["running"] -= 1
+
+    return item
+
+
+@pytest.mark.asyncio
+async def test_run_ordered_keeps_order_and_item_errors() -> None:
+    """Outcomes come back in input order with per-item errors."""
+    tracker = {"running": 0, "peak": 0}
+    items = [
+        make_item(index, 0.01 * (5 - index), tracker) for index in range(5)
+    ]
+
+    outcomes = await BatchRunner(max_concurrency=2).run_ordered(items)
+
+    assert [outcome.index for outcome in outcomes] == [0, 1, 2, 3, 4]
+    assert [outcome.result for outcome in outcomes] == [0, 10, None, 30, 40]
+    assert isinstance(outcomes[2].error, ValueError)
+    assert tracker["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_yields_in_completion_order() -> None:
+    """Streaming outcomes are yielded as soon as each item is done."""
+    tracker = {"running": 0, "peak": 0}
+    items = [make_item(0, 0.05, tracker), make_item(1, 0.0, tracker)]
+
+    indexes = [
+        outcome.index
+        async for outcome in BatchRunner(max_concurrency=2).run(items)
+    ]
+
+    assert indexes == [1, 0]
@@ -0,0 +1,50 @@
+"""
+Test suite for the circuit analysis pipeline.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.config import Settings
+from app.services import circuit_service
+from app.services.result_cache import MemoryLRUCache
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_not_shared_with_callers(monkeypatch) -> None:
+    """Mutating a response does not change what later requests receive."""
+    identify = AsyncMock(return_value={"battery", "resistor"})
+    monkeypatch.setattr(circuit_service, "identify_components", identify)
+    monkeypatch.setattr(
+        circuit_service, "result_cache", MemoryLRUCache(16, 0)
+    )
+
+    first = await circuit_service.extract_components(b"image")
+    first.append("led")
+    second = await circuit_service.extract_components(b"image")
+    second.clear()
+    third = await circuit_service.extract_components(b"image")
+
+    assert identify.await_count == 1
+    assert sorted(third) == ["battery", "resistor"]
+
+
+@pytest.mark.parametrize("change", [
+    {"MODEL_NAME": "groq/llama-3.2-90b-vision-preview"},
+    {"LLM_BACKENDS": ["groq/llama-3.2-90b-vision-preview"]},
+    {"LLM_HEDGE_MODEL": "gpt-4o-mini"},
+    {"LLM_IMAGE_MAX_EDGE": 1024},
+    {"LLM_IMAGE_FORMAT": "jpeg"},
+    {"CONNECTION_DETECTION_MODE": "batched"},
+    {"SHEET_DETECTION_SCALE": 2},
+])
+def test_config_fingerprint_covers_models_and_image_profile(
+    change: dict
+) -> None:
+    """Results cached under another model or image profile are not reused."""
+    baseline = circuit_service._fingerprint_config(Settings())
+
+    changed = circuit_service._fingerprint_config(Settings(**change))
+
+    assert changed != baseline
@@ -6,11 +6,12 @@ import os
 from venv import logger
 
 import pytest
+from unittest.mock import AsyncMock, Mock
 from loguru import logger
 
 from app.services.component_identifier_service import ComponentIdentifierService
 from app.services.llm_client import LLMService
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 
 @pytest.fixture
@@ -76,3 +77,115 @@ async def test_identify_components(
         f"but got {expected_components}"
     )
     
+
+
+@pytest.fixture
+def batched_identifier() -> ComponentIdentifierService:
+    """Fixture to provide a batched-mode service with a mocked LLM."""
+    settings = Settings(COMPONENT_DETECTION_MODE="batched")
+    return ComponentIdentifierService(settings, Mock(spec=LLMService))
+
+
+async def fake_batched_response(prompt, image_bytes, schema=None, **kwargs):
+    """Mock LLM answering the description and batched presence calls."""
+    if schema is None:
+        return "A loop with two parallel lines and a zigzag."
+    return {
+        name: {
+            "reasoning": "",
+            "approximate_location": "",
+            "is_present": name in ("battery", "resistor"),
+        }
+        for name in schema.model_fields
+    }
+
+
+@pytest.mark.asyncio
+async def test_identify_components_batched(
+    batched_identifier: ComponentIdentifierService, test_image_bytes: bytes
+) -> None:
+    """All presence questions are answered by a single call."""
+    batched_identifier.llm_service.communicate = AsyncMock(
+        side_effect=fake_batched_response
+    )
+
+    components = await batched_identifier.identify_components(
+        test_image_bytes
+    )
+
+    assert components == [
+        {"type": "battery", "id": "b1"},
+        {"type": "resistor", "id": "r1"},
+    ]
+    assert batched_identifier.llm_service.communicate.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_identify_components_batched_fallback(
+    batched_identifier: ComponentIdentifierService, test_image_bytes: bytes
+) -> None:
+    """A failed batched call falls back to per-component checks."""
+    async def fail_batched_call(prompt, image_bytes, schema=None, **kwargs):
+        if schema is None:
+            return "A loop with two parallel lines."
+        if schema.__name__ == "ComponentPresenceBatch":
+            raise ValueError("Response validation failed")
+        return {
+            "reasoning": "",
+            "approximate_location": "",
+            "is_present": schema.__name__ == "BatteryPresence",
+        }
+
+    batched_identifier.llm_service.communicate = AsyncMock(
+        side_effect=fail_batched_call
+    )
+
+    components = await batched_identifier.identify_components(
+        test_image_bytes
+    )
+
+    assert components == [{"type": "battery", "id": "b1"}]
+    assert batched_identifier.llm_service.communicate.await_count == 6
+
+
+@pytest.mark.asyncio
+async def test_fallback_checks_every_catalog_component(
+    monkeypatch, test_image_bytes: bytes
+) -> None:
+    """Both modes cover every TOML component, with unique IDs."""
+    catalog = dict(get_settings().COMPONENT_DESCRIPTIONS)
+    catalog["buzzer"] = {"identification": "A circle with a plus sign."}
+    monkeypatch.setattr(
+        Settings, "COMPONENT_DESCRIPTIONS", property(lambda self: catalog)
+    )
+    identifier = ComponentIdentifierService(
+        Settings(COMPONENT_DETECTION_MODE="batched"), Mock(spec=LLMService)
+    )
+    asked = []
+
+    async def fail_batched_call(prompt, image_bytes, schema=None, **kwargs):
+        if schema is None:
+            return "A loop with a circle."
+        if schema.__name__ == "ComponentPresenceBatch":
+            raise ValueError("Response validation failed")
+        asked.append(schema.__name__)
+        return {
+            "reasoning": "",
+            "approximate_location": "",
+            "is_present": (
+                "plus sign" in prompt or schema.__name__ == "BatteryPresence"
+            ),
+        }
+
+    identifier.llm_service.communicate = AsyncMock(side_effect=fail_batched_call)
+
+    components = await identifier.identify_components(test_image_bytes)
+
+    assert components == [
+        {"type": "battery", "id": "b1"},
+        {"type": "buzzer", "id": "b2"},
+    ]
+    assert "ComponentPresence" in asked
+    assert len(asked) == len(catalog)
+    candidate_ids = [c["id"] for c in identifier.candidate_components()]
+    assert len(set(candidate_ids)) == len(candidate_ids)
@@ -1,13 +1,15 @@
 import os
+from typing import Any, Dict
 
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 from loguru import logger
 
 from app.services.component_identifier_service import ComponentIdentifierService
 from app.services.connection_identifier_service import ConnectionIdentifierService
 from app.services.llm_client import LLMService
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.prompt_schemas.connection_schema import CircuitNetlist
 
 
 @pytest.fixture
@@ -68,3 +70,124 @@ async def test_identify_connections(
     connection = connections[0]
     assert "component" in connection
     assert "connections" in connection
+
+
+@pytest.fixture
+def batched_connection_identifier() -> ConnectionIdentifierService:
+    """Fixture for a batched-mode service with a mocked LLM."""
+    settings = Settings(
+        CONNECTION_DETECTION_MODE="batched", CONNECTION_VERIFY_THRESHOLD=0.7
+    )
+    return ConnectionIdentifierService(settings, Mock(spec=LLMService))
+
+
+BATCHED_COMPONENTS = [
+    {"id": "b1", "type": "battery"},
+    {"id": "r1", "type": "resistor"},
+    {"id": "s1", "type": "switch"},
+]
+
+
+def assessment(
+    comp1: str, comp2: str, is_connected: bool, confidence: float
+) -> Dict[str, Any]:
+    """Build one entry of a mocked netlist answer."""
+    return {
+        "component_1": comp1,
+        "component_2": comp2,
+        "is_connected": is_connected,
+        "confidence": confidence,
+    }
+
+
+@pytest.mark.asyncio
+async def test_identify_connections_batched(
+    batched_connection_identifier: ConnectionIdentifierService,
+    test_image_bytes: bytes
+) -> None:
+    """A confident netlist answer is symmetrized without pairwise calls."""
+    batched_connection_identifier.llm_service.communicate = AsyncMock(
+        return_value={"connections": [
+            assessment("b1", "r1", True, 0.9),
+            # Reversed duplicate and unknown components are tolerated
+            assessment("r1", "b1", True, 0.95),
+            assessment("r1", "x9", True, 1.0),
+            assessment("s1", "r1", False, 0.8),
+            assessment("b1", "s1", True, 0.8),
+        ]}
+    )
+
+    connections = await batched_connection_identifier.identify_connections(
+        BATCHED_COMPONENTS, test_image_bytes
+    )
+
+    assert connections == [
+        {"component": "b1", "connections": ["r1", "s1"]},
+        {"component": "r1", "connections": ["b1"]},
+        {"component": "s1", "connections": ["b1"]},
+    ]
+    assert batched_connection_identifier.llm_service.communicate.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_identify_connections_batched_verifies_uncertain_pairs(
+    batched_connection_identifier: ConnectionIdentifierService,
+    test_image_bytes: bytes
+) -> None:
+    """Low-confidence and missing pairs are re-checked pairwise."""
+    async def fake_communicate(prompt, image_bytes, schema=None, **kwargs):
+        if schema is CircuitNetlist:
+            return {"connections": [
+                assessment("b1", "r1", True, 0.9),
+                assessment("b1", "s1", False, 0.3),
+            ]}
+        return {"is_connected": True}
+
+    batched_connection_identifier.llm_service.communicate = AsyncMock(
+        side_effect=fake_communicate
+    )
+
+    connections = await batched_connection_identifier.identify_connections(
+        BATCHED_COMPONENTS, test_image_bytes
+    )
+
+    assert connections == [
+        {"component": "b1", "connections": ["r1", "s1"]},
+        {"component": "r1", "connections": ["b1", "s1"]},
+        {"component": "s1", "connections": ["b1", "r1"]},
+    ]
+    # One netlist call plus the b1-s1 and r1-s1 verifications
+    assert batched_connection_identifier.llm_service.communicate.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_identify_connections_batched_keeps_answers_of_failed_checks(
+    batched_connection_identifier: ConnectionIdentifierService,
+    test_image_bytes: bytes
+) -> None:
+    """A failed re-check keeps that pair's answer, not re-asking every pair."""
+    async def fake_communicate(prompt, image_bytes, schema=None, **kwargs):
+        if schema is CircuitNetlist:
+            return {"connections": [
+                assessment("b1", "r1", True, 0.9),
+                assessment("b1", "s1", True, 0.3),
+                assessment("r1", "s1", False, 0.8),
+            ]}
+        raise ValueError("Response validation failed")
+
+    batched_connection_identifier.llm_service.communicate = AsyncMock(
+        side_effect=fake_communicate
+    )
+
+    connections = await batched_connection_identifier.identify_connections(
+        BATCHED_COMPONENTS, test_image_bytes
+    )
+
+    assert connections == [
+        {"component": "b1", "connections": ["r1", "s1"]},
+        {"component": "r1", "connections": ["b1"]},
+        {"component": "s1", "connections": ["b1"]},
+    ]
+    # One netlist call plus the failed b1-s1 verification only
+    communicate = batched_connection_identifier.llm_service.communicate
+    assert communicate.await_count == 2
@@ -0,0 +1,59 @@
+"""
+Test suite for the thread pool running CPU-bound image work.
+"""
+
+import contextvars
+import threading
+
+import pytest
+
+from app.services.cv_executor import CVExecutor
+
+request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id")
+
+
+def _whereabouts() -> tuple:
+    return threading.current_thread().name, request_id.get()
+
+
+@pytest.mark.asyncio
+async def test_work_runs_on_the_pool_with_the_caller_context() -> None:
+    """Work leaves the event loop thread but keeps the context variables."""
+    executor = CVExecutor(max_workers=2)
+    request_id.set("abc")
+    try:
+        thread_name, seen_id = await executor.run(_whereabouts)
+    finally:
+        executor.shutdown()
+
+    assert thread_name.startswith("cv")
+    assert seen_id == "abc"
+    metrics = executor.metrics()
+    assert metrics["tasks"] == 1
+    assert metrics["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_workers_run_inline() -> None:
+    """A pool size of 0 runs the work on the calling thread."""
+    executor = CVExecutor(max_workers=0)
+    request_id.set("abc")
+
+    thread_name, _ = await executor.run(_whereabouts)
+
+    assert thread_name == threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_the_caller() -> None:
+    """Exceptions raised on the pool are raised by run."""
+    executor = CVExecutor(max_workers=1)
+
+    def fail() -> None:
+        raise ValueError("undecodable")
+
+    try:
+        with pytest.raises(ValueError, match="undecodable"):
+            await executor.run(fail)
+    finally:
+        executor.shutdown()
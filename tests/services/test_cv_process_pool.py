@@ -0,0 +1,153 @@
+"""
+Test suite for the CV process pool and its shared-memory frame transfer.
+"""
+
+import asyncio
+import time
+from multiprocessing.shared_memory import SharedMemory
+from operator import attrgetter
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from app.services import cv_process_pool
+from app.services.cv_executor import CVExecutor
+from app.services.cv_process_pool import (
+    CVProcessExecutor, SharedFrame, _release, _share_arrays
+)
+from app.services.image_context import ImageContext
+from app.services.sheet_detector_service import SheetDetectorService
+
+IMAGE_PATH = (
+    Path(__file__).parent.parent / "benchmarks" / "images" / "v1"
+    / "circuit_2.png"
+)
+
+
+def test_arrays_are_shipped_as_shared_frames() -> None:
+    """Array arguments become handles of shared blocks, freed on release."""
+    frame = np.arange(12, dtype=np.uint8).reshape(3, 4)
+
+    shipped, blocks = _share_arrays((frame, "label"))
+
+    handle, label = shipped
+    assert isinstance(handle, SharedFrame)
+    assert label == "label"
+    copy = np.ndarray(
+        handle.shape, np.dtype(handle.dtype), buffer=blocks[0].buf
+    )
+    assert np.array_equal(copy, frame)
+
+    del copy
+    _release(blocks)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=handle.name)
+
+
+@pytest.fixture
+def process_executor():
+    executor = CVProcessExecutor(max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_receives_the_frame(
+    process_executor: CVProcessExecutor
+) -> None:
+    """A worker process computes on the shared frame."""
+    frame = np.random.default_rng(0).integers(
+        0, 255, (64, 48, 3), dtype=np.uint8
+    )
+
+    total = await process_executor.run(np.sum, frame)
+
+    assert total == frame.sum()
+    assert process_executor.metrics()["shared_bytes"] == frame.nbytes
+
+
+@pytest.mark.asyncio
+async def test_process_pipeline_matches_thread_pipeline(
+    process_executor: CVProcessExecutor
+) -> None:
+    """Sheet detection gives the same crop on processes and threads."""
+    llm_service = Mock()
+    llm_service.communicate = AsyncMock(return_value={
+        "relative_x": 0.5, "relative_y": 0.5, "confidence": 0.8
+    })
+    image_bytes = IMAGE_PATH.read_bytes()
+    results = []
+    for pipeline_executor in (CVExecutor(0), process_executor):
+        detector = SheetDetectorService(
+            llm_service,
+            executor=CVExecutor(0),
+            pipeline_executor=pipeline_executor
+        )
+        results.append(await detector.process_uploaded_image(image_bytes))
+
+    threaded, processed = results
+    assert processed["cropped_image"] is not None
+    assert processed["cropped_image"] == threaded["cropped_image"]
+    assert processed["perceptual_hash"] == threaded["perceptual_hash"]
+    assert np.array_equal(
+        processed["cropped_context"].array, threaded["cropped_context"].array
+    )
+
+
+@pytest.mark.asyncio
+async def test_image_context_hands_its_frame_over(
+    process_executor: CVProcessExecutor
+) -> None:
+    """The worker gets the frame, the caller's context stops holding it."""
+    image = ImageContext(IMAGE_PATH.read_bytes())
+    frame = image.array
+
+    shape = await process_executor.run(attrgetter("array.shape"), image)
+
+    assert shape == frame.shape
+    assert process_executor.metrics()["shared_bytes"] == frame.nbytes
+    assert "array" not in image.__dict__
+    assert np.array_equal(image.array, frame)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_keeps_its_frame_until_the_worker_is_done(
+    monkeypatch, process_executor: CVProcessExecutor
+) -> None:
+    """A call queued on a worker still finds its frame after cancellation."""
+    names = []
+    share_array = cv_process_pool._share_array
+
+    def recording_share_array(array, blocks):
+        frame = share_array(array, blocks)
+        names.append(frame.name)
+        return frame
+
+    monkeypatch.setattr(
+        cv_process_pool, "_share_array", recording_share_array
+    )
+    # Spawn the worker first
+    await process_executor.run(time.sleep, 0)
+
+    busy = asyncio.ensure_future(process_executor.run(time.sleep, 0.5))
+    queued = asyncio.ensure_future(
+        process_executor.run(np.sum, np.ones((64, 64), np.uint8))
+    )
+    await asyncio.sleep(0.1)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+
+    SharedMemory(name=names[0]).close()
+    await busy
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            SharedMemory(name=names[0]).close()
+        except FileNotFoundError:
+            break
+        await asyncio.sleep(0.05)
+    else:
+        pytest.fail("The shared block was not released")
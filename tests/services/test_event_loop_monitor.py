@@ -0,0 +1,37 @@
+"""
+Test suite for the event-loop lag probe.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.event_loop_monitor import EventLoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_shows_up_as_lag() -> None:
+    """Synchronous work on the loop delays the probe by its duration."""
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    time.sleep(0.2)  # blocks the loop
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    metrics = monitor.metrics()
+    assert metrics["probes"] >= 3
+    assert metrics["max_lag"] >= 0.15
+    assert metrics["blocked_seconds"] >= metrics["max_lag"]
+
+
+def test_lag_is_never_negative() -> None:
+    """Early wake-ups count as no lag."""
+    monitor = EventLoopLagMonitor()
+
+    monitor.record(-0.001)
+
+    assert monitor.metrics()["max_lag"] == 0.0
+    assert monitor.metrics()["lag"]["le"]["0.001"] == 1
@@ -0,0 +1,113 @@
+"""
+Test suite for the hedging of slow LLM calls.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.hedging import HedgeBudget, LatencyTracker, RequestHedger
+
+
+def test_latency_percentile_uses_nearest_rank() -> None:
+    """The percentile is one of the recorded latencies."""
+    tracker = LatencyTracker(window=10)
+    assert tracker.percentile(95) is None
+
+    for latency in range(1, 21):
+        tracker.observe(latency / 10)
+
+    assert len(tracker) == 10
+    assert tracker.percentile(50) == 1.5
+    assert tracker.percentile(95) == 2.0
+
+
+def test_budget_caps_hedges_to_a_fraction_of_calls() -> None:
+    """A hedge is paid for by max_fraction of the calls before it."""
+    budget = HedgeBudget(max_fraction=0.25, max_tokens=1.0)
+    granted = 0
+    for _ in range(100):
+        budget.deposit()
+        granted += budget.try_spend()
+
+    assert granted == 25
+
+
+async def _answer(value: str, delay: float) -> str:
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _warm_up(hedger: RequestHedger, latency: float) -> None:
+    await hedger.run(
+        "model",
+        lambda: _answer("warm", latency),
+        lambda: _answer("warm", latency)
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled() -> None:
+    """The duplicate of a lagging call answers and the original is cancelled."""
+    hedger = RequestHedger(percentile=95, max_fraction=1.0, min_samples=1)
+    await _warm_up(hedger, 0.01)
+    cancelled = asyncio.Event()
+
+    async def stuck() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "primary"
+
+    result = await asyncio.wait_for(
+        hedger.run("model", stuck, lambda: _answer("hedge", 0.0)),
+        timeout=1
+    )
+
+    assert result == "hedge"
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert hedger.stats.as_dict() == {
+        "calls": 2, "hedges": 1, "hedge_wins": 1, "budget_denied": 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_fast_call_and_exhausted_budget_are_not_hedged() -> None:
+    """Calls within the percentile or beyond the budget run alone."""
+    hedger = RequestHedger(percentile=95, max_fraction=0.0, min_samples=1)
+    await _warm_up(hedger, 0.01)
+    hedge_calls = 0
+
+    async def hedge() -> str:
+        nonlocal hedge_calls
+        hedge_calls += 1
+        return "hedge"
+
+    assert await hedger.run("model", lambda: _answer("a", 0.0), hedge) == "a"
+    assert await hedger.run("model", lambda: _answer("b", 0.1), hedge) == "b"
+    assert hedge_calls == 0
+    assert hedger.stats.budget_denied == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_waits_for_the_primary() -> None:
+    """A failed duplicate does not mask the primary's valid response."""
+    hedger = RequestHedger(percentile=95, max_fraction=1.0, min_samples=1)
+    await _warm_up(hedger, 0.01)
+
+    async def failing() -> str:
+        raise ValueError("invalid response")
+
+    result = await hedger.run("model", lambda: _answer("primary", 0.1), failing)
+
+    assert result == "primary"
+    assert hedger.stats.hedge_wins == 0
+
+    async def primary_failing() -> str:
+        await asyncio.sleep(0.1)
+        raise ValueError("primary failed")
+
+    with pytest.raises(ValueError, match="primary failed"):
+        await hedger.run("model", primary_failing, failing)
@@ -0,0 +1,102 @@
+"""
+Test suite for the shared HTTP connection pool.
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+import litellm
+import pytest
+
+from app.core.config import Settings
+from app.services.http_pool import HTTPConnectionPool
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: 2\r\n"
+    b"\r\n"
+    b"{}"
+)
+
+
+@pytest.fixture
+async def server_url() -> AsyncIterator[str]:
+    """Minimal keep-alive HTTP server answering every request with {}."""
+
+    async def handle(
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_sequential_requests_reuse_one_connection(
+    server_url: str
+) -> None:
+    """Keep-alive connections are reused and reported as such."""
+    pool = HTTPConnectionPool(Settings())
+
+    for _ in range(3):
+        response = await pool.client.get(server_url)
+        assert response.json() == {}
+
+    metrics = pool.metrics()
+    assert metrics["requests"] == 3
+    assert metrics["new_connections"] == 1
+    assert metrics["reused_connections"] == 2
+    assert metrics["open_connections"] == 1
+    assert metrics["idle_connections"] == 1
+    assert metrics["utilization"] == 0.0
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_is_rebuilt_after_close(server_url: str) -> None:
+    """Closing the pool releases its connections without breaking reuse."""
+    pool = HTTPConnectionPool(Settings(HTTP_MAX_CONNECTIONS=2))
+    client = pool.client
+    assert pool.client is client
+
+    await pool.aclose()
+    assert client.is_closed
+    assert pool.metrics()["open_connections"] == 0
+
+    response = await pool.client.get(server_url)
+    assert response.status_code == 200
+    assert pool.client is not client
+    assert pool.metrics()["max_connections"] == 2
+    await pool.aclose()
+
+
+def test_client_is_rebuilt_for_each_event_loop() -> None:
+    """A client is never shared between event loops."""
+    pool = HTTPConnectionPool(Settings())
+
+    async def open_client():
+        client = pool.ensure_open()
+        assert pool.client is client
+        assert litellm.aclient_session is client
+        return client
+
+    first = asyncio.run(open_client())
+    second = asyncio.run(open_client())
+
+    assert second is not first
+    asyncio.run(pool.aclose())
+    assert second.is_closed
+    assert litellm.aclient_session is None
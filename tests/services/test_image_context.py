@@ -0,0 +1,81 @@
+"""
+Test suite for the ImageContext.
+"""
+
+import base64
+import io
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services.image_context import ImageContext, sniff_mime_type
+
+
+@pytest.fixture
+def png_bytes() -> bytes:
+    """Fixture to provide the bytes of a PNG test image."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    image_path = os.path.join(
+        os.path.dirname(current_dir), "benchmarks", "images", "v0",
+        "circuit_9.png"
+    )
+    assert os.path.exists(image_path), f"Test image not found: {image_path}"
+    with open(image_path, "rb") as f:
+        return f.read()
+
+
+def test_sniff_mime_type(png_bytes: bytes) -> None:
+    """Common image formats are recognized from their header."""
+    _, jpeg = cv2.imencode(".jpg", np.zeros((8, 8, 3), np.uint8))
+
+    assert sniff_mime_type(png_bytes) == "image/png"
+    assert sniff_mime_type(jpeg.tobytes()) == "image/jpeg"
+    assert sniff_mime_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+
+
+def test_context_memoizes_derived_forms(png_bytes: bytes) -> None:
+    """Derived representations are computed once and reused."""
+    image = ImageContext(png_bytes)
+
+    assert image.array is image.array
+    assert image.data_url is image.data_url
+    assert image.data_url.startswith("data:image/png;base64,")
+    assert base64.b64decode(image.base64) == png_bytes
+    assert (image.height, image.width) == image.array.shape[:2]
+
+
+def test_from_array_keeps_decoded_array() -> None:
+    """A context built from an array does not decode its bytes again."""
+    array = np.full((10, 20, 3), 255, np.uint8)
+
+    image = ImageContext.from_array(array)
+
+    assert image.array is array
+    assert image.mime_type == "image/jpeg"
+    assert image.jpeg_bytes is image.raw_bytes
+    assert (image.width, image.height) == (20, 10)
+
+
+def test_size_is_read_from_the_header() -> None:
+    """Dimensions come from the header, rotated like the decoded image."""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees clockwise
+    buffer = io.BytesIO()
+    Image.new("RGB", (20, 10)).save(buffer, "JPEG", exif=exif.tobytes())
+
+    image = ImageContext(buffer.getvalue())
+
+    assert image.size == (10, 20)
+    assert "array" not in image.__dict__
+    assert image.array.shape[:2] == (20, 10)
+
+
+def test_ensure_passes_contexts_through(png_bytes: bytes) -> None:
+    """Existing contexts are shared rather than wrapped again."""
+    image = ImageContext(png_bytes)
+
+    assert ImageContext.ensure(image) is image
+    assert ImageContext.ensure(png_bytes).content_hash == image.content_hash
@@ -0,0 +1,34 @@
+"""
+Test suite for the ImageDecoder.
+"""
+
+import base64
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.image_decoder import DECODE_CHUNK_LENGTH, ImageDecoder
+
+
+@pytest.mark.asyncio
+async def test_decode_async_matches_decode_across_chunks() -> None:
+    """Chunked decoding returns the bytes of a one-shot decode."""
+    payload = os.urandom(2 * DECODE_CHUNK_LENGTH)
+    image_data = base64.b64encode(payload).decode("utf-8")
+    assert len(image_data) > 2 * DECODE_CHUNK_LENGTH
+
+    assert await ImageDecoder.decode_async(image_data) == payload
+    wrapped = base64.encodebytes(payload).decode("utf-8")
+    assert await ImageDecoder.decode_async(wrapped) == payload
+
+
+@pytest.mark.asyncio
+async def test_decode_async_rejects_invalid_data() -> None:
+    """Invalid base64 is a client error, however long."""
+    # Unpadded, so that the extra character makes the length invalid
+    image_data = base64.b64encode(os.urandom(3 * DECODE_CHUNK_LENGTH)).decode()
+
+    with pytest.raises(HTTPException) as error:
+        await ImageDecoder.decode_async(image_data + "A")
+    assert error.value.status_code == 400
@@ -0,0 +1,67 @@
+"""
+Test suite for the ImagePreprocessor.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.image_context import ImageContext
+from app.services.image_preprocessor import ImagePreprocessor, ImageProfile
+
+
+@pytest.fixture
+def photo() -> ImageContext:
+    """Fixture to provide a 400x200 PNG with a dark sketch on white."""
+    array = np.full((200, 400, 3), 240, np.uint8)
+    cv2.rectangle(array, (50, 50), (350, 150), (20, 20, 20), 3)
+    return ImageContext.from_array(array, ".png")
+
+
+def test_default_profile_passes_image_through(photo: ImageContext) -> None:
+    """The default profile sends the original bytes unchanged."""
+    preprocessor = ImagePreprocessor(ImageProfile())
+
+    assert preprocessor.prepare(photo) is photo
+
+
+def test_profile_downscales_and_reencodes(photo: ImageContext) -> None:
+    """Large images are scaled down and labelled with the new MIME type."""
+    preprocessor = ImagePreprocessor(
+        ImageProfile(max_long_edge=100, format="webp", quality=70)
+    )
+
+    payload = preprocessor.prepare(photo)
+
+    assert payload.mime_type == "image/webp"
+    assert payload.data_url.startswith("data:image/webp;base64,")
+    assert (payload.width, payload.height) == (100, 50)
+
+
+def test_binarize_produces_black_and_white(photo: ImageContext) -> None:
+    """Binarized payloads only contain black and white pixels."""
+    preprocessor = ImagePreprocessor(ImageProfile(binarize=True))
+
+    payload = preprocessor.prepare(photo)
+
+    assert payload.mime_type == "image/png"
+    gray = cv2.imdecode(
+        np.frombuffer(payload.raw_bytes, np.uint8), cv2.IMREAD_GRAYSCALE
+    )
+    assert set(np.unique(gray)) <= {0, 255}
+
+
+def test_payload_is_computed_once_per_image(photo: ImageContext) -> None:
+    """Repeated calls for the same image reuse the first payload."""
+    preprocessor = ImagePreprocessor(ImageProfile(max_long_edge=100))
+
+    assert preprocessor.prepare(photo) is preprocessor.prepare(photo)
+
+
+def test_image_within_limit_is_not_decoded(photo: ImageContext) -> None:
+    """Checking the size against the limit reads the image header only."""
+    image = ImageContext(photo.raw_bytes)
+    preprocessor = ImagePreprocessor(ImageProfile(max_long_edge=1000))
+
+    assert preprocessor.prepare(image) is image
+    assert "array" not in image.__dict__
@@ -0,0 +1,156 @@
+"""
+Test suite for the ImageUploadReader.
+"""
+
+from typing import AsyncIterator, List
+
+import pytest
+from starlette.requests import Request
+
+from app.core.config import Settings
+from app.core.exceptions import ImageTooLargeError, InvalidMultipartError
+from app.services.image_upload import ImageUploadReader
+
+
+@pytest.fixture
+def upload_reader() -> ImageUploadReader:
+    """Fixture to provide a reader with a 10 byte size limit."""
+    return ImageUploadReader(Settings(MAX_IMAGE_SIZE=10))
+
+
+async def iter_chunks(chunks: List[bytes]) -> AsyncIterator[bytes]:
+    """Helper function to turn a list of chunks into an async stream."""
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_read_stream_joins_chunks(
+    upload_reader: ImageUploadReader
+) -> None:
+    """A body under the limit is returned in one piece."""
+    body = await upload_reader.read_stream(iter_chunks([b"abc", b"def"]))
+
+    assert body == b"abcdef"
+
+
+@pytest.mark.asyncio
+async def test_read_stream_stops_at_size_limit(
+    upload_reader: ImageUploadReader
+) -> None:
+    """Reading stops at the first chunk crossing the limit."""
+    consumed = []
+
+    async def tracked_chunks() -> AsyncIterator[bytes]:
+        for chunk in (b"123456", b"789012", b"345678"):
+            consumed.append(chunk)
+            yield chunk
+
+    with pytest.raises(ImageTooLargeError):
+        await upload_reader.read_stream(tracked_chunks())
+
+    assert len(consumed) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_stream_rejects_declared_length(
+    upload_reader: ImageUploadReader
+) -> None:
+    """An oversized Content-Length is rejected before reading."""
+    with pytest.raises(ImageTooLargeError):
+        await upload_reader.read_stream(iter_chunks([]), content_length=11)
+
+
+def multipart_request(chunks: List[bytes], consumed: List[bytes]) -> Request:
+    """Helper function to build a chunked multipart request."""
+    body = iter(chunks)
+
+    async def receive() -> dict:
+        chunk = next(body, None)
+        if chunk is None:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        consumed.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(
+            b"content-type", b"multipart/form-data; boundary=circuit"
+        )],
+    }
+    return Request(scope, receive)
+
+
+def file_part(content: bytes) -> bytes:
+    """Helper function to build a complete multipart body with one file."""
+    return (
+        b"--circuit\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="c.png"\r\n'
+        b"Content-Type: image/png\r\n\r\n"
+        + content
+        + b"\r\n--circuit--\r\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_read_form_parses_files(
+    upload_reader: ImageUploadReader
+) -> None:
+    """A form under the limit yields its file content."""
+    consumed: List[bytes] = []
+    request = multipart_request([file_part(b"png")], consumed)
+
+    form = await upload_reader.read_form(request, max_size=1024)
+    try:
+        [upload] = upload_reader.form_files(form, "file")
+        assert upload.content_type == "image/png"
+        assert await upload_reader.read_upload(upload) == b"png"
+    finally:
+        await form.close()
+
+
+@pytest.mark.asyncio
+async def test_read_form_stops_at_size_limit(
+    upload_reader: ImageUploadReader
+) -> None:
+    """A form without Content-Length is cut off once it crosses the limit."""
+    body = file_part(b"x" * 4096)
+    chunks = [body[i:i + 256] for i in range(0, len(body), 256)]
+    consumed: List[bytes] = []
+
+    with pytest.raises(ImageTooLargeError):
+        await upload_reader.read_form(
+            multipart_request(chunks, consumed), max_size=1024
+        )
+
+    assert sum(len(chunk) for chunk in consumed) <= 1024 + 256
+
+
+@pytest.mark.asyncio
+async def test_read_form_rejects_other_bodies(
+    upload_reader: ImageUploadReader
+) -> None:
+    """Bodies that are not multipart forms are rejected unread."""
+    request = Request(
+        {"type": "http", "method": "POST", "headers": [
+            (b"content-type", b"application/json")
+        ]},
+        None
+    )
+
+    with pytest.raises(InvalidMultipartError):
+        await upload_reader.read_form(request)
+
+
+def test_resolve_content_type_sniffs_generic_types() -> None:
+    """Generic binary uploads are typed from their bytes."""
+    png = b"\x89PNG\r\n\x1a\n..."
+
+    resolve = ImageUploadReader.resolve_content_type
+    assert resolve("application/octet-stream", png) == "image/png"
+    assert resolve(None, png) == "image/png"
+    assert resolve("image/jpeg; q=1", png) == "image/jpeg"
+    assert resolve("application/octet-stream", b"text") == (
+        "application/octet-stream"
+    )
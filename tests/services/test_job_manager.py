@@ -0,0 +1,82 @@
+"""
+Test suite for the JobManager.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import JobQueueFullError
+from app.services.job_manager import JobManager, JobStatus
+
+
+async def fake_schema(image_bytes: bytes) -> dict:
+    """Mock analysis answering after a short delay."""
+    await asyncio.sleep(0.01)
+    if image_bytes == b"broken":
+        raise ValueError("Failed to detect circuit diagram in image")
+    return {"components": [], "connections": []}
+
+
+async def wait_until_done(manager: JobManager, job_id: str) -> None:
+    """Poll a job until it has finished."""
+    for _ in range(100):
+        if manager.get(job_id).done:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_background() -> None:
+    """Submitted jobs are queued, run by the workers and then succeed or fail."""
+    manager = JobManager({"schema": fake_schema}, 2, 10, 60)
+    try:
+        good = manager.submit("schema", b"image")
+        bad = manager.submit("schema", b"broken")
+        assert good.status == JobStatus.QUEUED
+
+        await wait_until_done(manager, good.id)
+        await wait_until_done(manager, bad.id)
+
+        assert good.status == JobStatus.SUCCEEDED
+        assert good.result == {"components": [], "connections": []}
+        assert bad.status == JobStatus.FAILED
+        assert "Failed to detect" in bad.error
+        metrics = manager.metrics()
+        assert metrics["succeeded"] == 1 and metrics["failed"] == 1
+        assert metrics["latency_seconds"]["count"] == 2
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_jobs_over_the_pending_cap() -> None:
+    """Submissions beyond max_pending queued jobs are rejected with 429."""
+    manager = JobManager({"schema": fake_schema}, 1, 2, 60)
+    try:
+        manager.submit("schema", b"image")
+        await asyncio.sleep(0)  # the single worker takes the first job
+        manager.submit("schema", b"image")
+        manager.submit("schema", b"image")
+
+        with pytest.raises(JobQueueFullError) as excinfo:
+            manager.submit("schema", b"image")
+        assert excinfo.value.status_code == 429
+        assert manager.metrics()["rejected"] == 1
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire_after_ttl() -> None:
+    """Results are only kept for the configured TTL."""
+    manager = JobManager({"schema": fake_schema}, 1, 10, 0.05)
+    try:
+        job = manager.submit("schema", b"image")
+        await wait_until_done(manager, job.id)
+
+        await asyncio.sleep(0.1)
+        assert manager.get(job.id) is None
+    finally:
+        await manager.stop()
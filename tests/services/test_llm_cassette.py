@@ -0,0 +1,77 @@
+"""
+Test suite for the record/replay of LLM responses.
+"""
+
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.config import Settings
+from app.prompt_schemas.connection_schema import ComponentConnection
+from app.services.llm_cassette import LLMCassette
+from app.services.llm_client import LLMService
+
+
+def _service(tmp_path: Path, mode: str) -> LLMService:
+    return LLMService(Settings(
+        MODEL_NAME="gpt-4o",
+        LLM_CACHE_ENABLED=False,
+        LLM_CASSETTE_MODE=mode,
+        LLM_CASSETTE_PATH=str(tmp_path / "cassettes" / "llm.jsonl"),
+    ))
+
+
+@pytest.mark.asyncio
+async def test_recorded_responses_are_replayed_offline(tmp_path: Path) -> None:
+    """A replaying service answers from the cassette without the provider."""
+    recorder = _service(tmp_path, "record")
+    recorder._communicate_litellm = AsyncMock(
+        return_value='{"is_connected": true}'
+    )
+    recorded = await recorder.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+
+    player = _service(tmp_path, "replay")
+    player._communicate_litellm = AsyncMock(
+        side_effect=AssertionError("provider called in replay mode")
+    )
+    replayed = await player.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+
+    assert replayed == recorded == {"is_connected": True}
+    assert player._cassette.metrics()["replayed"] == 1
+
+    with pytest.raises(ValueError, match="No recorded response"):
+        await player.communicate(
+            prompt="Are they connected?",
+            image_bytes=b"other image",
+            schema=ComponentConnection
+        )
+
+
+@pytest.mark.asyncio
+async def test_record_appends_only_new_requests(tmp_path: Path) -> None:
+    """Recording again keeps the cassette free of duplicates."""
+    path = str(tmp_path / "llm.jsonl")
+    request = AsyncMock(return_value="{}")
+
+    for _ in range(2):
+        cassette = LLMCassette(path, "record")
+        await cassette.call("key", request)
+
+    assert len(LLMCassette(path, "replay")) == 1
+    assert len(Path(path).read_text().splitlines()) == 1
+    assert request.await_count == 2
+
+
+def test_replay_requires_an_existing_cassette(tmp_path: Path) -> None:
+    """Replaying a missing cassette fails at startup, not per call."""
+    with pytest.raises(ValueError, match="Cassette not found"):
+        LLMCassette(str(tmp_path / "missing.jsonl"), "replay")
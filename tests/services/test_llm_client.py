@@ -0,0 +1,327 @@
+"""
+Test suite for the LLMService.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.config import Settings
+from app.prompt_schemas.connection_schema import ComponentConnection
+from app.services.image_context import ImageContext
+from app.services.llm_client import LLMService
+
+
+@pytest.fixture
+def settings() -> Settings:
+    """Fixture to provide settings routed to a non-Groq model."""
+    return Settings(MODEL_NAME="gpt-4o", LLM_CACHE_ENABLED=True)
+
+
+@pytest.fixture
+def llm_service(settings: Settings) -> LLMService:
+    """Fixture to provide an LLMService with a mocked transport."""
+    service = LLMService(settings)
+    service._communicate_litellm = AsyncMock(
+        return_value='{"is_connected": true}'
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_communicate_memoizes_identical_calls(
+    llm_service: LLMService
+) -> None:
+    """A repeated deterministic call is answered from the cache."""
+    first = await llm_service.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+    second = await llm_service.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+
+    assert first == second == {"is_connected": True}
+    assert llm_service._communicate_litellm.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_memoized_responses_are_not_shared_with_callers(
+    llm_service: LLMService
+) -> None:
+    """Mutating a response does not change what later calls receive."""
+    for _ in range(2):
+        response = await llm_service.communicate(
+            prompt="Are they connected?",
+            image_bytes=b"image",
+            schema=ComponentConnection
+        )
+        assert response == {"is_connected": True}
+        response["is_connected"] = False
+
+    assert llm_service._communicate_litellm.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_communicate_distinguishes_inputs(
+    llm_service: LLMService
+) -> None:
+    """Different prompts or images are never served from each other."""
+    await llm_service.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+    await llm_service.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"other image",
+        schema=ComponentConnection
+    )
+    await llm_service.communicate(
+        prompt="Are they really connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+
+    assert llm_service._communicate_litellm.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_communicate_skips_cache_when_sampling(
+    llm_service: LLMService
+) -> None:
+    """Non-deterministic calls are always sent to the model."""
+    for _ in range(2):
+        await llm_service.communicate(
+            prompt="Describe the circuit",
+            image_bytes=b"image",
+            temperature=0.7
+        )
+
+    assert llm_service._communicate_litellm.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_communicate_coalesces_concurrent_identical_calls(
+    settings: Settings
+) -> None:
+    """Identical deterministic calls in flight share one provider request."""
+    service = LLMService(settings.model_copy(update={"LLM_CACHE_ENABLED": False}))
+
+    async def slow_completion(**kwargs):
+        await asyncio.sleep(0.01)
+        return '{"is_connected": true}'
+
+    service._communicate_litellm = AsyncMock(side_effect=slow_completion)
+
+    responses = await asyncio.gather(*(
+        service.communicate(
+            prompt="Are they connected?",
+            image_bytes=b"image",
+            schema=ComponentConnection
+        )
+        for _ in range(3)
+    ))
+
+    assert responses == [{"is_connected": True}] * 3
+    assert len({id(response) for response in responses}) == 3
+    assert service._communicate_litellm.await_count == 1
+    assert service._flights.metrics()["collapsed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_communicate_retries_only_retryable_failures(
+    settings: Settings
+) -> None:
+    """Timeouts and malformed responses are retried; bad requests are not."""
+    service = LLMService(settings.model_copy(update={
+        "LLM_CACHE_ENABLED": False, "LLM_RETRY_BASE_DELAY": 0.0
+    }))
+    service._communicate_litellm = AsyncMock(side_effect=[
+        asyncio.TimeoutError(),
+        "not json",
+        '{"is_connected": true}',
+    ])
+
+    response = await service.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+
+    assert response == {"is_connected": True}
+    assert service._communicate_litellm.await_count == 3
+    assert service.retry_policy.stats.recovered == 1
+
+    service._communicate_litellm = AsyncMock(
+        side_effect=RuntimeError("invalid model")
+    )
+    with pytest.raises(ValueError, match="invalid model"):
+        await service.communicate(
+            prompt="Are they connected?",
+            image_bytes=b"image",
+            schema=ComponentConnection
+        )
+    assert service._communicate_litellm.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_communicate_routes_around_a_failing_backend(
+    settings: Settings
+) -> None:
+    """Calls move to an equivalent backend once the preferred one fails."""
+    service = LLMService(settings.model_copy(update={
+        "LLM_CACHE_ENABLED": False,
+        "LLM_BACKENDS": ["groq/llama"],
+        "LLM_BREAKER_FAILURE_THRESHOLD": 1,
+        "LLM_RETRY_BASE_DELAY": 0.0,
+    }))
+    service._communicate_litellm = AsyncMock(
+        side_effect=ConnectionError("unreachable")
+    )
+    service._communicate_groq = AsyncMock(
+        return_value='{"is_connected": true}'
+    )
+
+    for _ in range(2):
+        response = await service.communicate(
+            prompt="Are they connected?",
+            image_bytes=b"image",
+            schema=ComponentConnection
+        )
+        assert response == {"is_connected": True}
+
+    assert service._communicate_litellm.await_count == 1
+    assert service._communicate_groq.await_count == 2
+    backends = service._router.metrics()["backends"]
+    assert backends["gpt-4o"]["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_groq_client_follows_the_pool_client(settings: Settings) -> None:
+    """The Groq client is rebuilt only when the pool client changes."""
+    service = LLMService(settings)
+    groq_client = service._groq()
+    assert service._groq() is groq_client
+
+    await service._http_pool.aclose()
+    assert service._groq() is not groq_client
+    await service._http_pool.aclose()
+
+
+@pytest.fixture
+def hedged_settings(settings: Settings) -> Settings:
+    """Fixture to provide settings hedging every call slower than usual."""
+    return settings.model_copy(update={
+        "LLM_CACHE_ENABLED": False,
+        "LLM_HEDGING_ENABLED": True,
+        "LLM_HEDGE_MAX_FRACTION": 1.0,
+        "LLM_HEDGE_MIN_SAMPLES": 1,
+        "LLM_HEDGE_MODEL": "gpt-4o-mini",
+        "MAX_PARALLEL_REQUESTS": 1,
+    })
+
+
+async def _slow_answer(*args, **kwargs) -> str:
+    await asyncio.sleep(0.05)
+    return '{"is_connected": true}'
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_are_not_hedged(hedged_settings: Settings) -> None:
+    """Time spent waiting for a scheduler slot does not trigger a hedge."""
+    service = LLMService(hedged_settings)
+    service._communicate_litellm = AsyncMock(side_effect=_slow_answer)
+    service._hedger._trackers["gpt-4o"].observe(0.08)
+
+    await asyncio.gather(*(
+        service.communicate(
+            prompt=f"Are they connected? ({index})",
+            image_bytes=b"image",
+            schema=ComponentConnection
+        )
+        for index in range(3)
+    ))
+
+    assert service._hedger.stats.hedges == 0
+    assert service._communicate_litellm.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_calls_without_alternate_backend_are_not_hedged(
+    hedged_settings: Settings
+) -> None:
+    """A hedge is never sent to the backend it would duplicate."""
+    service = LLMService(hedged_settings.model_copy(update={
+        "LLM_HEDGE_MODEL": None
+    }))
+    service._communicate_litellm = AsyncMock(side_effect=_slow_answer)
+    service._hedger._trackers["gpt-4o"].observe(0.01)
+
+    await service.communicate(
+        prompt="Are they connected?",
+        image_bytes=b"image",
+        schema=ComponentConnection
+    )
+
+    assert service._hedger.stats.calls == 0
+    assert service._communicate_litellm.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_admitted_call_is_hedged_to_hedge_model(
+    hedged_settings: Settings
+) -> None:
+    """A call slower than usual once admitted is duplicated to the hedge model."""
+    service = LLMService(hedged_settings.model_copy(update={
+        "MAX_PARALLEL_REQUESTS": 2
+    }))
+
+    async def answer(messages, model, **kwargs) -> str:
+        await asyncio.sleep(10 if model == "gpt-4o" else 0.0)
+        return '{"is_connected": true}'
+
+    service._communicate_litellm = AsyncMock(side_effect=answer)
+    service._hedger._trackers["gpt-4o"].observe(0.01)
+
+    response = await asyncio.wait_for(
+        service.communicate(
+            prompt="Are they connected?",
+            image_bytes=b"image",
+            schema=ComponentConnection
+        ),
+        timeout=1
+    )
+
+    assert response == {"is_connected": True}
+    assert service._hedger.stats.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_image_preprocessing(
+    llm_service: LLMService
+) -> None:
+    """The calls of a request preprocess their image once, off the loop."""
+    prepare = llm_service._preprocessor.prepare
+    prepared = []
+
+    def counting_prepare(image):
+        prepared.append(image)
+        return prepare(image)
+
+    llm_service._preprocessor.prepare = counting_prepare
+    image = ImageContext(b"image")
+    await asyncio.gather(*(
+        llm_service.communicate(
+            prompt=f"Are they connected? ({index})",
+            image_bytes=image,
+            schema=ComponentConnection
+        )
+        for index in range(4)
+    ))
+
+    assert prepared == [image]
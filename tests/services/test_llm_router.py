@@ -0,0 +1,82 @@
+"""
+Test suite for the latency-aware LLM backend router.
+"""
+
+from app.services.llm_router import BreakerState, LLMRouter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_unmeasured_then_fastest_backend_is_chosen() -> None:
+    """Every backend is measured once, then the fastest one is preferred."""
+    router = LLMRouter(["groq/llama", "gpt-4o"])
+
+    assert router.choose() == "groq/llama"
+    router.record_success("groq/llama", 2.0)
+    assert router.choose() == "gpt-4o"
+    router.record_success("gpt-4o", 1.0)
+
+    assert router.choose() == "gpt-4o"
+    assert router.choose(exclude=("gpt-4o",)) == "groq/llama"
+    assert router.metrics()["rerouted"] == 2
+
+
+def test_errors_penalize_a_backend() -> None:
+    """A faster backend with a high error rate loses to a reliable one."""
+    router = LLMRouter(["groq/llama", "gpt-4o"], failure_threshold=10)
+    router.record_success("groq/llama", 1.0)
+    router.record_success("gpt-4o", 1.5)
+    for _ in range(3):
+        router.record_failure("groq/llama")
+
+    assert router.choose() == "gpt-4o"
+
+
+def test_breaker_opens_and_probes_after_cooldown() -> None:
+    """Sustained failures stop traffic until a probe call succeeds."""
+    clock = FakeClock()
+    router = LLMRouter(
+        ["groq/llama", "gpt-4o"],
+        failure_threshold=2,
+        cooldown_seconds=30,
+        clock=clock
+    )
+    router.record_success("gpt-4o", 5.0)
+    router.record_failure("groq/llama")
+    router.record_failure("groq/llama")
+
+    backends = router.metrics()["backends"]
+    assert backends["groq/llama"]["state"] == BreakerState.OPEN
+    assert backends["groq/llama"]["breaker_opened"] == 1
+    assert router.choose() == "gpt-4o"
+
+    clock.now = 31
+    assert router.choose() == "groq/llama"  # single probe
+    assert router.choose() == "gpt-4o"
+    router.record_failure("groq/llama")
+    assert router.metrics()["backends"]["groq/llama"]["state"] == "open"
+
+    clock.now = 62
+    assert router.choose() == "groq/llama"
+    router.record_success("groq/llama", 1.0)
+    assert router.metrics()["backends"]["groq/llama"]["state"] == "closed"
+    assert router.choose() == "groq/llama"
+
+
+def test_all_breakers_open_still_routes() -> None:
+    """With every backend failing, calls go to the earliest opened one."""
+    clock = FakeClock()
+    router = LLMRouter(["a", "b"], failure_threshold=1, clock=clock)
+    router.record_failure("b")
+    clock.now = 1
+    router.record_failure("a")
+
+    assert router.choose() == "b"
@@ -0,0 +1,179 @@
+"""
+Test suite for the LLMScheduler.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_scheduler import (
+    LLMScheduler,
+    SpeculationBudget,
+    SpeculationBudgetExhausted,
+    estimate_image_tokens,
+    speculate,
+)
+
+
+def test_estimate_image_tokens() -> None:
+    """Image tokens follow the tiling of the downscaled image."""
+    assert estimate_image_tokens(512, 512) == 85 + 170
+    # 4000x3000 is fitted to 2048x1536, then to 1024x768: 2x2 tiles
+    assert estimate_image_tokens(4000, 3000) == 85 + 4 * 170
+    assert estimate_image_tokens(100, 3000) == estimate_image_tokens(3000, 100)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_in_flight_calls_in_fifo_order() -> None:
+    """No more than max_in_flight calls run, admitted in arrival order."""
+    scheduler = LLMScheduler(max_in_flight=2)
+    running = 0
+    peak = 0
+    started = []
+
+    async def call(index: int) -> None:
+        nonlocal running, peak
+        async with scheduler.slot():
+            started.append(index)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call(index) for index in range(6)))
+
+    assert peak == 2
+    assert started == list(range(6))
+    metrics = scheduler.metrics()
+    assert metrics["admitted"] == 6
+    assert metrics["queue_depth"] == 0
+    assert metrics["in_flight"] == 0
+    assert metrics["max_wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_enforces_request_and_token_budgets() -> None:
+    """Calls over the window budgets wait for the window to slide."""
+    window = 0.1
+    scheduler = LLMScheduler(
+        max_in_flight=10,
+        requests_per_minute=2,
+        tokens_per_minute=1000,
+        window_seconds=window
+    )
+
+    start = time.monotonic()
+    for _ in range(2):
+        async with scheduler.slot(estimated_tokens=100):
+            pass
+    assert time.monotonic() - start < window
+
+    # Third request exceeds the request budget
+    async with scheduler.slot(estimated_tokens=100):
+        pass
+    assert time.monotonic() - start >= window
+
+    # Token budget: 100 already used in the current window
+    token_start = time.monotonic()
+    async with scheduler.slot(estimated_tokens=950):
+        pass
+    assert time.monotonic() - token_start >= window * 0.5
+    assert scheduler.metrics()["rate_limited"] == 2
+
+
+def test_scheduler_serves_successive_event_loops() -> None:
+    """The scheduler keeps working when each call runs its own loop."""
+    scheduler = LLMScheduler(max_in_flight=1)
+
+    async def contend() -> None:
+        async def call() -> None:
+            async with scheduler.slot():
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(call(), call(), call())
+
+    asyncio.run(contend())
+    asyncio.run(contend())
+
+    assert scheduler.metrics()["admitted"] == 6
+
+
+def test_scheduler_forgets_slots_of_abandoned_loops() -> None:
+    """Slots still held when their loop went away do not leak."""
+    scheduler = LLMScheduler(max_in_flight=1)
+    admitted = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot():
+            admitted.set()
+            await asyncio.Event().wait()
+
+    abandoned = asyncio.new_event_loop()
+    held = abandoned.create_task(hold())
+    try:
+        abandoned.run_until_complete(admitted.wait())
+
+        async def call() -> None:
+            async with scheduler.slot():
+                pass
+
+        asyncio.run(asyncio.wait_for(call(), timeout=1))
+
+        assert scheduler.metrics()["in_flight"] == 0
+    finally:
+        held.cancel()
+        abandoned.run_until_complete(
+            asyncio.gather(held, return_exceptions=True)
+        )
+        abandoned.close()
+
+
+@pytest.mark.asyncio
+async def test_speculative_calls_yield_to_critical_calls() -> None:
+    """A queued speculative call is admitted after later critical calls."""
+    scheduler = LLMScheduler(max_in_flight=1)
+    release = asyncio.Event()
+    order = []
+
+    async def call(name: str, hold: bool = False) -> None:
+        async with scheduler.slot():
+            order.append(name)
+            if hold:
+                await release.wait()
+
+    async def speculative_call() -> None:
+        with speculate(SpeculationBudget(1)):
+            await call("speculative")
+
+    holder = asyncio.create_task(call("holder", hold=True))
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(speculative_call())]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(call(f"critical-{i}")) for i in range(2)]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(holder, *tasks)
+
+    assert order == ["holder", "critical-0", "critical-1", "speculative"]
+    assert scheduler.metrics()["speculative"] == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_calls_are_charged_to_budget() -> None:
+    """Calls past the speculation budget are refused before queueing."""
+    scheduler = LLMScheduler(max_in_flight=4)
+    budget = SpeculationBudget(2)
+
+    with speculate(budget):
+        for _ in range(2):
+            async with scheduler.slot():
+                pass
+        with pytest.raises(SpeculationBudgetExhausted):
+            async with scheduler.slot():
+                pass
+    async with scheduler.slot():
+        pass
+
+    assert budget.calls == 2
+    assert scheduler.metrics()["admitted"] == 3
@@ -0,0 +1,94 @@
+"""
+Test suite for perceptual hashing and the near-duplicate index.
+"""
+
+import itertools
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from app.core.config import Settings
+from app.services.perceptual_hash import (
+    PerceptualHashIndex,
+    compute_phash,
+    hamming_distance,
+)
+
+NEAR_DUPLICATE_THRESHOLD = Settings.model_fields[
+    "NEAR_DUPLICATE_THRESHOLD"
+].default
+
+
+def load_image(name: str) -> np.ndarray:
+    """Helper function to load a benchmark image as a BGR array."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    image_path = os.path.join(
+        os.path.dirname(current_dir), "benchmarks", "images", "v0", name
+    )
+    assert os.path.exists(image_path), f"Test image not found: {image_path}"
+    return cv2.imread(image_path, cv2.IMREAD_COLOR)
+
+
+@pytest.fixture
+def index() -> PerceptualHashIndex:
+    """Fixture to provide an index with the default threshold."""
+    return PerceptualHashIndex(threshold=6, max_entries=2, ttl_seconds=0)
+
+
+def test_phash_is_stable_under_reencoding() -> None:
+    """A re-compressed, shifted photo is within the default threshold."""
+    image = load_image("circuit_9.png")
+    _, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 60])
+    shifted = cv2.imdecode(buffer, cv2.IMREAD_COLOR)[4:, 4:]
+
+    distance = hamming_distance(compute_phash(image), compute_phash(shifted))
+
+    assert distance <= NEAR_DUPLICATE_THRESHOLD
+
+
+def test_phash_separates_every_benchmark_sheet() -> None:
+    """No two distinct benchmark sheets are near-duplicates of each other."""
+    images_dir = Path(__file__).parent.parent / "benchmarks" / "images"
+    hashes = {
+        path: compute_phash(cv2.imread(str(path), cv2.IMREAD_COLOR))
+        for path in sorted(images_dir.glob("v*/*.png"))
+    }
+
+    for (first, first_hash), (second, second_hash) in itertools.combinations(
+        hashes.items(), 2
+    ):
+        distance = hamming_distance(first_hash, second_hash)
+        assert distance > NEAR_DUPLICATE_THRESHOLD, (first.name, second.name)
+
+
+def test_index_returns_closest_match(index: PerceptualHashIndex) -> None:
+    """The closest entry within the threshold is returned."""
+    index.add(0b1111, "far")
+    index.add(0b0001, "near")
+
+    assert index.find(0b0000) == ("near", 1)
+    assert index.find(0xFFFF << 40) is None
+    assert index.metrics()["hit_rate"] == 0.5
+
+
+def test_index_is_bounded(index: PerceptualHashIndex) -> None:
+    """The oldest entry is dropped once the index is full."""
+    for phash in (0, 0xFFFF << 20, 0xFFFF << 40):
+        index.add(phash, phash)
+
+    assert len(index) == 2
+    assert index.find(0) is None
+
+
+def test_index_reports_false_matches(index: PerceptualHashIndex) -> None:
+    """Verification outcomes feed the false-match rate."""
+    index.record_verification(matched=True)
+    index.record_verification(matched=False)
+
+    metrics = index.metrics()
+    assert metrics["verifications"] == 2
+    assert metrics["false_matches"] == 1
+    assert metrics["false_match_rate"] == 0.5
@@ -0,0 +1,68 @@
+"""
+Test suite for the progress events of the analysis services.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core.config import Settings
+from app.services.component_identifier_service import ComponentIdentifierService
+from app.services.connection_identifier_service import ConnectionIdentifierService
+from app.services.llm_client import LLMService
+from app.services.progress import emit_progress, listen_progress
+
+
+async def fake_communicate(prompt, image_bytes, schema=None, **kwargs):
+    """Mock LLM finding a battery and a resistor, connected."""
+    if schema is None:
+        return "A loop with two parallel lines and a zigzag."
+    if schema.__name__ == "ComponentConnection":
+        return {"is_connected": True}
+    return {
+        "reasoning": "",
+        "approximate_location": "",
+        "is_present": schema.__name__ in ("BatteryPresence", "ResistorPresence"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_services_emit_each_decision() -> None:
+    """Components and connections are reported as soon as decided."""
+    settings = Settings()
+    llm_service = Mock(spec=LLMService)
+    llm_service.communicate = AsyncMock(side_effect=fake_communicate)
+    events = []
+
+    with listen_progress(lambda event, data: events.append((event, data))):
+        components = await ComponentIdentifierService(
+            settings, llm_service
+        ).identify_components(b"image")
+        await ConnectionIdentifierService(
+            settings, llm_service
+        ).identify_connections(components, b"image")
+
+    assert events[0][0] == "circuit_description"
+    component_events = [data for event, data in events if event == "component"]
+    assert len(component_events) == 4
+    assert {"type": "battery", "id": "b1", "is_present": True} in component_events
+    assert events[-1] == (
+        "connection", {"components": ["b1", "r1"], "is_connected": True}
+    )
+
+
+@pytest.mark.asyncio
+async def test_listeners_are_isolated_between_tasks() -> None:
+    """Concurrent analyses only receive their own events."""
+    async def analysis(name: str, received: list) -> None:
+        with listen_progress(lambda event, data: received.append(data)):
+            await asyncio.sleep(0)
+            emit_progress("step", {"name": name})
+
+    first, second = [], []
+    await asyncio.gather(analysis("first", first), analysis("second", second))
+    emit_progress("step", {"name": "nobody listens"})
+
+    assert first == [{"name": "first"}]
+    assert second == [{"name": "second"}]
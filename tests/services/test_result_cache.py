@@ -0,0 +1,96 @@
+"""
+Test suite for the result cache backends.
+"""
+
+import time
+
+import pytest
+
+from app.services.result_cache import (
+    MemoryLRUCache,
+    SQLiteCache,
+    TieredCache,
+    make_cache_key,
+)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path) -> str:
+    """Fixture to provide a temporary SQLite database path."""
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_make_cache_key_depends_on_every_part() -> None:
+    """Keys differ whenever any part or the part boundaries differ."""
+    key = make_cache_key("schema", "abc", "model", "42")
+
+    assert key == make_cache_key("schema", "abc", "model", "42")
+    assert key != make_cache_key("schema", "abc", "model", "43")
+    assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    """The least recently used entry is evicted once the cache is full."""
+    cache = MemoryLRUCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+    assert cache.metrics()["entries"] == 2
+
+
+def test_memory_cache_expires_entries() -> None:
+    """Entries older than the TTL are reported as misses."""
+    cache = MemoryLRUCache(max_entries=2, ttl_seconds=0.01)
+    cache.set("a", {"components": []})
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert cache.stats.misses == 1
+
+
+def test_sqlite_cache_persists_between_instances(sqlite_path: str) -> None:
+    """Values written by one instance are readable by a new one."""
+    SQLiteCache(sqlite_path, "results", 10, 0).set("a", {"x": [1, 2]})
+
+    cache = SQLiteCache(sqlite_path, "results", 10, 0)
+
+    assert cache.get("a") == {"x": [1, 2]}
+    assert cache.get("missing") is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_sqlite_cache_trims_to_max_entries(sqlite_path: str) -> None:
+    """The table never grows past its configured size."""
+    cache = SQLiteCache(sqlite_path, "results", 2, 0)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        time.sleep(0.001)
+
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+    assert cache.stats.evictions == 1
+
+
+def test_tiered_cache_promotes_disk_hits(sqlite_path: str) -> None:
+    """A disk hit is copied back into the memory tier."""
+    disk = SQLiteCache(sqlite_path, "results", 10, 0)
+    disk.set("a", [1])
+    cache = TieredCache(MemoryLRUCache(10, 0), disk)
+
+    assert cache.get("a") == [1]
+    assert cache.memory.get("a") == [1]
+    assert cache.get("b") is None
+
+    metrics = cache.metrics()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 1
+    assert metrics["disk"]["hits"] == 1
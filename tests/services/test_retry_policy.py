@@ -0,0 +1,119 @@
+"""
+Test suite for the retry policy of LLM calls.
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+import pytest
+
+from app.services.retry_policy import (
+    LLMRequestError, RetryBudget, RetryPolicy, classify_error,
+    current_retry_budget, parse_retry_after, retry_budget
+)
+
+
+class _Response:
+    def __init__(self, headers: Dict[str, str]) -> None:
+        self.headers = headers
+
+
+class _StatusError(Exception):
+    """Provider error shaped like the Groq and LiteLLM status errors."""
+
+    def __init__(
+        self,
+        status_code: int,
+        retry_after: Optional[str] = None
+    ) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": retry_after} if retry_after else {}
+        self.response = _Response(headers)
+
+
+@pytest.mark.parametrize(
+    "error, retryable",
+    [
+        (_StatusError(429), True),
+        (_StatusError(503), True),
+        (_StatusError(400), False),
+        (_StatusError(401), False),
+        (asyncio.TimeoutError(), True),
+        (ConnectionResetError(), True),
+        (RuntimeError("boom"), False),
+    ],
+)
+def test_classify_error(error: Exception, retryable: bool) -> None:
+    """Rate limits, server errors and transport failures are retryable."""
+    assert classify_error(error) == (retryable, None)
+
+
+def test_classify_error_follows_the_cause_and_retry_after() -> None:
+    """A wrapped provider error is classified by its cause."""
+    try:
+        try:
+            raise _StatusError(429, retry_after="3")
+        except _StatusError as e:
+            raise ValueError("Groq API request failed") from e
+    except ValueError as wrapped:
+        assert classify_error(wrapped) == (True, 3.0)
+
+
+def test_parse_retry_after() -> None:
+    """Retry-After is accepted in seconds; garbage is ignored."""
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_is_exponential_with_full_jitter() -> None:
+    """The backoff ceiling doubles per attempt and is capped."""
+    policy = RetryPolicy(
+        max_attempts=10, base_delay=0.5, max_delay=3.0, rng=lambda: 0.999
+    )
+    delays = [policy.backoff(attempt) for attempt in range(1, 5)]
+
+    assert delays == pytest.approx([0.4995, 0.999, 1.998, 2.997])
+
+
+def test_next_delay_respects_attempts_and_budget() -> None:
+    """Retries stop after max_attempts or once the budget is spent."""
+    policy = RetryPolicy(
+        max_attempts=3, base_delay=1.0, max_delay=8.0, rng=lambda: 0.5
+    )
+    error = LLMRequestError("rate limited", retryable=True)
+    budget = RetryBudget(10.0)
+
+    assert policy.next_delay(error, 1, budget) == 0.5
+    assert policy.next_delay(error, 2, budget) == 1.0
+    assert policy.next_delay(error, 3, budget) is None
+    assert budget.spent == 1.5
+
+    slow = LLMRequestError("rate limited", retryable=True, retry_after=20.0)
+    assert policy.next_delay(slow, 1, budget) is None
+    assert policy.next_delay(LLMRequestError("bad request"), 1, budget) is None
+    assert policy.metrics() == {
+        "retries": 2,
+        "recovered": 0,
+        "not_retryable": 1,
+        "attempts_exhausted": 1,
+        "budget_exhausted": 1,
+        "max_attempts": 3,
+    }
+
+
+@pytest.mark.asyncio
+async def test_budget_is_shared_with_child_tasks() -> None:
+    """Concurrent checks started within the block see the same budget."""
+    budget = RetryBudget(5.0)
+
+    async def check() -> Optional[RetryBudget]:
+        return current_retry_budget()
+
+    with retry_budget(budget):
+        seen = await asyncio.gather(check(), check())
+
+    assert seen == [budget, budget]
+    assert current_retry_budget() is None
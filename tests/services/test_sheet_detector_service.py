@@ -2,9 +2,13 @@ import os
 from pathlib import Path
 import asyncio
 
+import cv2
 import pytest
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
+from app.prompt_schemas.circuit_location_schema import CircuitLocation
+from app.services.cv_executor import CVExecutor
+from app.services.image_context import ImageContext
 from app.services.sheet_detector_service import SheetDetectorService
 
 
@@ -100,3 +104,71 @@ async def test_process_single_image(
     
     # Assert that the image was processed successfully
     assert success, "The image was not successfully processed"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("detection_scale", [2, 4])
+@pytest.mark.parametrize("decoded", [False, True])
+async def test_reduced_search_crops_like_full_resolution_search(
+    test_images_dir: str,
+    detection_scale: int,
+    decoded: bool
+) -> None:
+    """Searching a reduced copy of the photo gives the same crop."""
+    llm_service = Mock()
+    llm_service.communicate = AsyncMock(return_value={
+        "relative_x": 0.5, "relative_y": 0.5, "confidence": 0.8
+    })
+    image_bytes = ImageContext.from_array(cv2.imread(
+        str(Path(test_images_dir) / "circuit_2.png")
+    )).raw_bytes
+    results = []
+    for scale in (1, detection_scale):
+        detector = SheetDetectorService(
+            llm_service, detection_scale=scale, executor=CVExecutor(0)
+        )
+        image = ImageContext(image_bytes)
+        if decoded:
+            image.array
+        results.append(await detector.process_uploaded_image(image))
+
+    full, reduced = results
+    assert reduced["cropped_image"] is not None
+    assert reduced["cropped_image"] == full["cropped_image"]
+    assert reduced["perceptual_hash"] == full["perceptual_hash"]
+
+
+def test_reduced_search_decodes_the_reduced_photo(
+    llm_service: Mock,
+    test_images_dir: str,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Without a decoded frame, a JPEG is searched on a reduced decode."""
+    flags = []
+    imdecode = cv2.imdecode
+
+    def recording_imdecode(buffer, flag):
+        flags.append(flag)
+        return imdecode(buffer, flag)
+
+    monkeypatch.setattr(cv2, "imdecode", recording_imdecode)
+    detector = SheetDetectorService(
+        llm_service, detection_scale=4, executor=CVExecutor(0)
+    )
+    image = ImageContext.from_array(cv2.imread(
+        str(Path(test_images_dir) / "circuit_2.png")
+    ))
+    del image.array
+
+    crop = detector._crop_circuit(image, CircuitLocation(
+        relative_x=0.5, relative_y=0.5, confidence=0.8
+    ))
+
+    assert crop is not None
+    assert flags == [cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_COLOR]
+
+
+def test_detection_scale_is_validated(llm_service: Mock) -> None:
+    """Only the supported reductions are accepted."""
+    with pytest.raises(ValueError):
+        SheetDetectorService(llm_service, detection_scale=3)
@@ -0,0 +1,120 @@
+"""
+Test suite for the SingleFlight call coalescing.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution() -> None:
+    """Callers with the same key await the call already in flight."""
+    flights = SingleFlight()
+    executions = 0
+
+    async def analyze() -> str:
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return "schema"
+
+    results = await asyncio.gather(
+        *(flights.do("image", analyze) for _ in range(5)),
+        flights.do("other image", analyze)
+    )
+
+    assert results == ["schema"] * 6
+    assert executions == 2
+    assert flights.metrics() == {
+        "calls": 6, "executions": 2, "collapsed": 4, "in_flight": 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_leader_cancellation_does_not_cancel_followers() -> None:
+    """The shared call survives the cancellation of the caller starting it."""
+    flights = SingleFlight()
+
+    async def analyze() -> str:
+        await asyncio.sleep(0.02)
+        return "schema"
+
+    leader = asyncio.create_task(flights.do("image", analyze))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("image", analyze))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "schema"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_when_every_caller_is_gone() -> None:
+    """Nobody keeps paying for a call whose callers were all cancelled."""
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def analyze() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "schema"
+
+    callers = [
+        asyncio.create_task(flights.do("image", analyze)) for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_remembered() -> None:
+    """A failure reaches every caller and the next call runs again."""
+    flights = SingleFlight()
+
+    async def fail() -> str:
+        await asyncio.sleep(0.01)
+        raise ValueError("LLM API request failed")
+
+    results = await asyncio.gather(
+        flights.do("image", fail), flights.do("image", fail),
+        return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeed() -> str:
+        return "schema"
+
+    assert await flights.do("image", succeed) == "schema"
+
+
+@pytest.mark.asyncio
+async def test_call_after_cancellation_starts_a_new_execution() -> None:
+    """A caller arriving as an abandoned call winds down starts anew."""
+    flights = SingleFlight()
+
+    async def analyze() -> str:
+        await asyncio.sleep(0.01)
+        return "schema"
+
+    first = asyncio.create_task(flights.do("image", analyze))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    assert await flights.do("image", analyze) == "schema"
+    assert flights.stats.executions == 2
@@ -0,0 +1,143 @@
+"""
+Test suite for the SpeculativeSchemaAnalyzer.
+"""
+
+import asyncio
+from typing import Any, List
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.config import Settings
+from app.services.component_identifier_service import ComponentIdentifierService
+from app.services.connection_identifier_service import ConnectionIdentifierService
+from app.services.image_context import ImageContext
+from app.services.llm_client import LLMService
+from app.services.llm_scheduler import LLMScheduler
+from app.services.speculative_analysis import SpeculativeSchemaAnalyzer
+
+PRESENT = ("BatteryPresence", "ResistorPresence", "SwitchPresence")
+
+
+class FakeLLM:
+    """Mock LLM with slow presence checks and fast connection checks."""
+
+    def __init__(self) -> None:
+        self.connection_prompts: List[str] = []
+        self.cancelled = 0
+        self.scheduler = LLMScheduler(16)
+        self.admitted: List[str] = []
+
+    async def communicate(
+        self, prompt: str, image_bytes: Any, schema: Any = None, **kwargs: Any
+    ) -> Any:
+        async with self.scheduler.slot():
+            self.admitted.append(getattr(schema, "__name__", "description"))
+            return await self._answer(prompt, schema)
+
+    async def _answer(self, prompt: str, schema: Any) -> Any:
+        if schema is None:
+            return "A loop with a zigzag, two parallel lines and a gap."
+        if schema.__name__.endswith("Presence"):
+            await asyncio.sleep(0.05)
+            return {
+                "reasoning": "",
+                "approximate_location": "",
+                "is_present": schema.__name__ in PRESENT,
+            }
+        if schema.__name__ == "CircuitNetlist":
+            # Leaves every pair to the pairwise verification
+            return {"connections": []}
+        self.connection_prompts.append(prompt)
+        try:
+            # Checks involving an LED never answer before being cancelled
+            await asyncio.sleep(10 if "Component 1: led" in prompt else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"is_connected": True}
+
+
+def build_analyzer(settings: Settings, llm: FakeLLM) -> SpeculativeSchemaAnalyzer:
+    """Build an analyzer whose services share the fake LLM."""
+    llm_service = Mock(spec=LLMService)
+    llm_service.communicate = llm.communicate
+    return SpeculativeSchemaAnalyzer(
+        settings,
+        ComponentIdentifierService(settings, llm_service),
+        ConnectionIdentifierService(settings, llm_service)
+    )
+
+
+@pytest.mark.asyncio
+async def test_analyze_matches_serial_pipeline() -> None:
+    """Speculation returns what the serial stages return."""
+    settings = Settings(SPECULATIVE_CONNECTIONS=True)
+    llm = FakeLLM()
+    analyzer = build_analyzer(settings, llm)
+    image = ImageContext(b"image")
+
+    components, connections = await analyzer.analyze(image)
+
+    expected_components = await analyzer.component_identifier.identify_components(image)
+    expected_connections = await analyzer.connection_identifier.identify_connections(
+        expected_components, image
+    )
+    assert components == expected_components
+    assert connections == expected_connections
+    stats = analyzer.stats.as_dict()
+    assert stats["speculative_calls"] == 6
+    # Of the three pairs with the absent LED, two were still running and
+    # got cancelled while battery-LED had already answered
+    assert stats["cancelled_calls"] == 2
+    assert stats["wasted_calls"] == 3
+    assert stats["last_latency_saved_seconds"] > 0
+    await asyncio.sleep(0)
+    assert llm.cancelled == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_respects_speculation_budget() -> None:
+    """Pairs beyond the budget are checked once presence is known."""
+    settings = Settings(SPECULATIVE_CONNECTIONS=True, SPECULATION_MAX_CALLS=2)
+    llm = FakeLLM()
+    analyzer = build_analyzer(settings, llm)
+
+    components, connections = await analyzer.analyze(ImageContext(b"image"))
+
+    assert [component["type"] for component in components] == [
+        "battery", "resistor", "switch"
+    ]
+    assert connections == [
+        {"component": "b1", "connections": ["r1", "s1"]},
+        {"component": "r1", "connections": ["b1", "s1"]},
+        {"component": "s1", "connections": ["b1", "r1"]},
+    ]
+    # Two speculative checks plus battery-switch and resistor-switch
+    assert len(llm.connection_prompts) == 4
+    assert analyzer.stats.as_dict()["speculative_calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_netlist_verification_is_charged_to_budget() -> None:
+    """Verification calls past the budget run on the critical path instead."""
+    settings = Settings(
+        SPECULATIVE_CONNECTIONS=True,
+        SPECULATION_MAX_CALLS=1,
+        CONNECTION_DETECTION_MODE="batched"
+    )
+    llm = FakeLLM()
+    analyzer = build_analyzer(settings, llm)
+
+    components, connections = await analyzer.analyze(ImageContext(b"image"))
+
+    assert connections == [
+        {"component": "b1", "connections": ["r1", "s1"]},
+        {"component": "r1", "connections": ["b1", "s1"]},
+        {"component": "s1", "connections": ["b1", "r1"]},
+    ]
+    # Only the speculative netlist call fit in the budget
+    assert analyzer.stats.as_dict()["speculative_calls"] == 1
+    assert llm.scheduler.metrics()["speculative"] == 1
+    assert llm.admitted.count("CircuitNetlist") == 2
+    assert len(llm.connection_prompts) == 3